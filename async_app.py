@@ -0,0 +1,440 @@
+"""
+Async Trading App - ASGI Webhook Server
+Acknowledges webhooks immediately and lets a single actor task own the bot state
+
+Run with:  uvicorn async_app:app --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+from profitable_bot import ProfitableTradingBot
+from signal_schema import SignalValidationError, loads, parse_batch
+from dedup_cache import IDEMPOTENCY_HEADERS, IdempotencyCache, process_once
+from state_store import StateStore
+import metrics
+from config import Config
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('profitable_trading.log'),
+        logging.StreamHandler()
+    ]
+)
+
+
+class BotActor:
+    """
+    Single writer for the trading bot.
+    HTTP handlers only enqueue; one task drains the queue and calls
+    process_signal for each payload (duplicates get their cached result),
+    so state mutations happen in arrival order.
+    The bot runs on a dedicated single-thread executor, so a burst of
+    signals never blocks the event loop from sending acks. Reads that
+    touch bot state go through call() and are serialized with the writes.
+    """
+
+    def __init__(self, bot: ProfitableTradingBot, maxsize: int = Config.WEBHOOK_QUEUE_SIZE,
+                 dedup_cache: Optional[IdempotencyCache] = None):
+        self.bot = bot
+        self.maxsize = maxsize
+        self.dedup_cache = dedup_cache if dedup_cache is not None else IdempotencyCache()
+        self.queue: Optional[asyncio.Queue] = None
+        self.task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def start(self):
+        """Create the queue and actor task on the running event loop"""
+        if self.running:
+            return
+        self.queue = asyncio.Queue(maxsize=self.maxsize)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bot-actor')
+        self.task = asyncio.get_running_loop().create_task(self._run())
+        logging.info(f"🎬 Bot actor started (queue size: {self.maxsize})")
+
+    async def stop(self):
+        """Drain pending signals, then stop the actor task"""
+        if not self.running:
+            return
+        await self.queue.join()
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self._executor.shutdown(wait=True)
+        logging.info(f"🛑 Bot actor stopped after {self.processed} signals")
+
+    def submit(self, data, idempotency_key: Optional[str] = None) -> Tuple[int, asyncio.Future]:
+        """
+        Enqueue a signal (or a list of them) without waiting for it to be processed
+        Returns: (sequence number, future resolving to (result, is_duplicate) - a list of them for a batch)
+        Raises asyncio.QueueFull when the actor is saturated
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((self.enqueued + 1, data, idempotency_key, future))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            raise
+        self.enqueued += 1
+        return self.enqueued, future
+
+    async def call(self, function, *args):
+        """Run function(*args) on the bot thread, after the signals already queued"""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((None, (function, args), None, future))  # seq None marks a call
+        return await future
+
+    def _process(self, data, idempotency_key: Optional[str]):
+        if isinstance(data, list):
+            return [process_once(self.bot, self.dedup_cache, item) for item in data]
+        return process_once(self.bot, self.dedup_cache, data, idempotency_key)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            seq, data, idempotency_key, future = await self.queue.get()
+            if seq is None:
+                await self._run_call(loop, data, future)
+                continue
+            try:
+                result = await loop.run_in_executor(self._executor, self._process, data, idempotency_key)
+                if not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                logging.error(f"Actor error on signal #{seq}: {str(e)}")
+                if not future.done():
+                    future.set_result(({"status": "error", "reason": str(e)}, False))
+            finally:
+                self.processed += 1
+                self.queue.task_done()
+
+    async def _run_call(self, loop, call, future: asyncio.Future):
+        function, args = call
+        try:
+            result = await loop.run_in_executor(self._executor, function, *args)
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            self.queue.task_done()
+
+    def get_stats(self) -> Dict:
+        """Queue and throughput counters"""
+        return {
+            'running': self.running,
+            'queue_depth': self.queue.qsize() if self.queue else 0,
+            'queue_size': self.maxsize,
+            'enqueued': self.enqueued,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'dedup': self.dedup_cache.get_stats()
+        }
+
+
+# Initialize profitable trading bot
+try:
+    state_store = StateStore(Config.STATE_DIR) if Config.STATE_DIR else None
+    trading_bot = ProfitableTradingBot(state_store=state_store)
+    bot_actor = BotActor(trading_bot)
+    metrics.TRADE_HISTORY_EVENTS.set_function(lambda: len(trading_bot.trade_history))
+    metrics.TRADE_HISTORY_TOTAL.set_function(lambda: trading_bot.trade_history.total_count)
+    metrics.Gauge('webhook_queue_depth', 'Signals waiting for the bot actor').set_function(
+        lambda: bot_actor.queue.qsize() if bot_actor.queue else 0)
+    logging.info("🚀 Async Profitable Trading Bot server started successfully")
+except Exception as e:
+    logging.error(f"Failed to initialize profitable trading bot: {str(e)}")
+    state_store = None
+    trading_bot = None
+    bot_actor = None
+
+
+async def _read_body(receive) -> bytes:
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body', False):
+            return body
+
+
+async def _send_json(send, status: int, payload: Dict):
+    await _send_body(send, status, json.dumps(payload, default=str).encode('utf-8'))
+
+
+async def _send_body(send, status: int, body: bytes, etag: Optional[str] = None):
+    headers = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode('ascii'))
+    ]
+    if etag is not None:
+        headers.append((b'etag', etag.encode('latin-1')))
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+# Serialized /status body for the current state version → (etag, JSON body)
+_status_body: Optional[Tuple[str, bytes]] = None
+
+
+def _header(scope, names) -> Optional[str]:
+    wanted = {name.lower().encode('latin-1') for name in names}
+    for key, value in scope.get('headers', []):
+        if key.lower() in wanted and value:
+            return value.decode('latin-1')
+    return None
+
+
+def _wants_result(scope) -> bool:
+    query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    return query.get('wait', ['0'])[0] not in ('0', 'false', '')
+
+
+async def webhook(scope, receive, send):
+    """
+    Parse and enqueue - the bot actor does the rest
+    Pass ?wait=1 to hold the response until the signal has been processed
+    """
+    body = await _read_body(receive)
+    try:
+        data = loads(body) if body else None
+    except SignalValidationError as e:
+        return await _send_json(send, 400, {"error": str(e)})
+
+    if not data or not isinstance(data, dict):
+        return await _send_json(send, 400, {"error": "No data received"})
+
+    metrics.WEBHOOK_REQUESTS.labels('webhook', metrics.action_label(data.get('action'))).inc()
+
+    if bot_actor is None:
+        return await _send_json(send, 500, {"error": "Trading bot not initialized"})
+
+    bot_actor.start()
+    try:
+        seq, future = bot_actor.submit(data, _header(scope, IDEMPOTENCY_HEADERS))
+    except asyncio.QueueFull:
+        logging.warning("⚠️ Signal queue full - rejecting webhook")
+        return await _send_json(send, 503, {"error": "Signal queue full"})
+
+    if _wants_result(scope):
+        result, duplicate = await future
+        response = {"status": "success", "seq": seq, "result": result}
+        if duplicate:
+            response["duplicate"] = True
+        return await _send_json(send, 200, response)
+
+    return await _send_json(send, 202, {
+        "status": "queued",
+        "seq": seq,
+        "queue_depth": bot_actor.queue.qsize()
+    })
+
+
+async def webhook_batch(scope, receive, send):
+    """
+    Enqueue a JSON array / NDJSON batch as one actor item, keeping it contiguous
+    Pass ?wait=1 to receive the per-item results
+    """
+    body = await _read_body(receive)
+    try:
+        events = parse_batch(body)
+    except ValueError as e:
+        return await _send_json(send, 400, {"error": f"Invalid batch body: {str(e)}"})
+
+    if not events:
+        return await _send_json(send, 400, {"error": "No data received"})
+
+    if len(events) > Config.MAX_BATCH_SIZE:
+        return await _send_json(send, 413, {"error": f"Batch too large: {len(events)} > {Config.MAX_BATCH_SIZE}"})
+
+    for event in events:
+        action = event.get('action') if isinstance(event, dict) else None
+        metrics.WEBHOOK_REQUESTS.labels('batch', metrics.action_label(action)).inc()
+
+    if bot_actor is None:
+        return await _send_json(send, 500, {"error": "Trading bot not initialized"})
+
+    bot_actor.start()
+    try:
+        seq, future = bot_actor.submit(events)
+    except asyncio.QueueFull:
+        logging.warning("⚠️ Signal queue full - rejecting batch webhook")
+        return await _send_json(send, 503, {"error": "Signal queue full"})
+
+    if _wants_result(scope):
+        outcomes = await future
+        return await _send_json(send, 200, {
+            "status": "success",
+            "seq": seq,
+            "count": len(outcomes),
+            "duplicates": sum(duplicate for _, duplicate in outcomes),
+            "results": [result for result, _ in outcomes]
+        })
+
+    return await _send_json(send, 202, {
+        "status": "queued",
+        "seq": seq,
+        "count": len(events),
+        "queue_depth": bot_actor.queue.qsize()
+    })
+
+
+def _read_status():
+    """ETag and status of the same state - runs on the bot thread"""
+    return trading_bot.status_etag(), trading_bot.get_status()
+
+
+async def status(scope, receive, send):
+    """
+    Get comprehensive bot status - 304 when If-None-Match matches the state version
+    The 304 check reads the version here; a body and its ETag come from one actor call,
+    after any queued signals, so a newer body is never cached under an older ETag
+    """
+    global _status_body
+    if trading_bot is None:
+        return await _send_json(send, 500, {"error": "Trading bot not initialized"})
+
+    etag = trading_bot.status_etag()
+    if_none_match = _header(scope, ('If-None-Match',)) or ''
+    if etag in (tag.strip() for tag in if_none_match.split(',')) or if_none_match.strip() == '*':
+        return await _send_body(send, 304, b'', etag)
+
+    if _status_body is None or _status_body[0] != etag:
+        etag, state = await bot_actor.call(_read_status)
+        _status_body = (etag, json.dumps(state, default=str).encode('utf-8'))
+    return await _send_body(send, 200, _status_body[1], _status_body[0])
+
+
+def _read_health():
+    """Bot fields of /health - runs on the bot thread"""
+    return {
+        "automation_phase": trading_bot.automation_phase,
+        "emergency_stop": trading_bot.emergency_stop,
+        "daily_trades": trading_bot.daily_stats['trades'],
+        "daily_pnl": trading_bot.daily_stats['pnl_percent'],
+        "recovery": trading_bot.recovery_stats
+    }
+
+
+async def health(scope, receive, send):
+    """Health check including actor queue stats"""
+    health_info = {
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "bot_initialized": trading_bot is not None,
+        "webhook_ready": bot_actor is not None,
+        "system_type": "profitable_trading_system",
+        "server_mode": "async"
+    }
+
+    if trading_bot:
+        health_info.update(await bot_actor.call(_read_health))
+        health_info["actor"] = bot_actor.get_stats()
+
+    return await _send_json(send, 200, health_info)
+
+
+async def metrics_endpoint(scope, receive, send):
+    """Prometheus text exposition of the signal path metrics"""
+    body = metrics.REGISTRY.render().encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', metrics.CONTENT_TYPE.encode('ascii')),
+            (b'content-length', str(len(body)).encode('ascii'))
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+ROUTES = {
+    ('POST', '/webhook'): webhook,
+    ('POST', '/webhook/batch'): webhook_batch,
+    ('GET', '/status'): status,
+    ('GET', '/health'): health,
+    ('GET', '/metrics'): metrics_endpoint
+}
+
+# Paths whose handling time is recorded in webhook_request_seconds (time to acknowledge here)
+TIMED_ENDPOINTS = {'/webhook': 'webhook', '/webhook/batch': 'batch'}
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            if bot_actor is not None:
+                bot_actor.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if bot_actor is not None:
+                await bot_actor.stop()
+            if state_store is not None:
+                # Queue is drained - snapshot so the next start replays nothing
+                trading_bot.checkpoint()
+                state_store.close()
+            if trading_bot is not None:
+                trading_bot.trade_history.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI entry point"""
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    handler = ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        return await _send_json(send, 404, {"error": "Not found"})
+
+    started = time.perf_counter()
+    response_started = False
+
+    async def tracked_send(message):
+        nonlocal response_started
+        if message['type'] == 'http.response.start':
+            response_started = True
+        await send(message)
+
+    try:
+        await handler(scope, receive, tracked_send)
+    except Exception as e:
+        logging.error(f"Async server error: {str(e)}")
+        if response_started:
+            raise  # Too late for a 500 - the server aborts the connection instead
+        await _send_json(send, 500, {"error": str(e)})
+    finally:
+        endpoint = TIMED_ENDPOINTS.get(scope['path'])
+        if endpoint is not None:
+            metrics.WEBHOOK_LATENCY.labels(endpoint).observe(time.perf_counter() - started)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    logging.info("🚀 Starting Async Profitable Trading System...")
+    logging.info(f"⚡ Webhooks are queued for a single bot actor (queue size: {Config.WEBHOOK_QUEUE_SIZE})")
+    uvicorn.run(app, host='0.0.0.0', port=Config.PORT, log_level='warning')
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Backtester - strategy.pine Over Local OHLCV Files
+Indicators and buy/sell conditions are computed for the whole series with
+NumPy array ops; the trade loop only runs once per trade, and each SL/TP exit
+is found with a vectorized search over the bars after the entry
+Fills follow TradingView's broker emulator defaults: entries at the next
+bar's open, exits at the stop/limit level (or the open when a bar gaps
+through it), and when a bar touches both levels the path is open → nearer
+extreme → farther extreme
+"""
+
+import csv
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+import numpy as np
+from config import Config
+from indicators import ema, rsi, sma
+
+# strategy.pine inputs and strategy() settings
+DEFAULT_PARAMS = {
+    'ema_fast': 9,
+    'ema_slow': 21,
+    'ema_trend': 200,
+    'rsi_length': 14,
+    'rsi_buy_max': 60.0,
+    'rsi_sell_min': 40.0,
+    'volume_length': 20,
+    'volume_factor': 1.2,
+    'stop_loss_pct': Config.STOP_LOSS_PERCENT,
+    'take_profit_pct': Config.TAKE_PROFIT_PERCENT,
+    'initial_capital': 1000.0,
+    'qty_percent': 10.0  # default_qty_type=strategy.percent_of_equity
+}
+
+TIME_COLUMNS = ('time', 'timestamp', 'date', 'datetime')
+EXIT_REASONS = ('STOP_LOSS', 'TAKE_PROFIT', 'END')
+
+class Bars:
+    """OHLCV columns; time is epoch seconds (UTC)"""
+
+    def __init__(self, time, open, high, low, close, volume=None):
+        self.time = np.asarray(time, dtype=np.int64)
+        self.open = np.asarray(open, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.zeros(len(self.close)) if volume is None else np.asarray(volume, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def slice(self, start: int = 0, stop: Optional[int] = None) -> 'Bars':
+        """View of bars[start:stop] - no copy"""
+        return Bars(*(column[start:stop] for column in
+                      (self.time, self.open, self.high, self.low, self.close, self.volume)))
+
+def _parse_time(value: str) -> int:
+    try:
+        number = float(value)
+        return int(number / 1000) if number > 1e11 else int(number)  # Epoch milliseconds or seconds
+    except ValueError:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return int(parsed.timestamp())
+
+def load_ohlcv(path: str) -> Bars:
+    """
+    Load bars from a CSV (TradingView / MT5 export style header: time, open, high,
+    low, close[, volume]; time as epoch seconds/ms or ISO 8601) or an .npz from save_ohlcv
+    """
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return Bars(data['time'], data['open'], data['high'], data['low'], data['close'], data['volume'])
+
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower().lstrip('<').rstrip('>') for name in next(reader)]
+        rows = list(reader)
+
+    time_column = next((i for i, name in enumerate(header) if name in TIME_COLUMNS), None)
+    if time_column is None:
+        raise ValueError(f"{path}: no time column (expected one of {', '.join(TIME_COLUMNS)})")
+    for name in ('open', 'high', 'low', 'close'):
+        if name not in header:
+            raise ValueError(f"{path}: missing column '{name}'")
+
+    columns = list(zip(*rows)) if rows else [()] * len(header)
+    prices = {name: np.array(columns[header.index(name)], dtype=np.float64)
+              for name in ('open', 'high', 'low', 'close', 'volume') if name in header}
+    times = [_parse_time(value) for value in columns[time_column]]
+    return Bars(times, prices['open'], prices['high'], prices['low'], prices['close'], prices.get('volume'))
+
+def save_ohlcv(path: str, bars: Bars):
+    """Binary copy of parsed bars - loads in milliseconds instead of re-parsing the CSV"""
+    np.savez(path, time=bars.time, open=bars.open, high=bars.high, low=bars.low,
+             close=bars.close, volume=bars.volume)
+
+# ----------------------------------------------------------------------
+# Indicators and signals
+# ----------------------------------------------------------------------
+
+def compute_indicators(bars: Bars, params: Optional[Dict] = None, cache: Optional[Dict] = None) -> Dict[str, np.ndarray]:
+    """
+    Indicator series for the strategy
+    cache: optional dict keyed by (indicator, length) so runs over the same bars
+    with different parameters compute each series once
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    cache = {} if cache is None else cache
+
+    def series(name, source, length, function):
+        key = (name, int(length))
+        if key not in cache:
+            cache[key] = function(source, int(length))
+        return cache[key]
+
+    return {
+        'ema_fast': series('ema', bars.close, params['ema_fast'], ema),
+        'ema_slow': series('ema', bars.close, params['ema_slow'], ema),
+        'ema_trend': series('ema', bars.close, params['ema_trend'], ema),
+        'rsi': series('rsi', bars.close, params['rsi_length'], rsi),
+        'volume_sma': series('volume_sma', bars.volume, params['volume_length'], sma)
+    }
+
+def strategy_signals(bars: Bars, indicators: Dict[str, np.ndarray], params: Optional[Dict] = None):
+    """buy_condition / sell_condition per bar, without the "no open position" rule"""
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    fast, slow = indicators['ema_fast'], indicators['ema_slow']
+    previous_fast = np.concatenate(([np.nan], fast[:-1]))
+    previous_slow = np.concatenate(([np.nan], slow[:-1]))
+    crossover = (fast > slow) & (previous_fast <= previous_slow)
+    crossunder = (fast < slow) & (previous_fast >= previous_slow)
+    high_volume = bars.volume > indicators['volume_sma'] * params['volume_factor']
+    uptrend = (bars.close > indicators['ema_trend']) & (fast > slow)
+    downtrend = (bars.close < indicators['ema_trend']) & (fast < slow)
+    buy = uptrend & crossover & (indicators['rsi'] < params['rsi_buy_max']) & high_volume
+    sell = downtrend & crossunder & (indicators['rsi'] > params['rsi_sell_min']) & high_volume
+    return buy, sell
+
+# ----------------------------------------------------------------------
+# Trade simulation
+# ----------------------------------------------------------------------
+
+def _find_exit(bars: Bars, entry: int, stop: int, direction: int, stop_price: float, limit_price: float):
+    """
+    First bar after entry that touches the stop or the limit, searched in growing chunks
+    Returns (bar, price, reason index) or None if neither is hit before stop
+    """
+    first = entry + 1  # strategy.exit is placed on the entry bar's close
+    size = 64
+    while first < stop:
+        last = min(first + size, stop)
+        high, low = bars.high[first:last], bars.low[first:last]
+        if direction > 0:
+            hit = (low <= stop_price) | (high >= limit_price)
+        else:
+            hit = (high >= stop_price) | (low <= limit_price)
+        found = np.flatnonzero(hit)
+        if len(found):
+            bar = first + int(found[0])
+            return (bar, *_exit_fill(bars, bar, direction, stop_price, limit_price))
+        first = last
+        size *= 4
+    return None
+
+def _exit_fill(bars: Bars, bar: int, direction: int, stop_price: float, limit_price: float):
+    """Fill price and reason on a bar known to touch at least one level"""
+    open_, high, low = bars.open[bar], bars.high[bar], bars.low[bar]
+    if direction > 0:
+        if open_ <= stop_price:
+            return open_, 0
+        if open_ >= limit_price:
+            return open_, 1
+        stop_hit, limit_hit = low <= stop_price, high >= limit_price
+    else:
+        if open_ >= stop_price:
+            return open_, 0
+        if open_ <= limit_price:
+            return open_, 1
+        stop_hit, limit_hit = high >= stop_price, low <= limit_price
+    if stop_hit and limit_hit:
+        high_first = high - open_ < open_ - low
+        stop_first = high_first if direction < 0 else not high_first
+        return (stop_price, 0) if stop_first else (limit_price, 1)
+    return (stop_price, 0) if stop_hit else (limit_price, 1)
+
+def run_backtest(bars: Bars, params: Optional[Dict] = None, start: int = 0, stop: Optional[int] = None,
+                 cache: Optional[Dict] = None, close_open_trade: bool = False) -> Dict:
+    """
+    Simulate strategy.pine on bars[start:stop], one position at a time
+    Indicators are computed over all bars, so bars before start only serve as warm-up
+    close_open_trade: close a position still open at the end at the last close
+    (otherwise it is left out of the closed-trade metrics, as in the Pine panel)
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    stop = len(bars) if stop is None else min(stop, len(bars))
+    buy, sell = strategy_signals(bars, compute_indicators(bars, params, cache), params)
+    signal_bars = np.flatnonzero(buy[start:stop - 1] | sell[start:stop - 1]) + start  # Entry needs a next bar
+
+    stop_loss, take_profit = params['stop_loss_pct'] / 100, params['take_profit_pct'] / 100
+    capital = equity = float(params['initial_capital'])
+    trades = {name: [] for name in ('entry_bar', 'exit_bar', 'direction', 'entry_price', 'exit_price', 'qty', 'pnl', 'reason')}
+    open_trade = None
+
+    k = 0
+    while k < len(signal_bars):
+        signal = int(signal_bars[k])
+        direction = 1 if buy[signal] else -1
+        entry = signal + 1
+        entry_price = float(bars.open[entry])
+        qty = equity * params['qty_percent'] / 100 / bars.close[signal]  # Sized on the signal bar's close
+        stop_price = entry_price * (1 - direction * stop_loss)
+        limit_price = entry_price * (1 + direction * take_profit)
+
+        exit_ = _find_exit(bars, entry, stop, direction, stop_price, limit_price)
+        if exit_ is None:
+            if not close_open_trade:
+                open_trade = {'entry_bar': entry, 'direction': direction, 'entry_price': entry_price, 'qty': qty,
+                              'stop_loss': stop_price, 'take_profit': limit_price}
+                break
+            exit_ = (stop - 1, float(bars.close[stop - 1]), 2)
+        exit_bar, exit_price, reason = exit_
+        pnl = qty * direction * (exit_price - entry_price)
+        equity += pnl
+        for name, value in zip(trades, (entry, exit_bar, direction, entry_price, exit_price, qty, pnl, reason)):
+            trades[name].append(value)
+        k = int(np.searchsorted(signal_bars, exit_bar))  # Flat again at the exit bar's close
+
+    trades = {name: np.array(values, dtype=np.float64 if name in ('entry_price', 'exit_price', 'qty', 'pnl') else np.int64)
+              for name, values in trades.items()}
+    equity_curve = _equity_curve(bars, start, stop, capital, trades, open_trade)
+    return {**performance_metrics(trades, equity_curve, capital), 'equity': equity_curve, 'trades': trades, 'open_trade': open_trade}
+
+def _equity_curve(bars: Bars, start: int, stop: int, capital: float, trades: Dict, open_trade: Optional[Dict]) -> np.ndarray:
+    """Equity at each bar close in [start, stop): realised P&L plus the open position marked to the close"""
+    realised = np.zeros(stop - start)
+    np.add.at(realised, trades['exit_bar'] - start, trades['pnl'])
+    equity = capital + np.cumsum(realised)
+    held = list(zip(trades['entry_bar'].tolist(), trades['exit_bar'].tolist(), trades['direction'].tolist(),
+                    trades['entry_price'].tolist(), trades['qty'].tolist()))
+    if open_trade is not None:
+        held.append((open_trade['entry_bar'], stop, open_trade['direction'], open_trade['entry_price'], open_trade['qty']))
+    for entry, exit_bar, direction, entry_price, qty in held:
+        equity[entry - start:exit_bar - start] += qty * direction * (bars.close[entry:exit_bar] - entry_price)
+    return equity
+
+def performance_metrics(trades: Dict, equity_curve: np.ndarray, capital: float) -> Dict:
+    """The strategy.pine performance panel"""
+    pnl = trades['pnl']
+    total = len(pnl)
+    gross_profit = float(pnl[pnl > 0].sum())
+    gross_loss = float(-pnl[pnl < 0].sum())
+    net_profit = float(pnl.sum())
+    peak = np.maximum.accumulate(np.concatenate(([capital], equity_curve)))
+    max_drawdown = float((peak[1:] - equity_curve).max()) if len(equity_curve) else 0.0
+    return {
+        'total_trades': total,
+        'wins': int((pnl > 0).sum()),
+        'win_rate': float((pnl > 0).sum() / total * 100) if total else 0.0,
+        'profit_factor': gross_profit / max(gross_loss, 1),  # As the Pine table computes it
+        'gross_profit': gross_profit,
+        'gross_loss': gross_loss,
+        'net_profit': net_profit,
+        'net_profit_percent': net_profit / capital * 100,
+        'max_drawdown': max_drawdown,
+        'max_drawdown_percent': max_drawdown / capital * 100
+    }
+
+def format_report(result: Dict) -> str:
+    rows = [
+        ("Total Trades", f"{result['total_trades']}"),
+        ("Win Rate %", f"{result['win_rate']:.2f}"),
+        ("Profit Factor", f"{result['profit_factor']:.2f}"),
+        ("Net Profit", f"{result['net_profit']:.2f}"),
+        ("Net Profit %", f"{result['net_profit_percent']:.2f}"),
+        ("Max DD", f"{result['max_drawdown']:.2f}"),
+        ("Max DD %", f"{result['max_drawdown_percent']:.2f}")
+    ]
+    lines = [f"{'Metric':<16}| Value", "-" * 30] + [f"{name:<16}| {value}" for name, value in rows]
+    if result.get('open_trade'):
+        lines.append(f"{'Open Trade':<16}| {'long' if result['open_trade']['direction'] > 0 else 'short'} "
+                     f"@ {result['open_trade']['entry_price']:.5f}")
+    return "\n".join(lines)
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python backtester.py <ohlcv.csv|ohlcv.npz> [param=value ...]")
+        print(f"Params: {', '.join(DEFAULT_PARAMS)}")
+        sys.exit(1)
+
+    params = {}
+    for argument in sys.argv[2:]:
+        name, _, value = argument.partition('=')
+        if name not in DEFAULT_PARAMS:
+            print(f"❌ Unknown parameter: {name}")
+            sys.exit(1)
+        params[name] = type(DEFAULT_PARAMS[name])(float(value))
+
+    bars = load_ohlcv(sys.argv[1])
+    started = time.perf_counter()
+    result = run_backtest(bars, params)
+    elapsed = time.perf_counter() - started
+
+    print(f"📊 Backtest: {sys.argv[1]} ({len(bars):,} bars)")
+    print("=" * 30)
+    print(format_report(result))
+    print("=" * 30)
+    print(f"⏱️  {elapsed * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Bar Store - Memory-Mapped Columnar OHLCV Files
+One directory per symbol and timeframe holding one fixed-width file per column
+(time as int64 epoch seconds, open/high/low/close/volume as float64). Reads map
+the files with np.memmap, so opening years of bars is O(1) and pages are only
+read when touched; time ranges are found by binary search on the time column.
+Writes only ever append, in time order
+"""
+
+import logging
+import os
+import sys
+from typing import Dict, List, Optional
+import numpy as np
+from backtester import Bars, load_ohlcv
+from config import Config
+
+COLUMNS = {
+    'time': np.dtype('<i8'),
+    'open': np.dtype('<f8'),
+    'high': np.dtype('<f8'),
+    'low': np.dtype('<f8'),
+    'close': np.dtype('<f8'),
+    'volume': np.dtype('<f8')
+}
+
+class BarSeries:
+    """Read-only mapping of one symbol/timeframe; refresh() picks up bars appended since"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.refresh()
+
+    def refresh(self):
+        lengths = [os.path.getsize(self._path(name)) // dtype.itemsize if os.path.exists(self._path(name)) else 0
+                   for name, dtype in COLUMNS.items()]
+        count = min(lengths)  # A crash mid-append can leave some columns one bar longer
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.memmap(self._path(name), dtype=dtype, mode='r', shape=(count,)) if count else np.empty(0, dtype)
+            for name, dtype in COLUMNS.items()
+        }
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def __len__(self) -> int:
+        return len(self.columns['time'])
+
+    @property
+    def time(self) -> np.ndarray:
+        return self.columns['time']
+
+    @property
+    def first_time(self) -> Optional[int]:
+        return int(self.time[0]) if len(self) else None
+
+    @property
+    def last_time(self) -> Optional[int]:
+        return int(self.time[-1]) if len(self) else None
+
+    def index(self, timestamp: int, side: str = 'left') -> int:
+        """Position of timestamp in the time column (binary search)"""
+        return int(np.searchsorted(self.time, timestamp, side=side))
+
+    def bars(self, start: int = 0, stop: Optional[int] = None) -> Bars:
+        """Bars by position - views of the mapped files, no copy"""
+        return Bars(*(self.columns[name][start:stop] for name in COLUMNS))
+
+    def between(self, start_time: Optional[int] = None, end_time: Optional[int] = None) -> Bars:
+        """Bars with start_time <= time < end_time (epoch seconds; None = open-ended)"""
+        start = 0 if start_time is None else self.index(start_time)
+        stop = len(self) if end_time is None else self.index(end_time)
+        return self.bars(start, max(start, stop))
+
+class BarStore:
+    """
+    <root>/<SYMBOL>/<timeframe>/<column>.bin
+    - open(): memory-mapped BarSeries
+    - append(): adds bars newer than the last stored one; older or duplicate bars are skipped
+    """
+
+    def __init__(self, root: str = Config.BAR_STORE_DIR):
+        self.root = root
+
+    def _directory(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, symbol.upper(), timeframe)
+
+    def has(self, symbol: str, timeframe: str) -> bool:
+        return os.path.exists(os.path.join(self._directory(symbol, timeframe), 'time.bin'))
+
+    def symbols(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def timeframes(self, symbol: str) -> List[str]:
+        directory = os.path.join(self.root, symbol.upper())
+        return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    def open(self, symbol: str, timeframe: str) -> BarSeries:
+        return BarSeries(self._directory(symbol, timeframe))
+
+    def append(self, symbol: str, timeframe: str, bars: Bars) -> int:
+        """Append bars in time order; returns the number written"""
+        directory = self._directory(symbol, timeframe)
+        os.makedirs(directory, exist_ok=True)
+        series = BarSeries(directory)
+        count = len(series)
+        self._repair(series, count)
+
+        times = np.asarray(bars.time, dtype=np.int64)
+        if len(times) > 1 and (np.diff(times) <= 0).any():
+            raise ValueError(f"{symbol} {timeframe}: bars must be in strictly increasing time order")
+        first = 0 if series.last_time is None else int(np.searchsorted(times, series.last_time, side='right'))
+        if first:
+            logging.info(f"⏭️ {symbol} {timeframe}: skipped {first} bars already stored")
+        if first == len(times):
+            return 0
+
+        # Time last: a bar only becomes visible once every column has it
+        for name in list(COLUMNS)[1:] + ['time']:
+            with open(series._path(name), 'ab') as f:
+                f.write(np.ascontiguousarray(getattr(bars, name)[first:], dtype=COLUMNS[name]).tobytes())
+        return len(times) - first
+
+    def append_bar(self, symbol: str, timeframe: str, timestamp: int, open_: float, high: float,
+                   low: float, close: float, volume: float = 0.0) -> int:
+        """Append one closed bar"""
+        return self.append(symbol, timeframe, Bars([timestamp], [open_], [high], [low], [close], [volume]))
+
+    def _repair(self, series: BarSeries, count: int):
+        """Cut columns left longer than the time column by an interrupted append"""
+        for name, dtype in COLUMNS.items():
+            path = series._path(name)
+            if os.path.exists(path) and os.path.getsize(path) != count * dtype.itemsize:
+                logging.warning(f"⚠️ Truncating partial bar in {path}")
+                with open(path, 'rb+') as f:
+                    f.truncate(count * dtype.itemsize)
+
+def main():
+    if len(sys.argv) < 4:
+        print("Usage: python bar_store.py <ohlcv.csv|ohlcv.npz> <SYMBOL> <timeframe> [store_dir]")
+        sys.exit(1)
+
+    path, symbol, timeframe = sys.argv[1:4]
+    store = BarStore(sys.argv[4] if len(sys.argv) > 4 else Config.BAR_STORE_DIR)
+    written = store.append(symbol, timeframe, load_ohlcv(path))
+    series = store.open(symbol, timeframe)
+    print(f"✅ {symbol} {timeframe}: {written:,} bars appended, {len(series):,} stored")
+
+if __name__ == "__main__":
+    main()
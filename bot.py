@@ -8,6 +8,10 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional
 from risk import RiskManager
 from config import Config
+from signal_schema import (
+    SignalEvent, SignalValidationError, UnknownActionError, decode_event,
+    TradingSignal, TradeExecution, TradeClosure, EmergencyStop
+)
 
 class TradingBot:
     def __init__(self):
@@ -31,34 +35,41 @@ class TradingBot:
         self.emergency_stop = False
         self.trade_history = []
         
+        # Decoded event type → handler
+        self._handlers = {
+            TradingSignal: self._handle_trading_signal,
+            TradeExecution: self._handle_trade_execution,
+            TradeClosure: self._handle_trade_closure,
+            EmergencyStop: self._handle_emergency_stop
+        }
+        
         logging.info("🚀 Profitable Trading Bot initialized")
         logging.info(f"📊 Automation Phase: {self.automation_phase}")
         logging.info(f"💰 Starting Balance: ${Config.ACCOUNT_BALANCE}")
     
-    def process_signal(self, signal_data: Dict) -> Dict:
+    def process_signal(self, signal_data) -> Dict:
         """
         Enhanced signal processing with automation phases
+        Accepts a raw payload dict or an already decoded SignalEvent
         """
         try:
-            action = signal_data.get('action', '').upper()
-            
+            # Decode once - malformed payloads never reach the handlers
+            event = signal_data if isinstance(signal_data, SignalEvent) else decode_event(signal_data)
+        except UnknownActionError as e:
+            return {"status": "unknown_action", "action": e.action}
+        except SignalValidationError as e:
+            logging.warning(f"Rejected malformed signal: {str(e)}")
+            return {"status": "invalid", "reason": str(e)}
+        
+        try:
             # Handle different message types
-            if action == "EMERGENCY_STOP":
-                return self._handle_emergency_stop(signal_data)
-            elif action == "TRADE_EXECUTED":
-                return self._handle_trade_execution(signal_data)
-            elif action == "TRADE_CLOSED":
-                return self._handle_trade_closure(signal_data)
-            elif action in ["BUY", "SELL"]:
-                return self._handle_trading_signal(signal_data)
-            else:
-                return {"status": "unknown_action", "action": action}
+            return self._handlers[type(event)](event)
                 
         except Exception as e:
             logging.error(f"Signal processing error: {str(e)}")
             return {"status": "error", "reason": str(e)}
     
-    def _handle_trading_signal(self, signal_data: Dict) -> Dict:
+    def _handle_trading_signal(self, signal: TradingSignal) -> Dict:
         """Handle BUY/SELL signals based on automation phase"""
         
         # Reset daily stats if new day
@@ -68,11 +79,11 @@ class TradingBot:
         if self.emergency_stop:
             return {"status": "rejected", "reason": "Emergency stop active"}
         
-        action = signal_data['action']
-        symbol = signal_data.get('symbol', 'UNKNOWN')
-        price = float(signal_data.get('price', 0))
-        reason = signal_data.get('reason', 'NO_REASON')
-        auto_trading = signal_data.get('auto_trading', False)
+        action = signal.action.value
+        symbol = signal.symbol
+        price = signal.price
+        reason = signal.reason
+        auto_trading = signal.auto_trading
         
         logging.info(f"📊 {action} Signal: {symbol} @ {price} | Reason: {reason} | Auto: {auto_trading}")
         
@@ -99,7 +110,7 @@ class TradingBot:
         
         elif self.automation_phase == "SEMI_AUTO":
             # In semi-auto, we validate but don't execute
-            validation = self._validate_trade_conditions(signal_data)
+            validation = self._validate_trade_conditions(signal)
             return {
                 "status": "validated",
                 "validation": validation,
@@ -109,7 +120,7 @@ class TradingBot:
         
         elif self.automation_phase == "FULL_AUTO":
             # In full auto, EA handles execution, we just validate and log
-            validation = self._validate_trade_conditions(signal_data)
+            validation = self._validate_trade_conditions(signal)
             if not validation['allowed']:
                 logging.warning(f"Trade validation failed: {validation['reason']}")
             
@@ -122,17 +133,17 @@ class TradingBot:
         
         return {"status": "unknown_phase", "automation_phase": self.automation_phase}
     
-    def _handle_trade_execution(self, signal_data: Dict) -> Dict:
+    def _handle_trade_execution(self, execution: TradeExecution) -> Dict:
         """Handle trade execution confirmation from MT5 EA"""
         
-        symbol = signal_data.get('symbol', 'UNKNOWN')
-        side = signal_data.get('side', 'UNKNOWN')
-        price = float(signal_data.get('price', 0))
-        lot_size = float(signal_data.get('lot_size', 0))
-        stop_loss = float(signal_data.get('stop_loss', 0))
-        take_profit = float(signal_data.get('take_profit', 0))
-        reason = signal_data.get('reason', 'NO_REASON')
-        daily_trades = int(signal_data.get('daily_trades', 0))
+        symbol = execution.symbol
+        side = str(execution.side)
+        price = execution.price
+        lot_size = execution.lot_size
+        stop_loss = execution.stop_loss
+        take_profit = execution.take_profit
+        reason = execution.reason
+        daily_trades = execution.daily_trades
         
         logging.info(f"✅ Trade Executed: {side} {symbol} @ {price} | Lot: {lot_size} | SL: {stop_loss} | TP: {take_profit}")
         
@@ -161,14 +172,14 @@ class TradingBot:
             "daily_trades": daily_trades
         }
     
-    def _handle_trade_closure(self, signal_data: Dict) -> Dict:
+    def _handle_trade_closure(self, closure: TradeClosure) -> Dict:
         """Handle trade closure and P&L update"""
         
-        symbol = signal_data.get('symbol', 'UNKNOWN')
-        profit_percent = float(signal_data.get('profit_percent', 0))
-        is_win = signal_data.get('is_win', False)
-        daily_pnl = float(signal_data.get('daily_pnl', 0))
-        consecutive_losses = int(signal_data.get('consecutive_losses', 0))
+        symbol = closure.symbol
+        profit_percent = closure.profit_percent
+        is_win = closure.is_win
+        daily_pnl = closure.daily_pnl
+        consecutive_losses = closure.consecutive_losses
         
         logging.info(f"📊 Trade Closed: {symbol} | P&L: {profit_percent:.3f}% | Win: {is_win} | Daily: {daily_pnl:.2f}%")
         
@@ -208,13 +219,13 @@ class TradingBot:
             "withdrawal_recommendation": withdrawal_rec
         }
     
-    def _handle_emergency_stop(self, signal_data: Dict) -> Dict:
+    def _handle_emergency_stop(self, alert: EmergencyStop) -> Dict:
         """Handle emergency stop from MT5 EA"""
         
-        alert_type = signal_data.get('alert_type', 'UNKNOWN')
-        daily_pnl = float(signal_data.get('daily_pnl', 0))
-        daily_trades = int(signal_data.get('daily_trades', 0))
-        consecutive_losses = int(signal_data.get('consecutive_losses', 0))
+        alert_type = alert.alert_type
+        daily_pnl = alert.daily_pnl
+        daily_trades = alert.daily_trades
+        consecutive_losses = alert.consecutive_losses
         
         logging.critical(f"🚨 EMERGENCY STOP: {alert_type} | P&L: {daily_pnl}% | Trades: {daily_trades} | Losses: {consecutive_losses}")
         
@@ -241,7 +252,7 @@ class TradingBot:
             "message": "Trading stopped due to risk limits"
         }
     
-    def _validate_trade_conditions(self, signal_data: Dict) -> Dict:
+    def _validate_trade_conditions(self, signal: TradingSignal) -> Dict:
         """Validate if trade should be allowed"""
         
         # Basic validation
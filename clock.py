@@ -0,0 +1,92 @@
+"""
+Clock - Wall or Simulated Time With Trading-Day Boundaries
+Times are naive wall times in the trading timezone (server local when none is
+set), the way MT5 reports server time. The trading day starts at
+TRADING_DAY_ROLLOVER_HOUR in that zone - 17 in America/New_York is the FX
+session close. today() caches the current trading day with a monotonic
+deadline for the next rollover, so the per-request day check is one float
+compare instead of a datetime.now() call
+"""
+
+import time
+from datetime import date, datetime, timedelta
+from typing import Optional
+from config import Config
+
+RECHECK_SECONDS = 60.0  # Re-read the wall clock at least this often (NTP steps, suspend, DST)
+
+def _zone(name: str):
+    """IANA zone by name - zoneinfo is stdlib from Python 3.9, backports.zoneinfo before that"""
+    try:
+        from zoneinfo import ZoneInfo
+    except ImportError:
+        from backports.zoneinfo import ZoneInfo
+    return ZoneInfo(name)
+
+class Clock:
+    """Wall clock - now() reads the system time, today() is cached until the next rollover"""
+
+    def __init__(self, timezone: str = Config.TRADING_TIMEZONE,
+                 rollover_hour: int = Config.TRADING_DAY_ROLLOVER_HOUR):
+        self.timezone_name = timezone
+        self.timezone = _zone(timezone) if timezone else None
+        self.rollover_hour = rollover_hour
+        self.rollover = timedelta(hours=rollover_hour)
+        self._day: Optional[date] = None
+        self._deadline = float('-inf')  # time.monotonic() at which _day must be recomputed
+
+    def now(self) -> datetime:
+        if self.timezone is None:
+            return datetime.now()
+        return datetime.now(self.timezone).replace(tzinfo=None)
+
+    def localize(self, timestamp: datetime) -> datetime:
+        """Aware datetime → naive wall time in the trading timezone; naive ones are taken as already local"""
+        if timestamp.tzinfo is None:
+            return timestamp
+        return timestamp.astimezone(self.timezone).replace(tzinfo=None)
+
+    def trading_day(self, timestamp: datetime) -> date:
+        return (timestamp - self.rollover).date()
+
+    def day_start(self, day: date) -> datetime:
+        return datetime.combine(day, datetime.min.time()) + self.rollover
+
+    def today(self) -> date:
+        ticks = time.monotonic()
+        if ticks < self._deadline:
+            return self._day
+        now = self.now()
+        self._day = self.trading_day(now)
+        remaining = (self.day_start(self._day + timedelta(days=1)) - now).total_seconds()
+        self._deadline = ticks + min(remaining, RECHECK_SECONDS)
+        return self._day
+
+    def simulated(self, start: Optional[datetime] = None) -> 'SimulatedClock':
+        """A SimulatedClock with this clock's timezone and rollover hour"""
+        return SimulatedClock(start, self.timezone_name, self.rollover_hour)
+
+class SimulatedClock(Clock):
+    """Time set by the caller - replay, backtests and journal recovery drive it from event times"""
+
+    def __init__(self, start: Optional[datetime] = None, timezone: str = Config.TRADING_TIMEZONE,
+                 rollover_hour: int = Config.TRADING_DAY_ROLLOVER_HOUR):
+        super().__init__(timezone, rollover_hour)
+        self.time = start or super().now()
+        self._day_start = self._day_end = None  # Bounds of the cached _day
+
+    def now(self) -> datetime:
+        return self.time
+
+    def set(self, timestamp: datetime):
+        self.time = timestamp
+
+    def advance(self, seconds: float):
+        self.time += timedelta(seconds=seconds)
+
+    def today(self) -> date:
+        if self._day is None or not self._day_start <= self.time < self._day_end:
+            self._day = self.trading_day(self.time)
+            self._day_start = self.day_start(self._day)
+            self._day_end = self._day_start + timedelta(days=1)
+        return self._day
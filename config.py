@@ -33,11 +33,26 @@ class Config:
     MAX_POSITIONS = int(os.getenv('MAX_POSITIONS', 3))  # Max 3 open positions
     MAX_POSITION_PERCENT = float(os.getenv('MAX_POSITION_PERCENT', 10.0))  # Max 10% per position
     MIN_POSITION_SIZE = float(os.getenv('MIN_POSITION_SIZE', 0.001))  # Minimum trade size
+    CONTRACT_SIZE = float(os.getenv('CONTRACT_SIZE', 100000))  # Base units per MT5 lot
     
     # Daily Limits
     MAX_DAILY_LOSS = float(os.getenv('MAX_DAILY_LOSS', 50.0))  # Max $50 loss per day
     MAX_DAILY_TRADES = int(os.getenv('MAX_DAILY_TRADES', 10))  # Max 10 trades per day
     MAX_CONSECUTIVE_LOSSES = int(os.getenv('MAX_CONSECUTIVE_LOSSES', 3))  # Stop after 3 losses
+    EA_MAX_DAILY_TRADES = int(os.getenv('EA_MAX_DAILY_TRADES', 5))  # EA-reported trades per day (matches the EA input)
+    EA_MAX_DAILY_LOSS_PERCENT = float(os.getenv('EA_MAX_DAILY_LOSS_PERCENT', 2.0))  # EA-reported daily P&L floor, %
+    EA_MAX_CONSECUTIVE_LOSSES = int(os.getenv('EA_MAX_CONSECUTIVE_LOSSES', 2))  # EA-reported losses in a row today
+    
+    # Trading Day Clock
+    TRADING_TIMEZONE = os.getenv('TRADING_TIMEZONE', '')  # IANA zone of the broker/session day, '' = server local
+    TRADING_DAY_ROLLOVER_HOUR = int(os.getenv('TRADING_DAY_ROLLOVER_HOUR', 0))  # Hour the day starts (17 + America/New_York = FX close)
+    
+    # Portfolio Risk (correlation-aware VaR)
+    MAX_PORTFOLIO_VAR_PERCENT = float(os.getenv('MAX_PORTFOLIO_VAR_PERCENT', 5.0))  # Max 1-day VaR as % of account
+    PORTFOLIO_VAR_Z = float(os.getenv('PORTFOLIO_VAR_Z', 1.65))  # 1.65 = 95% confidence
+    PORTFOLIO_EWMA_LAMBDA = float(os.getenv('PORTFOLIO_EWMA_LAMBDA', 0.94))  # Covariance decay (RiskMetrics)
+    PORTFOLIO_SAMPLE_SECONDS = float(os.getenv('PORTFOLIO_SAMPLE_SECONDS', 900))  # Return interval, match the chart timeframe
+    PORTFOLIO_MIN_OBSERVATIONS = int(os.getenv('PORTFOLIO_MIN_OBSERVATIONS', 20))  # Samples before VaR can block trades
     
     # Cooldown Settings
     TRADE_COOLDOWN_MINUTES = int(os.getenv('TRADE_COOLDOWN_MINUTES', 5))  # 5 min between trades
@@ -50,7 +65,46 @@ class Config:
     
     # TradingView Webhook Settings
     WEBHOOK_SECRET = os.getenv('WEBHOOK_SECRET', 'your-secret-key')
+
+    # Async Server Settings ⚡
+    WEBHOOK_QUEUE_SIZE = int(os.getenv('WEBHOOK_QUEUE_SIZE', 1000))  # Max signals waiting for the bot actor
+    MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', 500))  # Max events per /webhook/batch request
+    
+    # Duplicate Alert Suppression
+    DEDUP_TTL_SECONDS = float(os.getenv('DEDUP_TTL_SECONDS', 300))  # Replay the first result for 5 min
+    DEDUP_MAX_ENTRIES = int(os.getenv('DEDUP_MAX_ENTRIES', 10000))  # Fixed memory, 0 disables
+    
+    # Trade History Storage
+    TRADE_HISTORY_CAPACITY = int(os.getenv('TRADE_HISTORY_CAPACITY', 1000))  # Recent events kept in memory
+    TRADE_HISTORY_DIR = os.getenv('TRADE_HISTORY_DIR', 'data/history')  # Older events spill here ('' = drop)
+    TRADE_HISTORY_SEGMENT_SIZE = int(os.getenv('TRADE_HISTORY_SEGMENT_SIZE', 10000))  # Events per segment file
+    TRADE_HISTORY_MAX_SEGMENTS = int(os.getenv('TRADE_HISTORY_MAX_SEGMENTS', 100))  # Oldest deleted beyond this, 0 = keep all
+    
+    # Trade Journal (SQLite)
+    TRADE_JOURNAL_PATH = os.getenv('TRADE_JOURNAL_PATH', 'data/trades.db')  # '' disables the journal
+    TRADE_JOURNAL_BATCH_SIZE = int(os.getenv('TRADE_JOURNAL_BATCH_SIZE', 50))  # Events per commit
+    TRADE_JOURNAL_FLUSH_SECONDS = float(os.getenv('TRADE_JOURNAL_FLUSH_SECONDS', 1.0))  # Max seconds between commits
+    MAX_TRADES_PAGE = int(os.getenv('MAX_TRADES_PAGE', 1000))  # Max events per /trades page
     
+    # Crash-Safe State (write-ahead journal + snapshots)
+    STATE_DIR = os.getenv('STATE_DIR', 'data/state')  # '' disables state persistence
+    STATE_SNAPSHOT_EVERY = int(os.getenv('STATE_SNAPSHOT_EVERY', 100))  # Inputs between snapshots = max replay on startup
+    STATE_FSYNC = os.getenv('STATE_FSYNC', 'False').lower() == 'true'  # fsync every input (survives power loss, slower)
+    
+    # Event Stream (GET /events)
+    EVENT_STREAM_BUFFER = int(os.getenv('EVENT_STREAM_BUFFER', 1000))  # Events kept for Last-Event-ID resume
+    EVENT_STREAM_KEEPALIVE = float(os.getenv('EVENT_STREAM_KEEPALIVE', 15))  # Seconds between keepalive comments
+    
+    # Paper Broker (FULL_AUTO simulated fills)
+    PAPER_SPREAD_PIPS = float(os.getenv('PAPER_SPREAD_PIPS', 1.5))  # Spread for pairs without a built-in default
+    PAPER_SLIPPAGE_PIPS = float(os.getenv('PAPER_SLIPPAGE_PIPS', 0.5))  # Max adverse slippage per fill
+    PAPER_SEED = int(os.getenv('PAPER_SEED', 42))  # Same seed + same prices = same fills
+    
+    # Market Data (memory-mapped bar store)
+    BAR_STORE_DIR = os.getenv('BAR_STORE_DIR', 'data/bars')  # <SYMBOL>/<timeframe>/<column>.bin
+    RESAMPLE_TIMEFRAMES = os.getenv('RESAMPLE_TIMEFRAMES', '15m,1h,4h').split(',')  # Bars built from ticks / 1m bars
+    RESAMPLE_GRACE_SECONDS = float(os.getenv('RESAMPLE_GRACE_SECONDS', 2.0))  # Late ticks accepted this long after a boundary
+
     @classmethod
     def validate_config(cls):
         """Validate critical configuration"""
@@ -71,6 +125,9 @@ class Config:
         if cls.ACCOUNT_BALANCE <= 0:
             errors.append("ACCOUNT_BALANCE must be positive")
         
+        if not 0 <= cls.TRADING_DAY_ROLLOVER_HOUR <= 23:
+            errors.append("TRADING_DAY_ROLLOVER_HOUR must be between 0 and 23")
+        
         if errors:
             raise ValueError(f"Configuration errors: {', '.join(errors)}")
         
@@ -0,0 +1,103 @@
+"""
+Bot Event Stream Client
+Keeps one /events connection open and applies the pushed deltas to a local
+copy of /status, so dashboard reruns read memory instead of polling the bot
+"""
+
+import json
+import threading
+import time
+import requests
+
+class BotStateStream:
+    """
+    Background Server-Sent Events reader
+    - status: latest /status body (None until the first snapshot arrives)
+    - reconnects with Last-Event-ID so a dropped connection resumes without a resync
+    """
+
+    def __init__(self, bot_url, reconnect_delay=3.0):
+        self.url = f"{bot_url}/events"
+        self.reconnect_delay = reconnect_delay
+        self.status = None
+        self.last_event_id = None
+        self.connected = False
+        self.error = None
+        self.updates = 0
+        self._changed = threading.Condition()
+
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+
+    def _run(self):
+        while True:
+            headers = {'Accept': 'text/event-stream'}
+            if self.last_event_id:
+                headers['Last-Event-ID'] = self.last_event_id
+            try:
+                # Read timeout well above the server keepalive interval
+                with requests.get(self.url, headers=headers, stream=True, timeout=(10, 60)) as response:
+                    response.raise_for_status()
+                    self.connected = True
+                    self.error = None
+                    self._consume(response)
+            except Exception as e:
+                self.error = str(e)
+            self.connected = False
+            time.sleep(self.reconnect_delay)
+
+    def _consume(self, response):
+        buffer = b''
+        event, event_id, data = 'message', None, []
+        for chunk in response.iter_content(chunk_size=None):
+            buffer += chunk
+            while b'\n' in buffer:
+                raw, buffer = buffer.split(b'\n', 1)
+                line = raw.decode('utf-8').rstrip('\r')
+                if not line:
+                    # Blank line ends the message
+                    if data:
+                        self._apply(event, json.loads('\n'.join(data)))
+                        if event_id is not None:
+                            self.last_event_id = event_id
+                    event, event_id, data = 'message', None, []
+                elif line.startswith(':'):
+                    continue  # keepalive comment
+                else:
+                    field, _, value = line.partition(':')
+                    value = value[1:] if value.startswith(' ') else value
+                    if field == 'event':
+                        event = value
+                    elif field == 'id':
+                        event_id = value
+                    elif field == 'data':
+                        data.append(value)
+
+    def _apply(self, event, payload):
+        """Build a new status dict per message so readers never see a half-applied delta"""
+        if event == 'snapshot':
+            status = payload
+        elif self.status is None:
+            return
+        elif event == 'state':
+            status = {**self.status, **payload['changes'], 'state_version': payload['version']}
+        elif event == 'trade':
+            recent = (self.status.get('recent_trades', []) + [payload])[-10:]
+            status = {
+                **self.status,
+                'recent_trades': recent,
+                'recent_signals': recent,
+                'total_signals': self.status.get('total_signals', 0) + 1
+            }
+        else:
+            return
+
+        with self._changed:
+            self.status = status
+            self.updates += 1
+            self._changed.notify_all()
+
+    def wait_for_update(self, seen, timeout):
+        """Block until more than `seen` updates were applied or timeout passes"""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.updates > seen, timeout)
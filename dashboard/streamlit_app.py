@@ -9,8 +9,8 @@ import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 from datetime import datetime, timedelta
-import time
 import json
+from event_client import BotStateStream
 
 # Page config
 st.set_page_config(
@@ -23,36 +23,83 @@ st.set_page_config(
 # Configuration
 BOT_URL = st.secrets.get("BOT_URL", "https://trading-bot-production-c863.up.railway.app")
 
+def _get_json(path, timeout):
+    """
+    GET a bot endpoint with If-None-Match
+    A 304 reuses the body from the previous rerun; returns (status_code, data)
+    """
+    cache = st.session_state.setdefault('etag_cache', {})
+    cached = cache.get(path)
+    headers = {'If-None-Match': cached[0]} if cached else {}
+    response = requests.get(f"{BOT_URL}{path}", headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached:
+        return 200, cached[1]
+    if response.status_code != 200:
+        return response.status_code, None
+    data = response.json()
+    if response.headers.get('ETag'):
+        cache[path] = (response.headers['ETag'], data)
+    return 200, data
+
+@st.cache_resource
+def get_state_stream():
+    """One /events connection shared by every session of this dashboard"""
+    return BotStateStream(BOT_URL)
+
+def _streamed_status():
+    """Latest status pushed over /events, or None while the stream is down"""
+    stream = get_state_stream()
+    return stream.status if stream.connected else None
+
 def get_bot_status():
     """Get comprehensive bot status"""
+    streamed = _streamed_status()
+    if streamed is not None:
+        return streamed
     try:
-        response = requests.get(f"{BOT_URL}/status", timeout=10)
-        if response.status_code == 200:
-            return response.json()
+        status_code, data = _get_json("/status", timeout=10)
+        if status_code == 200:
+            return data
         else:
-            return {"error": f"HTTP {response.status_code}"}
+            return {"error": f"HTTP {status_code}"}
     except Exception as e:
         return {"error": str(e)}
 
 def get_bot_health():
     """Get bot health check"""
+    streamed = _streamed_status()
+    if streamed is not None:
+        return {
+            "status": "healthy",
+            "automation_phase": streamed["automation_phase"],
+            "emergency_stop": streamed["emergency_stop"],
+            "daily_trades": streamed["daily_stats"]["trades"],
+            "daily_pnl": streamed["daily_stats"]["pnl_percent"]
+        }
     try:
-        response = requests.get(f"{BOT_URL}/health", timeout=5)
-        if response.status_code == 200:
-            return response.json()
+        status_code, data = _get_json("/health", timeout=5)
+        if status_code == 200:
+            return data
         else:
-            return {"status": "unhealthy", "error": f"HTTP {response.status_code}"}
+            return {"status": "unhealthy", "error": f"HTTP {status_code}"}
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
 
 def get_automation_status():
     """Get automation phase status"""
+    streamed = _streamed_status()
+    if streamed is not None:
+        return {
+            "automation_phase": streamed["automation_phase"],
+            "available_phases": ["SIGNAL_ONLY", "SEMI_AUTO", "FULL_AUTO"],
+            "emergency_stop": streamed["emergency_stop"]
+        }
     try:
-        response = requests.get(f"{BOT_URL}/automation", timeout=5)
-        if response.status_code == 200:
-            return response.json()
+        status_code, data = _get_json("/automation", timeout=5)
+        if status_code == 200:
+            return data
         else:
-            return {"error": f"HTTP {response.status_code}"}
+            return {"error": f"HTTP {status_code}"}
     except Exception as e:
         return {"error": str(e)}
 
@@ -93,12 +140,19 @@ def reset_emergency():
 
 def get_profit_info():
     """Get profit and withdrawal information"""
+    streamed = _streamed_status()
+    if streamed is not None:
+        return {
+            "profit_tracker": streamed["profit_tracker"],
+            "withdrawal_recommendation": streamed["withdrawal_recommendation"],
+            "daily_stats": streamed["daily_stats"]
+        }
     try:
-        response = requests.get(f"{BOT_URL}/profit", timeout=10)
-        if response.status_code == 200:
-            return response.json()
+        status_code, data = _get_json("/profit", timeout=10)
+        if status_code == 200:
+            return data
         else:
-            return {"error": f"HTTP {response.status_code}"}
+            return {"error": f"HTTP {status_code}"}
     except Exception as e:
         return {"error": str(e)}
 
@@ -123,6 +177,7 @@ def main():
     st.title("💰 Profitable Trading Dashboard")
     st.markdown("**Small-Wins Automated Trading System**")
     st.markdown("---")
+    updates_seen = get_state_stream().updates
     
     # Sidebar Controls
     with st.sidebar:
@@ -440,9 +495,9 @@ def main():
     with st.expander("🔍 Raw Bot Status (Debug)"):
         st.json(status)
     
-    # Auto-refresh
+    # Auto-refresh - as soon as the bot pushes a change, at the latest after refresh_interval
     if auto_refresh:
-        time.sleep(refresh_interval)
+        get_state_stream().wait_for_update(updates_seen, refresh_interval)
         st.rerun()
 
 if __name__ == "__main__":
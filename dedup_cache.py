@@ -0,0 +1,139 @@
+"""
+Duplicate Alert Suppression - Idempotency Cache
+TradingView retries alerts and the EA can resend on reconnect; the first
+successful result for a key is replayed for every copy seen within the TTL.
+Failed results are not cached, so a retry after a transient error runs again.
+Payloads with no key, bar time or ticket cannot be told apart from a new alert
+with the same fields, so they are never suppressed
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from config import Config
+
+IDEMPOTENCY_HEADERS = ('Idempotency-Key', 'X-Idempotency-Key')
+
+# Fields that identify one alert for one bar / one EA ticket
+_KEY_FIELDS = ('action', 'symbol', 'timeframe', 'bar_time', 'time', 'ticket')
+_IDENTITY_FIELDS = ('bar_time', 'time', 'ticket')
+
+# process_signal results that are not remembered - a retry gets processed again
+_UNCACHED_STATUSES = ('error', 'invalid', 'unknown_action', 'unknown_phase')
+
+def idempotency_key(data: Dict, explicit_key: Optional[str] = None) -> Optional[str]:
+    """
+    Build the dedup key for a webhook payload
+    Priority: explicit header → payload 'idempotency_key' → hash of
+    symbol/action/timeframe/bar time (or EA ticket)
+    Returns None when none of those exist - the payload is not deduplicated
+    """
+    key = explicit_key or data.get('idempotency_key')
+    if key:
+        return str(key)
+
+    if not any(data.get(field) is not None for field in _IDENTITY_FIELDS):
+        # The same alert on the next bar looks identical - cannot tell a retry from a new signal
+        return None
+
+    material = '|'.join(str(data.get(field, '')).upper() for field in _KEY_FIELDS)
+    return hashlib.blake2b(material.encode('utf-8'), digest_size=16).hexdigest()
+
+class IdempotencyCache:
+    """
+    Bounded TTL map of idempotency key → first result
+    O(1) get/put; never holds more than max_entries results
+    Entries stay in insertion order, which is also expiry order (one TTL for all),
+    so expiry and eviction both pop from the front - a hit does not extend its window
+    """
+
+    def __init__(self, max_entries: int = Config.DEDUP_MAX_ENTRIES,
+                 ttl_seconds: float = Config.DEDUP_TTL_SECONDS, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()  # key → (expires_at, result)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for a duplicate, or None (and count a miss)"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, result: Any):
+        """Remember the result for a key, evicting expired then oldest entries"""
+        if self.max_entries <= 0:
+            return
+        now = self._clock()
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, result)
+            self._entries.move_to_end(key)
+            self._expire(now)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _expire(self, now: float):
+        # Oldest entries sit at the front; stop at the first live one
+        while self._entries:
+            oldest_key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                return
+            del self._entries[oldest_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups * 100) if lookups > 0 else 0,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds
+        }
+
+def process_once(bot, cache: IdempotencyCache, data, explicit_key: Optional[str] = None):
+    """
+    Run a payload through bot.process_signal unless it duplicates a recent one
+    Only successful results are cached; payloads without a key are always processed
+    Returns: (result, is_duplicate)
+    """
+    if not isinstance(data, dict):
+        return bot.process_signal(data), False
+
+    key = idempotency_key(data, explicit_key)
+    if key is None:
+        logging.debug(f"No idempotency key or bar time for {data.get('action')} - not deduplicated")
+        return bot.process_signal(data), False
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached, True
+
+    result = bot.process_signal(data)
+    if not (isinstance(result, dict) and result.get('status') in _UNCACHED_STATUSES):
+        cache.put(key, result)
+    return result, False
@@ -0,0 +1,101 @@
+"""
+Event Stream - Server-Sent Events Broadcaster
+The bot publishes state deltas and trade events once; every /events
+subscriber reads them from a shared replay buffer and can resume with
+Last-Event-ID after a reconnect
+"""
+
+import json
+import threading
+import uuid
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+class EventBroadcaster:
+    """
+    Bounded, ordered buffer of published events
+    Event ids are "<stream id>-<n>": an id from another process or one that
+    has already left the buffer cannot be resumed and needs a full snapshot
+    """
+
+    def __init__(self, buffer_size: int = Config.EVENT_STREAM_BUFFER):
+        self.stream_id = uuid.uuid4().hex[:8]
+        self._events = deque(maxlen=buffer_size)  # (n, event name, JSON data)
+        self._next = 1
+        self._condition = threading.Condition()
+
+    def publish(self, event: str, data: Dict) -> str:
+        """Encode once and wake every waiting subscriber; returns the event id"""
+        payload = json.dumps(data, default=str)
+        with self._condition:
+            n = self._next
+            self._next += 1
+            self._events.append((n, event, payload))
+            self._condition.notify_all()
+        return self.event_id(n)
+
+    def event_id(self, n: int) -> str:
+        return f"{self.stream_id}-{n}"
+
+    @property
+    def last_id(self) -> str:
+        """Id of the newest published event (n=0 before the first one)"""
+        with self._condition:
+            return self.event_id(self._next - 1)
+
+    def _position(self, last_event_id: Optional[str]) -> Optional[int]:
+        """Sequence number to continue after, or None when the client must resync"""
+        if not last_event_id:
+            return None
+        stream_id, _, n = last_event_id.rpartition('-')
+        if stream_id != self.stream_id or not n.isdigit():
+            return None
+        n = int(n)
+        oldest = self._events[0][0] if self._events else self._next
+        if n >= self._next or n < oldest - 1:
+            return None
+        return n
+
+    def can_resume(self, last_event_id: Optional[str]) -> bool:
+        with self._condition:
+            return self._position(last_event_id) is not None
+
+    def wait(self, last_event_id: str, timeout: float) -> Optional[List[Tuple[str, str, str]]]:
+        """
+        Events published after last_event_id as (id, event, data), blocking up to timeout
+        Returns [] on timeout, None when last_event_id can no longer be resumed
+        """
+        with self._condition:
+            position = self._position(last_event_id)
+            if position is None:
+                return None
+            if position == self._next - 1:
+                self._condition.wait(timeout)
+                position = self._position(last_event_id)
+                if position is None:
+                    return None
+            skip = position - (self._events[0][0] - 1) if self._events else 0
+            return [(self.event_id(n), event, payload)
+                    for n, event, payload in islice(self._events, skip, None)]
+
+    def get_stats(self) -> Dict:
+        with self._condition:
+            return {
+                'stream_id': self.stream_id,
+                'published': self._next - 1,
+                'buffered': len(self._events),
+                'buffer_size': self._events.maxlen
+            }
+
+def format_sse(event_id: Optional[str], event: str, data: str, retry_ms: Optional[int] = None) -> str:
+    """One text/event-stream message"""
+    lines = []
+    if retry_ms is not None:
+        lines.append(f"retry: {retry_ms}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.splitlines())
+    return '\n'.join(lines) + '\n\n'
@@ -0,0 +1,256 @@
+"""
+Indicators - Streaming EMA / RSI / SMA Matching strategy.pine
+One bar-close update advances every symbol at once: state is kept as one
+array per quantity (struct of arrays) and each step is O(1) per symbol
+Warm-up follows Pine: ta.ema and ta.rma start from the SMA of their first
+`length` inputs and are NaN (na) before that
+"""
+
+import numpy as np
+from typing import Dict, Sequence, Tuple, Union
+
+Lengths = Union[int, Sequence[int]]
+
+class _Smoothed:
+    """Pine-style exponential average with per-column lengths: x·α + prev·(1-α), SMA-seeded"""
+
+    def __init__(self, lengths: Lengths, count: int, wilder: bool = False):
+        self.length = np.broadcast_to(np.asarray(lengths, dtype=np.int64), (count,)).copy()
+        self.alpha = 1.0 / self.length if wilder else 2.0 / (self.length + 1)
+        self._decay = 1 - self.alpha
+        self.value = np.full(count, np.nan)
+        self._seed = np.zeros(count)
+        self._count = np.zeros(count, dtype=np.int64)  # Inputs seen
+        self.warm = False  # Every column past its seed - no masking needed
+
+    def update(self, x: np.ndarray, mask: np.ndarray, every: bool = False):
+        if every and self.warm:
+            self.value = self.alpha * x + self._decay * self.value  # Same float ops as the masked path
+            return
+        self._count[mask] += 1
+        warming = mask & (self._count <= self.length)
+        self._seed[warming] += x[warming]
+        seeded = warming & (self._count == self.length)
+        self.value[seeded] = self._seed[seeded] / self.length[seeded]
+        rolling = mask & (self._count > self.length)
+        self.value[rolling] = self.alpha[rolling] * x[rolling] + self._decay[rolling] * self.value[rolling]
+        self.warm = bool((self._count > self.length).all())
+
+    def reset(self, mask: np.ndarray):
+        self.value[mask] = np.nan
+        self._seed[mask] = 0.0
+        self._count[mask] = 0
+        self.warm = False
+
+class IndicatorEngine:
+    """
+    EMA(fast/slow/trend), Wilder RSI and SMA(volume) for many symbols (columns)
+    - update(closes, volumes): one bar close per column; NaN close = no bar for that column
+    - lengths may be one int or one per column, so a parameter grid can run as columns
+    - signals(): strategy.pine buy/sell conditions for the latest bar, except the
+      "no open position" rule, which belongs to whoever holds the positions
+    """
+
+    def __init__(self, symbols: Sequence[str], fast: Lengths = 9, slow: Lengths = 21, trend: Lengths = 200,
+                 rsi_length: Lengths = 14, volume_length: int = 20,
+                 rsi_buy_max: float = 60.0, rsi_sell_min: float = 40.0, volume_factor: float = 1.2):
+        self.symbols = list(symbols)
+        self.index: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        n = len(self.symbols)
+
+        self._fast = _Smoothed(fast, n)
+        self._slow = _Smoothed(slow, n)
+        self._trend = _Smoothed(trend, n)
+        self._gain = _Smoothed(rsi_length, n, wilder=True)
+        self._loss = _Smoothed(rsi_length, n, wilder=True)
+        self.rsi = np.full(n, np.nan)
+
+        self.volume_length = volume_length
+        self._volumes = np.zeros((volume_length, n))  # Ring buffer of the last volume_length volumes
+        self._volume_sum = np.zeros(n)
+        self._volume_count = np.zeros(n, dtype=np.int64)
+        self._aligned = True  # No column has missed a bar - all share one ring slot
+        self.volume_sma = np.full(n, np.nan)
+
+        self.close = np.full(n, np.nan)
+        self.volume = np.full(n, np.nan)
+        self._previous_fast = np.full(n, np.nan)
+        self._previous_slow = np.full(n, np.nan)
+        self.bars = np.zeros(n, dtype=np.int64)
+        self._seen_all = False  # Every column has a previous close
+
+        self.rsi_buy_max = rsi_buy_max
+        self.rsi_sell_min = rsi_sell_min
+        self.volume_factor = volume_factor
+
+    @property
+    def ema_fast(self) -> np.ndarray:
+        return self._fast.value
+
+    @property
+    def ema_slow(self) -> np.ndarray:
+        return self._slow.value
+
+    @property
+    def ema_trend(self) -> np.ndarray:
+        return self._trend.value
+
+    def update(self, closes: Sequence[float], volumes: Sequence[float] = None):
+        """Advance every column that has a bar (non-NaN close) by one bar"""
+        closes = np.asarray(closes, dtype=np.float64)
+        volumes = np.zeros_like(closes) if volumes is None else np.asarray(volumes, dtype=np.float64)
+        mask = ~np.isnan(closes)
+        every = bool(mask.all())  # The common case - unmasked array ops, same arithmetic
+        if not every:
+            self._aligned = False
+
+        np.copyto(self._previous_fast, self._fast.value, where=mask)
+        np.copyto(self._previous_slow, self._slow.value, where=mask)
+        self._fast.update(closes, mask, every)
+        self._slow.update(closes, mask, every)
+        self._trend.update(closes, mask, every)
+
+        # RSI: ta.change is na on the first bar, so the RMAs start one bar later
+        moved_every = every and self._seen_all
+        moved = mask if moved_every else mask & ~np.isnan(self.close)
+        change = closes - self.close if moved_every else np.where(moved, closes - np.where(moved, self.close, 0.0), 0.0)
+        self._gain.update(np.maximum(change, 0.0), moved, moved_every)
+        self._loss.update(np.maximum(-change, 0.0), moved, moved_every)
+        gain, loss = self._gain.value, self._loss.value
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = np.where(loss == 0, 100.0, np.where(gain == 0, 0.0, 100.0 - 100.0 / (1.0 + gain / loss)))
+        if not (self._gain.warm and self._loss.warm):
+            rsi[np.isnan(gain) | np.isnan(loss)] = np.nan
+        np.copyto(self.rsi, rsi, where=mask)
+
+        self._update_volume(volumes, mask)
+        np.copyto(self.close, closes, where=mask)
+        np.copyto(self.volume, volumes, where=mask)
+        self.bars += mask
+        if not self._seen_all:
+            self._seen_all = bool(self.bars.all())
+
+    def _update_volume(self, volumes: np.ndarray, mask: np.ndarray):
+        """Rolling SMA through a per-column ring buffer"""
+        length = self.volume_length
+        if self._aligned:
+            # Every column has seen every bar - one shared ring slot
+            slot = int(self._volume_count[0]) % length
+            self._volume_sum += volumes - self._volumes[slot]
+            self._volumes[slot] = volumes
+            self._volume_count += 1
+            if slot == length - 1:
+                self._volume_sum = self._volumes.sum(axis=0)  # Re-add the window so the running sum cannot drift
+            if self._volume_count[0] >= length:
+                self.volume_sma = self._volume_sum / length
+            return
+
+        slot = self._volume_count % length
+        columns = np.flatnonzero(mask)
+        rows = slot[columns]
+        self._volume_sum[columns] += volumes[columns] - self._volumes[rows, columns]
+        self._volumes[rows, columns] = volumes[columns]
+        self._volume_count[columns] += 1
+
+        # Re-add the window whenever a column wraps so the running sum cannot drift
+        wrapped = columns[rows == length - 1]
+        if len(wrapped):
+            self._volume_sum[wrapped] = self._volumes[:, wrapped].sum(axis=0)
+
+        full = columns[self._volume_count[columns] >= length]
+        self.volume_sma[full] = self._volume_sum[full] / length
+
+    def signals(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(buy, sell) masks for the latest bar - NaN inputs never signal, as in Pine"""
+        fast, slow = self._fast.value, self._slow.value
+        crossover = (fast > slow) & (self._previous_fast <= self._previous_slow)
+        crossunder = (fast < slow) & (self._previous_fast >= self._previous_slow)
+        high_volume = self.volume > self.volume_sma * self.volume_factor
+        uptrend = (self.close > self._trend.value) & (fast > slow)
+        downtrend = (self.close < self._trend.value) & (fast < slow)
+        buy = uptrend & crossover & (self.rsi < self.rsi_buy_max) & high_volume
+        sell = downtrend & crossunder & (self.rsi > self.rsi_sell_min) & high_volume
+        return buy, sell
+
+    def reset(self, symbols: Sequence[str] = None):
+        """Forget history (e.g. after a data gap); all columns when symbols is None"""
+        mask = np.zeros(len(self.symbols), dtype=bool)
+        if symbols is None:
+            mask[:] = True
+        else:
+            mask[[self.index[symbol] for symbol in symbols]] = True
+        for smoothed in (self._fast, self._slow, self._trend, self._gain, self._loss):
+            smoothed.reset(mask)
+        for array in (self.rsi, self.volume_sma, self.close, self.volume, self._previous_fast, self._previous_slow):
+            array[mask] = np.nan
+        self._volumes[:, mask] = 0.0
+        self._volume_sum[mask] = 0.0
+        self._volume_count[mask] = 0
+        self._aligned = not self._volume_count.any()
+        self.bars[mask] = 0
+        self._seen_all = False
+
+    def snapshot(self, symbol: str) -> Dict:
+        """Latest indicator values for one symbol (None while warming up)"""
+        i = self.index[symbol]
+        values = {
+            'close': self.close[i],
+            'ema_fast': self._fast.value[i],
+            'ema_slow': self._slow.value[i],
+            'ema_trend': self._trend.value[i],
+            'rsi': self.rsi[i],
+            'volume_sma': self.volume_sma[i]
+        }
+        return {'bars': int(self.bars[i]), **{key: None if np.isnan(value) else float(value) for key, value in values.items()}}
+
+# ----------------------------------------------------------------------
+# Whole-series versions for backtests - same arithmetic as IndicatorEngine
+# ----------------------------------------------------------------------
+
+def _smoothed_series(values: np.ndarray, length: int, alpha: float) -> np.ndarray:
+    """SMA seed over the first `length` values, then x·α + prev·(1-α); NaN before the seed"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) < length:
+        return out
+    seed = 0.0
+    for value in values[:length].tolist():
+        seed += value
+    previous = seed / length
+    out[length - 1] = previous
+    decay = 1 - alpha
+    tail = values[length:].tolist()
+    smoothed = [0.0] * len(tail)
+    for i, value in enumerate(tail):  # A recurrence - one pass over plain floats
+        previous = alpha * value + decay * previous
+        smoothed[i] = previous
+    out[length:] = smoothed
+    return out
+
+def ema(values: np.ndarray, length: int) -> np.ndarray:
+    """ta.ema"""
+    return _smoothed_series(values, length, 2.0 / (length + 1))
+
+def rma(values: np.ndarray, length: int) -> np.ndarray:
+    """ta.rma (Wilder smoothing)"""
+    return _smoothed_series(values, length, 1.0 / length)
+
+def rsi(values: np.ndarray, length: int) -> np.ndarray:
+    """ta.rsi - NaN on the first `length` bars"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    change = np.diff(values)
+    gain = rma(np.maximum(change, 0.0), length)
+    loss = rma(np.maximum(-change, 0.0), length)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out[1:] = np.where(loss == 0, 100.0, np.where(gain == 0, 0.0, 100.0 - 100.0 / (1.0 + gain / loss)))
+    out[1:][np.isnan(gain)] = np.nan
+    return out
+
+def sma(values: np.ndarray, length: int) -> np.ndarray:
+    """ta.sma over a sliding window - NaN on the first length-1 bars"""
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(len(values), np.nan)
+    if len(values) >= length:
+        out[length - 1:] = np.lib.stride_tricks.sliding_window_view(values, length).sum(axis=1) / length
+    return out
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Load Generator - Concurrent Webhook Traffic With a Latency Report
+Replays a signal mix against profitable_app at a fixed rate (open loop) or as
+fast as `concurrency` workers allow (closed loop). Each worker keeps its own
+keep-alive connection pool. With a rate, latency is measured from each
+request's scheduled send time, so a stalled server shows up as queueing
+delay instead of silently lowering the offered load
+'local' starts profitable_app.py in a subprocess on a free port, with its
+state, journal and logs in a temporary directory
+Reports p50/p95/p99/max latency, error rate and throughput as JSON that can
+be diffed against an earlier run
+"""
+
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import requests
+from replay import generate_events
+
+DEFAULTS = {
+    'rate': 0.0,  # Requests per second, 0 = closed loop
+    'concurrency': 16,
+    'requests': 2000,
+    'duration': 0.0,  # Seconds at `rate`, overrides requests
+    'mix': 'mixed',
+    'timeout': 10.0,
+    'out': '',  # JSON report path
+    'baseline': ''  # Earlier JSON report to compare against
+}
+
+MIXES = ('signals', 'ea', 'mixed')
+STATUS_EVERY = 5  # mixed: one GET /status per this many requests
+
+Request = Tuple[str, str, Optional[bytes], str]  # (method, path, body, label)
+
+def build_requests(mix: str, count: int, seed: int = 42) -> List[Request]:
+    """
+    count requests of a mix:
+    - signals: TradingView BUY / SELL alerts only
+    - ea: the replay.py synthetic stream - alerts, EA fills and closes, emergency stops and resets
+    - mixed: the ea stream, in full order, with a dashboard GET /status after every STATUS_EVERY - 1 events
+    """
+    if mix not in MIXES:
+        raise ValueError(f"Unknown mix {mix} (use {', '.join(MIXES)})")
+    records = generate_events(count * 2 if mix == 'signals' else count, seed=seed)
+    items = []
+    for _, kind, data in records:
+        if kind == 'reset_emergency_stop':
+            if mix != 'signals':
+                items.append(('POST', '/reset-emergency', None, 'RESET_EMERGENCY'))
+            continue
+        if mix == 'signals' and data['action'] not in ('BUY', 'SELL'):
+            continue
+        items.append(('POST', '/webhook', json.dumps(data).encode('utf-8'), data['action']))
+
+    if mix == 'mixed':
+        # Insert the reads between events - replacing events would drop fills and closes from the stream
+        status = ('GET', '/status', None, 'STATUS')
+        events, items = items, []
+        for i, item in enumerate(events, 1):
+            items.append(item)
+            if i % (STATUS_EVERY - 1) == 0:
+                items.append(status)
+    return items[:count]
+
+def _percentiles(values: np.ndarray) -> Dict:
+    if not len(values):
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None, 'mean': None}
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return {'p50': round(float(p50), 3), 'p95': round(float(p95), 3), 'p99': round(float(p99), 3),
+            'max': round(float(values.max()), 3), 'mean': round(float(values.mean()), 3)}
+
+def run_load(base_url: str, items: List[Request], rate: float = 0.0, concurrency: int = 16,
+             timeout: float = 10.0) -> Dict:
+    """Send items from concurrency worker threads and return the report (latencies in ms)"""
+    count = len(items)
+    latency = np.full(count, np.nan)  # From the scheduled send (rate) or the actual send (closed loop)
+    service = np.full(count, np.nan)  # From the actual send
+    codes = np.zeros(count, dtype=np.int32)  # HTTP status, 0 = transport error
+    failures: Dict[str, int] = {}
+    failures_lock = threading.Lock()
+    next_index = itertools.count()  # next() is atomic under the GIL - each index goes to one worker
+    headers = {'Content-Type': 'application/json'}
+
+    def worker():
+        with requests.Session() as session:
+            while True:
+                i = next(next_index)
+                if i >= count:
+                    return
+                method, path, body, _ = items[i]
+                if rate:
+                    scheduled = started + i / rate
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                sent = time.perf_counter()
+                try:
+                    response = session.request(method, base_url + path, data=body, headers=headers, timeout=timeout)
+                    codes[i] = response.status_code
+                except requests.RequestException as e:
+                    with failures_lock:
+                        failures[type(e).__name__] = failures.get(type(e).__name__, 0) + 1
+                done = time.perf_counter()
+                service[i] = (done - sent) * 1000
+                latency[i] = (done - (scheduled if rate else sent)) * 1000
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(concurrency)]
+    started_at = datetime.now().isoformat()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    errors = (codes == 0) | (codes >= 400)
+    labels = np.array([item[3] for item in items])
+    by_label = {}
+    for label in sorted(set(labels.tolist())):
+        mask = labels == label
+        by_label[label] = {'requests': int(mask.sum()), 'errors': int(errors[mask].sum()),
+                           'latency_ms': _percentiles(latency[mask])}
+
+    return {
+        'target': base_url,
+        'started_at': started_at,
+        'requests': count,
+        'concurrency': concurrency,
+        'rate': rate,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(count / elapsed, 1) if elapsed > 0 else 0.0,
+        'errors': int(errors.sum()),
+        'error_rate': round(float(errors.mean()), 5) if count else 0.0,
+        'status_codes': {str(code): int(total) for code, total in zip(*np.unique(codes, return_counts=True))},
+        'transport_errors': failures,
+        'latency_ms': _percentiles(latency),
+        'service_ms': _percentiles(service),
+        'by_label': by_label
+    }
+
+# ----------------------------------------------------------------------
+# Local server
+# ----------------------------------------------------------------------
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+class LocalServer:
+    """profitable_app.py in a subprocess with its data directories in a temporary directory"""
+
+    def __init__(self, startup_timeout: float = 30.0):
+        self.directory = tempfile.TemporaryDirectory(prefix='load-')
+        port = _free_port()
+        self.url = f"http://127.0.0.1:{port}"
+        env = {**os.environ, 'PORT': str(port), 'DEBUG': 'False'}
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profitable_app.py')
+        # Relative paths (data/state, data/trades.db, profitable_trading.log) land in the temp directory
+        self.process = subprocess.Popen([sys.executable, script], cwd=self.directory.name, env=env,
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            try:
+                if requests.get(self.url + '/health', timeout=1).ok:
+                    return
+            except requests.RequestException:
+                pass
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                self.close()
+                raise RuntimeError("profitable_app.py did not start")
+            time.sleep(0.1)
+
+    def close(self):
+        if self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.directory.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# ----------------------------------------------------------------------
+# Reporting
+# ----------------------------------------------------------------------
+
+def _ms(value) -> str:
+    return f"{value:>9.2f}" if value is not None else f"{'-':>9}"
+
+def format_report(report: Dict) -> str:
+    mode = f"{report['rate']:g} req/s" if report['rate'] else "closed loop"
+    lines = [
+        f"Requests:   {report['requests']:,} over {report['elapsed_seconds']:.2f} s "
+        f"({mode}, {report['concurrency']} workers)",
+        f"Throughput: {report['throughput_rps']:,.1f} req/s",
+        f"Errors:     {report['errors']:,} ({report['error_rate'] * 100:.2f}%) | status codes {report['status_codes']}"
+        + (f" | {report['transport_errors']}" if report['transport_errors'] else ""),
+        "",
+        f"{'latency ms':<16} | {'p50':>9} | {'p95':>9} | {'p99':>9} | {'max':>9} | {'requests':>8}",
+        "-" * 76
+    ]
+    rows = [('ALL', report['latency_ms'], report['requests'])]
+    rows += [(label, stats['latency_ms'], stats['requests']) for label, stats in report['by_label'].items()]
+    for label, stats, count in rows:
+        lines.append(f"{label:<16} | {_ms(stats['p50'])} | {_ms(stats['p95'])} | {_ms(stats['p99'])} | "
+                     f"{_ms(stats['max'])} | {count:>8,}")
+    return "\n".join(lines)
+
+def format_comparison(baseline: Dict, report: Dict) -> str:
+    """Change of the headline numbers against an earlier report"""
+    def change(before, after) -> str:
+        if before is None or after is None:
+            return "-"
+        if not before:
+            return f"{before:g} → {after:g}"
+        return f"{before:g} → {after:g} ({(after - before) / before * 100:+.1f}%)"
+
+    lines = [f"vs baseline from {baseline.get('started_at', '?')}:",
+             f"  throughput_rps  {change(baseline['throughput_rps'], report['throughput_rps'])}",
+             f"  error_rate      {change(baseline['error_rate'], report['error_rate'])}"]
+    for name in ('p50', 'p95', 'p99', 'max'):
+        lines.append(f"  latency {name:<7} {change(baseline['latency_ms'][name], report['latency_ms'][name])}")
+    return "\n".join(lines)
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python load_generator.py <local | http://host:port> [name=value ...]")
+        print(f"Options: {', '.join(f'{name}={value}' for name, value in DEFAULTS.items())} (mix: {', '.join(MIXES)})")
+        sys.exit(1)
+
+    options = dict(DEFAULTS)
+    for argument in sys.argv[2:]:
+        name, _, value = argument.partition('=')
+        if name not in DEFAULTS:
+            print(f"❌ Unknown option: {name}")
+            sys.exit(1)
+        options[name] = type(DEFAULTS[name])(value)
+
+    count = int(options['rate'] * options['duration']) if options['rate'] and options['duration'] else options['requests']
+    items = build_requests(options['mix'], count)
+    server = LocalServer() if sys.argv[1] == 'local' else None
+    base_url = server.url if server else sys.argv[1].rstrip('/')
+    try:
+        print(f"🔥 {len(items):,} '{options['mix']}' requests → {base_url}")
+        report = run_load(base_url, items, options['rate'], options['concurrency'], options['timeout'])
+    finally:
+        if server:
+            server.close()
+    report['mix'] = options['mix']
+
+    print("=" * 76)
+    print(format_report(report))
+    if options['baseline']:
+        with open(options['baseline'], 'r', encoding='utf-8') as f:
+            print()
+            print(format_comparison(json.load(f), report))
+    print("=" * 76)
+    if options['out']:
+        with open(options['out'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {options['out']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Metrics - Counters, Gauges and Histograms for /metrics
+Dependency-free registry rendered in the Prometheus text exposition format
+Recording is a dict lookup plus an add, cheap enough for the signal path
+"""
+
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from signal_schema import Action
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Latency buckets in seconds - 50µs to 1s
+DEFAULT_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+class Registry:
+    """Ordered set of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, '_Metric'] = {}
+
+    def register(self, metric: '_Metric'):
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _label_text(names: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 registry: Optional[Registry] = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._default = None if self.labelnames else self.labels()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values: str):
+        """Child for one label combination - keep a reference to it on hot paths"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+class _Value:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1.0):
+        self._default.value += amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_label_text(self.labelnames, labels)} {_format_value(child.value)}"
+                for labels, child in list(self._children.items())]
+
+class Gauge(_Metric):
+    """Value that goes up and down, or is read from a callback at scrape time"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 registry: Optional[Registry] = REGISTRY):
+        self._function: Optional[Callable[[], float]] = None
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float):
+        self._default.value = value
+
+    def set_function(self, function: Callable[[], float]):
+        """Compute the (unlabelled) value only when /metrics is scraped"""
+        self._function = function
+
+    def samples(self) -> List[str]:
+        if self._function is not None:
+            return [f"{self.name} {_format_value(self._function())}"]
+        return [f"{self.name}{_label_text(self.labelnames, labels)} {_format_value(child.value)}"
+                for labels, child in list(self._children.items())]
+
+class _HistogramValue:
+    __slots__ = ('bounds', 'counts', 'sum')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+class Histogram(_Metric):
+    """Fixed-bucket distribution; buckets are cumulated only when rendered"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS, registry: Optional[Registry] = REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), list(child.counts)):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, labels)} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, labels)} {cumulative}")
+        return lines
+
+# ----------------------------------------------------------------------
+# Signal path metrics
+# ----------------------------------------------------------------------
+
+WEBHOOK_REQUESTS = Counter('webhook_requests_total', 'Webhook payloads received', ('endpoint', 'action'))
+WEBHOOK_LATENCY = Histogram('webhook_request_seconds', 'Time spent handling /webhook requests', ('endpoint',))
+SIGNAL_LATENCY = Histogram('signal_processing_seconds', 'ProfitableTradingBot.process_signal latency', ('action',))
+SIGNALS = Counter('signals_total', 'BUY/SELL signals received by symbol', ('symbol', 'action'))
+RISK_CHECKS = Counter('risk_checks_total', 'RiskManager.check_trade_allowed results', ('result',))
+RISK_REJECTIONS = Counter('risk_rejections_total', 'Trades blocked per risk rule', ('rule',))
+TRADE_HISTORY_EVENTS = Gauge('trade_history_events', 'Trade history events held in memory')
+TRADE_HISTORY_TOTAL = Gauge('trade_history_total_events', 'Trade history events in memory plus archived segments')
+
+_ACTION_LABELS = frozenset(action.value for action in Action)
+
+def action_label(action) -> str:
+    """Bounded label for a raw payload action"""
+    value = str(action or '').strip().upper()
+    return value if value in _ACTION_LABELS else 'UNKNOWN'
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo - Risk of Ruin Under the Bot's Risk Limits
+Bootstraps trade returns (profit_percent, as the EA reports them) and daily
+trade counts from the trade journal or a backtest, then replays 100k
+synthetic trading histories through the same limits the bot applies:
+- the daily_stats limits: EA_MAX_DAILY_TRADES, EA_MAX_DAILY_LOSS_PERCENT,
+  EA_MAX_CONSECUTIVE_LOSSES (all reset at the start of each day)
+- RiskManager Rules 1-3: MAX_DAILY_LOSS, MAX_DAILY_TRADES (reset daily) and
+  MAX_CONSECUTIVE_LOSSES (only a win resets it)
+profit_percent is percent of ACCOUNT_BALANCE throughout, as the EA reports
+it; backtest returns (percent price moves) are converted on load through the
+position RiskManager would size
+Paths are simulated in chunks as arrays: one vector step per trade slot of
+each day across every path of the chunk, so memory is O(chunk_size)
+"""
+
+import sys
+import time
+from datetime import date, datetime
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+from config import Config
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+def default_limits() -> Dict:
+    """Current Config values - override any of them to try other limits"""
+    return {
+        'account_balance': Config.ACCOUNT_BALANCE,
+        'risk_percent': Config.RISK_PERCENT,
+        'stop_loss_percent': Config.STOP_LOSS_PERCENT,
+        'max_position_percent': Config.MAX_POSITION_PERCENT,
+        'max_daily_loss': Config.MAX_DAILY_LOSS,
+        'max_daily_trades': Config.MAX_DAILY_TRADES,
+        'max_consecutive_losses': Config.MAX_CONSECUTIVE_LOSSES,
+        'ea_max_daily_trades': Config.EA_MAX_DAILY_TRADES,
+        'ea_max_daily_loss_percent': Config.EA_MAX_DAILY_LOSS_PERCENT,
+        'ea_max_consecutive_losses': Config.EA_MAX_CONSECUTIVE_LOSSES,
+        'reset_consecutive_daily': False  # True = an operator calls the consecutive-loss reset every morning
+    }
+
+# Rules in the order the bot checks them; the first that blocks a trade is charged with it
+RULES = (
+    'ea_daily_trades',
+    'ea_daily_loss',
+    'ea_consecutive_losses',
+    'daily_loss_limit',
+    'daily_trade_limit',
+    'consecutive_losses'
+)
+
+# ----------------------------------------------------------------------
+# Trade samples
+# ----------------------------------------------------------------------
+
+def daily_counts(days: Sequence[int]) -> np.ndarray:
+    """Trades per calendar day from first to last trade day, days without trades included"""
+    days = np.asarray(days, dtype=np.int64)
+    if not len(days):
+        return np.zeros(1, dtype=np.int64)
+    return np.bincount(days - days.min())
+
+def load_journal_trades(path: str = Config.TRADE_JOURNAL_PATH) -> Tuple[np.ndarray, np.ndarray]:
+    """(profit_percent, day ordinal) of every TRADE_CLOSED event in the journal"""
+    from trade_journal import TradeJournal
+    journal = TradeJournal(path)
+    returns, days = [], []
+    cursor = None
+    try:
+        while True:
+            events, cursor = journal.query(action='TRADE_CLOSED', cursor=cursor, limit=Config.MAX_TRADES_PAGE)
+            for event in events:
+                returns.append(float(event['profit_percent']))
+                days.append(datetime.fromisoformat(event['timestamp']).date().toordinal())
+            if cursor is None:
+                break
+    finally:
+        journal.close()
+    return np.array(returns), np.array(days, dtype=np.int64)
+
+def position_value(limits: Dict) -> float:
+    """RiskManager._calculate_position_size: units × price = min(risk / stop loss %, max position value)"""
+    return limits['account_balance'] * min(limits['risk_percent'] / limits['stop_loss_percent'],
+                                           limits['max_position_percent'] / 100)
+
+def backtest_trades(bars, result: Dict, limits: Optional[Dict] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (profit_percent, day ordinal) of the closed trades of a backtester.run_backtest result
+    Price moves are scaled to percent of the account for a position sized like RiskManager's
+    """
+    limits = {**default_limits(), **(limits or {})}
+    trades = result['trades']
+    moves = trades['direction'] * (trades['exit_price'] - trades['entry_price']) / trades['entry_price'] * 100
+    returns = moves * position_value(limits) / limits['account_balance']
+    days = bars.time[trades['exit_bar']] // 86400 + date(1970, 1, 1).toordinal()
+    return returns, days
+
+# ----------------------------------------------------------------------
+# Simulation
+# ----------------------------------------------------------------------
+
+def simulate(returns: Sequence[float], counts: Sequence[int], limits: Optional[Dict] = None,
+             paths: int = 100_000, days: int = 252, ruin_percent: float = 50.0,
+             chunk_size: int = 20_000, seed: int = 42) -> Dict:
+    """
+    Simulate paths of days trading days
+    returns: trade returns in percent of the account to resample; counts: trades-per-day samples
+    ruin_percent: drawdown from the starting balance, in percent, that counts as ruin
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.int64)
+    if not len(returns):
+        raise ValueError("No trade returns to resample")
+    limits = {**default_limits(), **(limits or {})}
+    balance = limits['account_balance']
+    ruin_level = -balance * ruin_percent / 100
+
+    rng = np.random.default_rng(seed)
+    outcome = {name: [] for name in ('ruined', 'ruin_day', 'final', 'max_drawdown', 'taken', 'blocked')}
+    first_hit = {rule: [] for rule in RULES}
+
+    for first in range(0, paths, chunk_size):
+        n = min(chunk_size, paths - first)
+        chunk = _simulate_chunk(rng, returns, counts, limits, n, days, ruin_level)
+        for name in outcome:
+            outcome[name].append(chunk[name])
+        for rule in RULES:
+            first_hit[rule].append(chunk['first_hit'][rule])
+
+    outcome = {name: np.concatenate(values) for name, values in outcome.items()}
+    first_hit = {rule: np.concatenate(values) for rule, values in first_hit.items()}
+    return _summarize(outcome, first_hit, limits, paths, days, ruin_percent, position_value(limits), len(returns))
+
+def _simulate_chunk(rng: np.random.Generator, returns: np.ndarray, counts: np.ndarray, limits: Dict,
+                    n: int, days: int, ruin_level: float) -> Dict:
+    balance = limits['account_balance']
+    equity = np.zeros(n)  # P&L since the start
+    peak = np.zeros(n)
+    max_drawdown = np.zeros(n)
+    ruined = np.zeros(n, dtype=bool)
+    ruin_day = np.full(n, np.nan)
+    consecutive = np.zeros(n, dtype=np.int64)  # RiskManager counter - survives the day change
+    taken = np.zeros(n, dtype=np.int64)
+    blocked = np.zeros(n, dtype=np.int64)
+    first_hit = {rule: np.full(n, np.nan) for rule in RULES}
+
+    for day in range(days):
+        signals = counts[rng.integers(0, len(counts), n)]
+        ea_trades = np.zeros(n, dtype=np.int64)
+        ea_pnl = np.zeros(n)
+        ea_consecutive = np.zeros(n, dtype=np.int64)
+        daily_loss = np.zeros(n)
+        daily_trades = np.zeros(n, dtype=np.int64)
+        if limits['reset_consecutive_daily']:
+            consecutive[:] = 0
+
+        for slot in range(int(signals.max())):
+            active = (signals > slot) & ~ruined
+            if not active.any():
+                break
+            allowed = active
+            for rule, hit in (
+                ('ea_daily_trades', ea_trades >= limits['ea_max_daily_trades']),
+                ('ea_daily_loss', ea_pnl <= -limits['ea_max_daily_loss_percent']),
+                ('ea_consecutive_losses', ea_consecutive >= limits['ea_max_consecutive_losses']),
+                ('daily_loss_limit', daily_loss >= limits['max_daily_loss']),
+                ('daily_trade_limit', daily_trades >= limits['max_daily_trades']),
+                ('consecutive_losses', consecutive >= limits['max_consecutive_losses'])
+            ):
+                stopped = allowed & hit
+                if stopped.any():
+                    never = stopped & np.isnan(first_hit[rule])
+                    first_hit[rule][never] = day + 1
+                    allowed = allowed & ~hit
+            blocked += active & ~allowed
+
+            trading = np.flatnonzero(allowed)
+            if not len(trading):
+                continue
+            profit_percent = returns[rng.integers(0, len(returns), len(trading))]
+            loss = profit_percent < 0  # RiskManager: pnl < 0 is a loss, 0 counts as a win
+            ea_loss = profit_percent <= 0  # EA: is_win = profit > 0
+
+            taken[trading] += 1
+            ea_trades[trading] += 1
+            ea_pnl[trading] += profit_percent
+            ea_consecutive[trading] = np.where(ea_loss, ea_consecutive[trading] + 1, 0)
+            daily_trades[trading] += 1
+            pnl = profit_percent / 100 * balance
+            daily_loss[trading] += np.where(loss, -pnl, 0.0)
+            consecutive[trading] = np.where(loss, consecutive[trading] + 1, 0)
+
+            equity[trading] += pnl
+            peak[trading] = np.maximum(peak[trading], equity[trading])
+            max_drawdown[trading] = np.maximum(max_drawdown[trading], peak[trading] - equity[trading])
+            broke = np.zeros(n, dtype=bool)
+            broke[trading] = equity[trading] <= ruin_level
+            broke &= ~ruined
+            ruined |= broke
+            ruin_day[broke] = day + 1
+
+    return {
+        'ruined': ruined, 'ruin_day': ruin_day, 'final': equity, 'max_drawdown': max_drawdown,
+        'taken': taken, 'blocked': blocked, 'first_hit': first_hit
+    }
+
+def _percentiles(values: np.ndarray) -> Dict[str, Optional[float]]:
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return {f"p{q}": None for q in PERCENTILES}
+    return {f"p{q}": float(value) for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+def _summarize(outcome: Dict, first_hit: Dict, limits: Dict, paths: int, days: int, ruin_percent: float,
+               position_value: float, samples: int) -> Dict:
+    balance = limits['account_balance']
+    drawdown_percent = outcome['max_drawdown'] / balance * 100
+    return {
+        'paths': paths,
+        'days': days,
+        'trade_samples': samples,
+        'limits': limits,
+        'position_value': position_value,
+        'ruin_percent': ruin_percent,
+        'risk_of_ruin': float(outcome['ruined'].mean()),
+        'days_to_ruin': _percentiles(outcome['ruin_day']),
+        'max_drawdown_percent': {**_percentiles(drawdown_percent), 'p99': float(np.percentile(drawdown_percent, 99)),
+                                 'max': float(drawdown_percent.max())},
+        'final_return_percent': _percentiles(outcome['final'] / balance * 100),
+        'trades_taken': float(outcome['taken'].mean()),
+        'trades_blocked': float(outcome['blocked'].mean()),
+        # Share of paths where the rule blocked at least one trade, and the day it first did
+        'limits_hit': {rule: {'probability': float((~np.isnan(first_hit[rule])).mean()),
+                              'days_to_limit': _percentiles(first_hit[rule])}
+                       for rule in RULES}
+    }
+
+def format_report(report: Dict) -> str:
+    def row(values: Dict) -> str:
+        return " ".join(f"{name}={'-' if value is None else f'{value:.1f}'}" for name, value in values.items())
+
+    lines = [
+        f"Paths: {report['paths']:,} x {report['days']} days, {report['trade_samples']:,} trade returns resampled",
+        f"Position value: ${report['position_value']:.2f} per trade",
+        f"Risk of ruin ({report['ruin_percent']:g}% drawdown): {report['risk_of_ruin'] * 100:.3f}%",
+        f"Days to ruin:          {row(report['days_to_ruin'])}",
+        f"Max drawdown %:        {row(report['max_drawdown_percent'])}",
+        f"Final return %:        {row(report['final_return_percent'])}",
+        f"Trades per path:       {report['trades_taken']:.1f} taken, {report['trades_blocked']:.1f} blocked",
+        "",
+        f"{'Limit':<24}| {'hit %':>7} | days to first block"
+    ]
+    for rule, hit in report['limits_hit'].items():
+        lines.append(f"{rule:<24}| {hit['probability'] * 100:>7.2f} | {row(hit['days_to_limit'])}")
+    return "\n".join(lines)
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('journal', 'backtest'):
+        print("Usage: python monte_carlo.py journal [journal.db]")
+        print("       python monte_carlo.py backtest <data_dir> <SYMBOL> [timeframe]")
+        sys.exit(1)
+
+    if sys.argv[1] == 'journal':
+        returns, days = load_journal_trades(sys.argv[2] if len(sys.argv) > 2 else Config.TRADE_JOURNAL_PATH)
+        source = "journal"
+    else:
+        from backtester import run_backtest
+        from optimizer import load_symbols
+        symbol = sys.argv[3].upper()
+        timeframe = sys.argv[4] if len(sys.argv) > 4 else '15m'
+        data = load_symbols(sys.argv[2], timeframe, [symbol])
+        if symbol not in data:
+            print(f"❌ No {symbol} {timeframe} data found in {sys.argv[2]}")
+            sys.exit(1)
+        returns, days = backtest_trades(data[symbol], run_backtest(data[symbol]))
+        source = f"{symbol} {timeframe} backtest"
+
+    if not len(returns):
+        print(f"❌ No closed trades in the {source}")
+        sys.exit(1)
+
+    print(f"🎲 Monte Carlo risk of ruin from the {source}")
+    print("=" * 72)
+    started = time.perf_counter()
+    report = simulate(returns, daily_counts(days))
+    print(format_report(report))
+    print("=" * 72)
+    print(f"⏱️  {time.perf_counter() - started:.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Optimizer - Parallel Parameter Sweep Over the Backtester
+OHLCV arrays are copied into shared memory once; worker processes attach to
+them and run parameter combinations from a process pool. Each worker keeps an
+indicator cache per symbol, so a series that depends on one parameter
+(EMA(200), RSI(14), ...) is computed once per process, not once per combination
+Results stream back as they finish into a ResultsTable sorted by any metric
+"""
+
+import bisect
+import itertools
+import os
+import sys
+import time
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from backtester import DEFAULT_PARAMS, Bars, load_ohlcv, run_backtest
+from bar_store import BarStore
+
+SYMBOLS = ['EURUSD', 'GBPUSD', 'USDJPY', 'AUDUSD', 'EURJPY', 'GBPJPY', 'EURGBP']
+
+DEFAULT_GRID = {
+    'ema_fast': [5, 9, 13],
+    'ema_slow': [21, 34, 55],
+    'ema_trend': [100, 200],
+    'rsi_length': [14],
+    'stop_loss_pct': [1.0, 1.5, 2.0, 3.0],
+    'take_profit_pct': [2.0, 3.0, 4.0, 6.0]
+}
+
+METRICS = ('total_trades', 'win_rate', 'profit_factor', 'net_profit', 'net_profit_percent', 'max_drawdown_percent')
+COLUMNS = ('time', 'open', 'high', 'low', 'close', 'volume')
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict]:
+    """Every combination of the grid values; combinations with ema_fast >= ema_slow are skipped"""
+    names = list(grid)
+    combos = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+    return [combo for combo in combos
+            if combo.get('ema_fast', DEFAULT_PARAMS['ema_fast']) < combo.get('ema_slow', DEFAULT_PARAMS['ema_slow'])]
+
+def load_symbols(directory: str, timeframe: str = '15m', symbols: Sequence[str] = SYMBOLS) -> Dict[str, Bars]:
+    """
+    Bars per symbol from a BarStore rooted at directory (memory-mapped), else from
+    <directory>/<SYMBOL>_<timeframe>.npz (or .csv); missing symbols are skipped
+    """
+    store = BarStore(directory)
+    data = {}
+    for symbol in symbols:
+        if store.has(symbol, timeframe):
+            data[symbol] = store.open(symbol, timeframe).bars()
+            continue
+        for extension in ('.npz', '.csv'):
+            path = os.path.join(directory, f"{symbol}_{timeframe}{extension}")
+            if os.path.exists(path):
+                data[symbol] = load_ohlcv(path)
+                break
+    return data
+
+class ResultsTable:
+    """Sweep results kept sorted by one metric as they arrive"""
+
+    def __init__(self, sort_by: str = 'profit_factor', descending: bool = True):
+        self.sort_by = sort_by
+        self.descending = descending
+        self._rows: List[Dict] = []
+        self._keys: List[float] = []  # Sort key of each row, parallel to _rows (bisect has no key= before 3.10)
+
+    def _key(self, row: Dict):
+        value = row[self.sort_by]
+        return -value if self.descending else value
+
+    def add(self, row: Dict):
+        key = self._key(row)
+        index = bisect.bisect_right(self._keys, key)
+        self._keys.insert(index, key)
+        self._rows.insert(index, row)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def rows(self, sort_by: Optional[str] = None, descending: Optional[bool] = None) -> List[Dict]:
+        """All rows, re-sorted when sort_by / descending differ from the table's own order"""
+        if sort_by in (None, self.sort_by) and descending in (None, self.descending):
+            return list(self._rows)
+        sort_by = sort_by or self.sort_by
+        descending = self.descending if descending is None else descending
+        return sorted(self._rows, key=lambda row: row[sort_by], reverse=descending)
+
+    def top(self, count: int = 10, sort_by: Optional[str] = None) -> List[Dict]:
+        return self.rows(sort_by)[:count]
+
+    def format(self, count: int = 20, sort_by: Optional[str] = None) -> str:
+        rows = self.top(count, sort_by)
+        if not rows:
+            return "(no results)"
+        params = [name for name in rows[0]['params']]
+        header = ['symbol'] + params + list(METRICS)
+        lines = [" | ".join(f"{name:>12}" for name in header), "-" * (15 * len(header))]
+        for row in rows:
+            values = [row['symbol']] + [row['params'][name] for name in params] + [row[name] for name in METRICS]
+            lines.append(" | ".join(f"{value:>12.2f}" if isinstance(value, float) else f"{value:>12}" for value in values))
+        return "\n".join(lines)
+
+    def to_csv(self, path: str):
+        rows = self.rows()
+        params = list(rows[0]['params']) if rows else []
+        with open(path, 'w') as f:
+            f.write(",".join(['symbol'] + params + list(METRICS)) + "\n")
+            for row in rows:
+                f.write(",".join(str(value) for value in
+                                 [row['symbol']] + [row['params'][name] for name in params] + [row[name] for name in METRICS]) + "\n")
+
+# ----------------------------------------------------------------------
+# Shared memory and workers
+# ----------------------------------------------------------------------
+
+class SharedBars:
+    """One shared-memory block per symbol holding its OHLCV columns as a (6, bars) float64 array"""
+
+    def __init__(self, data: Dict[str, Bars]):
+        self.blocks: Dict[str, SharedMemory] = {}
+        self.specs = []  # (symbol, block name, bars) - all a worker needs to attach
+        try:
+            for symbol, bars in data.items():
+                block = SharedMemory(create=True, size=max(len(bars), 1) * len(COLUMNS) * 8)
+                self.blocks[symbol] = block
+                array = np.ndarray((len(COLUMNS), len(bars)), dtype=np.float64, buffer=block.buf)
+                for row, column in enumerate(COLUMNS):
+                    array[row] = getattr(bars, column)
+                self.specs.append((symbol, block.name, len(bars)))
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Per-process worker state
+_blocks: Dict[str, SharedMemory] = {}
+_bars: Dict[str, Bars] = {}
+_caches: Dict[str, Dict] = {}
+
+def attach_shared(specs):
+    """Pool initializer: map every symbol's shared block without copying it"""
+    for symbol, name, count in specs:
+        block = SharedMemory(name=name)
+        _blocks[symbol] = block
+        array = np.ndarray((len(COLUMNS), count), dtype=np.float64, buffer=block.buf)
+        _bars[symbol] = Bars(*array)
+        _caches[symbol] = {}
+
+def detach_shared():
+    _bars.clear()
+    _caches.clear()
+    for block in _blocks.values():
+        block.close()
+    _blocks.clear()
+
+def shared_bars(symbol: str) -> Tuple[Bars, Dict]:
+    """Inside a task: the symbol's bars and this process's indicator cache for them"""
+    return _bars[symbol], _caches[symbol]
+
+def run_shared(data: Dict[str, Bars], function: Callable, tasks: List, workers: Optional[int] = None,
+               chunksize: Optional[int] = None) -> Iterator:
+    """
+    Put data in shared memory and yield function(task) for every task in completion order
+    function must be a module-level function that reads bars through shared_bars()
+    """
+    workers = workers or os.cpu_count() or 1
+    with SharedBars(data) as shared:
+        if workers == 1:
+            attach_shared(shared.specs)
+            try:
+                yield from map(function, tasks)
+            finally:
+                detach_shared()
+            return
+
+        chunksize = chunksize or max(1, len(tasks) // (workers * 8))
+        with Pool(workers, initializer=attach_shared, initargs=(shared.specs,)) as pool:
+            yield from pool.imap_unordered(function, tasks, chunksize=chunksize)
+
+def _run(task) -> Dict:
+    symbol, params = task
+    bars, cache = shared_bars(symbol)
+    result = run_backtest(bars, params, cache=cache)
+    return {'symbol': symbol, 'params': params, **{name: result[name] for name in METRICS}}
+
+def iter_sweep(data: Dict[str, Bars], grid: Dict[str, Sequence] = None, workers: Optional[int] = None) -> Iterator[Dict]:
+    """Yield one result row per (symbol, combination) in completion order"""
+    combos = expand_grid(grid or DEFAULT_GRID)
+    # Same-symbol tasks travel in chunks, so each worker's indicator cache keeps hitting
+    tasks = [(symbol, combo) for symbol in data for combo in combos]
+    yield from run_shared(data, _run, tasks, workers)
+
+def run_sweep(data: Dict[str, Bars], grid: Dict[str, Sequence] = None, workers: Optional[int] = None,
+              sort_by: str = 'profit_factor', on_result: Optional[Callable[[Dict], None]] = None) -> ResultsTable:
+    table = ResultsTable(sort_by)
+    for row in iter_sweep(data, grid, workers):
+        table.add(row)
+        if on_result is not None:
+            on_result(row)
+    return table
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python optimizer.py <data_dir> [timeframe] [sort_by]")
+        print(f"Looks for <data_dir>/<SYMBOL>_<timeframe>.npz|.csv for {', '.join(SYMBOLS)}")
+        sys.exit(1)
+
+    timeframe = sys.argv[2] if len(sys.argv) > 2 else '15m'
+    sort_by = sys.argv[3] if len(sys.argv) > 3 else 'profit_factor'
+    data = load_symbols(sys.argv[1], timeframe)
+    if not data:
+        print(f"❌ No {timeframe} data found in {sys.argv[1]}")
+        sys.exit(1)
+
+    total = len(expand_grid(DEFAULT_GRID)) * len(data)
+    print(f"🔍 Sweeping {total:,} runs over {', '.join(data)} ({timeframe})")
+    started = time.perf_counter()
+    done = 0
+
+    def progress(row):
+        nonlocal done
+        done += 1
+        print(f"[{done:>5}/{total}] {row['symbol']} {row['params']} → "
+              f"PF {row['profit_factor']:.2f}, net {row['net_profit_percent']:.2f}%")
+
+    table = run_sweep(data, sort_by=sort_by, on_result=progress)
+    print("=" * 80)
+    print(table.format())
+    print("=" * 80)
+    print(f"⏱️  {time.perf_counter() - started:.1f} s")
+
+if __name__ == "__main__":
+    main()
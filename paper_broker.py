@@ -0,0 +1,223 @@
+"""
+Paper Broker - Deterministic Simulated Fills
+Fills market orders against a replayable price feed with per-symbol spread
+and seeded slippage, closes positions on SL/TP, and reports each fill as the
+TRADE_EXECUTED / TRADE_CLOSED events the MT5 EA would send
+"""
+
+import logging
+import random
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+from clock import Clock
+from config import Config
+from position_book import Position
+from signal_schema import Action, SignalEvent, TradeClosure, TradeExecution
+from trigger_index import TriggerIndex
+
+# Typical retail ECN spreads in pips
+DEFAULT_SPREAD_PIPS = {
+    'EURUSD': 0.8,
+    'GBPUSD': 1.2,
+    'USDJPY': 0.9,
+    'AUDUSD': 1.0,
+    'EURJPY': 1.5,
+    'GBPJPY': 2.5,
+    'EURGBP': 1.2
+}
+
+def pip_size(symbol: str) -> float:
+    return 0.01 if symbol[3:6] == 'JPY' else 0.0001
+
+class PaperBroker:
+    """
+    Simulated broker for FULL_AUTO paper trading and replays
+    - quotes are mid prices: buys fill half a spread above, sells half a spread below
+    - every fill also slips against the order by uniform(0, slippage_pips) from a seeded RNG
+    - on_bar() walks open → low/high → close, so a gap fills at the open and an
+      intrabar touch fills at the level
+    - report receives the TradeExecution / TradeClosure events (the bot passes process_signal)
+    - profit_percent on TRADE_CLOSED is percent of balance, like the EA's profit / balance * 100
+    """
+
+    def __init__(self, report: Optional[Callable[[SignalEvent], Dict]] = None,
+                 spread_pips: Optional[Dict[str, float]] = None,
+                 slippage_pips: float = Config.PAPER_SLIPPAGE_PIPS,
+                 seed: int = Config.PAPER_SEED,
+                 balance: float = Config.ACCOUNT_BALANCE,
+                 clock: Optional[Clock] = None):
+        self.report = report
+        self.balance = balance  # Account size profit_percent is expressed in
+        self.clock = clock or Clock()  # Trading-day boundaries for the daily counters
+        self.spread_pips = {**DEFAULT_SPREAD_PIPS, **(spread_pips or {})}
+        self.slippage_pips = slippage_pips
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self.quotes: Dict[str, float] = {}  # Latest mid price per symbol
+        self.positions: Dict[str, Position] = {}
+        self.triggers = TriggerIndex()
+        self._next_ticket = 1
+        self._time: Optional[datetime] = None  # Feed time of the latest quote
+
+        # EA-style counters carried on the reported events
+        self._day: Optional[date] = None
+        self.daily_pnl = 0.0
+        self.daily_trades = 0
+        self.consecutive_losses = 0
+        self.stats = {'orders': 0, 'closed': 0, 'wins': 0, 'losses': 0, 'pnl_percent': 0.0, 'slippage_pips': 0.0}
+
+    # ------------------------------------------------------------------
+    # Price feed
+    # ------------------------------------------------------------------
+
+    def on_price(self, symbol: str, price: float, timestamp: Optional[datetime] = None) -> List[Dict]:
+        """New mid quote; closes positions whose SL/TP it crossed at the quote (gap fill)"""
+        self._tick(symbol, price, timestamp)
+        return self._trigger(symbol, price, at_level=False)
+
+    def on_bar(self, symbol: str, open_: float, high: float, low: float, close: float,
+               timestamp: Optional[datetime] = None) -> List[Dict]:
+        """
+        One OHLC bar; assumes the price went open → low → high → close on an up bar
+        and open → high → low → close on a down bar
+        """
+        self._tick(symbol, open_, timestamp)
+        closed = self._trigger(symbol, open_, at_level=False)
+        first, second = (low, high) if close >= open_ else (high, low)
+        if self.triggers:
+            closed += self._trigger(symbol, first, at_level=True)
+            closed += self._trigger(symbol, second, at_level=True)
+        self.quotes[symbol] = close
+        return closed
+
+    def _tick(self, symbol: str, price: float, timestamp: Optional[datetime]):
+        self.quotes[symbol] = price
+        if timestamp is not None:
+            self._time = timestamp
+            day = self.clock.trading_day(timestamp)
+            if day != self._day:
+                self._day = day
+                self.daily_pnl = 0.0
+                self.daily_trades = 0
+
+    def _trigger(self, symbol: str, price: float, at_level: bool) -> List[Dict]:
+        return [self.close(ticket, level if at_level else price, reason)
+                for ticket, reason, level in self.triggers.on_price(symbol, price)]
+
+    # ------------------------------------------------------------------
+    # Orders
+    # ------------------------------------------------------------------
+
+    def _fill_price(self, symbol: str, buy: bool, price: float) -> float:
+        slippage = self._rng.uniform(0, self.slippage_pips) if self.slippage_pips > 0 else 0.0
+        self.stats['slippage_pips'] += slippage
+        offset = (self.spread_pips.get(symbol, Config.PAPER_SPREAD_PIPS) / 2 + slippage) * pip_size(symbol)
+        return price + offset if buy else price - offset
+
+    def submit(self, symbol: str, side: str, units: float,
+               stop_loss: float = 0.0, take_profit: float = 0.0) -> Dict:
+        """Market order at the latest quote; reports TRADE_EXECUTED"""
+        price = self.quotes.get(symbol)
+        if price is None:
+            return {"status": "rejected", "reason": f"No price for {symbol}"}
+
+        fill = self._fill_price(symbol, side == 'BUY', price)
+        ticket = f"PAPER-{self._next_ticket}"
+        self._next_ticket += 1
+        position = Position(ticket, symbol, side, units, fill, stop_loss, take_profit,
+                            opened_at=self._time.isoformat() if self._time else None)
+        self.positions[ticket] = position
+        self.triggers.add(ticket, symbol, side, stop_loss, take_profit)
+        self.daily_trades += 1
+        self.stats['orders'] += 1
+
+        self._report(TradeExecution(
+            symbol, Action.SELL if side == 'SELL' else Action.BUY, fill,
+            lot_size=units / Config.CONTRACT_SIZE, stop_loss=stop_loss, take_profit=take_profit,
+            reason='PAPER', daily_trades=self.daily_trades, ticket=ticket
+        ))
+        return {"status": "filled", "ticket": ticket, "price": fill}
+
+    def close(self, ticket: str, price: Optional[float] = None, reason: str = 'SIGNAL') -> Optional[Dict]:
+        """Close at price (default: the latest quote); reports TRADE_CLOSED. None if the ticket is not open"""
+        position = self.positions.pop(ticket, None)
+        if position is None:
+            return None
+        self.triggers.remove(ticket)
+
+        fill = self._fill_price(position.symbol, position.side == 'SELL',
+                                self.quotes[position.symbol] if price is None else price)
+        profit = position.direction * (fill - position.entry_price) * position.units
+        profit_percent = profit / self.balance * 100
+        is_win = profit_percent > 0
+        self.daily_pnl += profit_percent
+        self.consecutive_losses = 0 if is_win else self.consecutive_losses + 1
+        self.stats['closed'] += 1
+        self.stats['wins' if is_win else 'losses'] += 1
+        self.stats['pnl_percent'] += profit_percent
+
+        self._report(TradeClosure(
+            position.symbol, profit_percent, is_win, daily_pnl=self.daily_pnl,
+            consecutive_losses=self.consecutive_losses, ticket=ticket
+        ))
+        return {"status": "closed", "ticket": ticket, "price": fill, "profit": profit,
+                "profit_percent": profit_percent, "reason": reason}
+
+    def _report(self, event: SignalEvent):
+        if self.report is not None:
+            result = self.report(event)
+            if result.get('status') in ('error', 'invalid'):
+                logging.warning(f"⚠️ Paper fill report failed: {result.get('reason')}")
+
+    def __contains__(self, ticket) -> bool:
+        return ticket in self.positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    # ------------------------------------------------------------------
+    # Reporting / persistence
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict:
+        closed = self.stats['closed']
+        return {
+            **self.stats,
+            'open_positions': len(self.positions),
+            'win_rate': (self.stats['wins'] / closed * 100) if closed else 0,
+            'seed': self.seed
+        }
+
+    def get_state(self) -> Dict:
+        version, internal, gauss_next = self._rng.getstate()
+        return {
+            'rng': [version, list(internal), gauss_next],
+            'quotes': dict(self.quotes),
+            'positions': [position.to_dict() for position in self.positions.values()],
+            'next_ticket': self._next_ticket,
+            'time': self._time.isoformat() if self._time else None,
+            'day': self._day.isoformat() if self._day else None,
+            'daily_pnl': self.daily_pnl,
+            'daily_trades': self.daily_trades,
+            'consecutive_losses': self.consecutive_losses,
+            'stats': dict(self.stats)
+        }
+
+    def restore_state(self, state: Dict):
+        version, internal, gauss_next = state['rng']
+        self._rng.setstate((version, tuple(internal), gauss_next))
+        self.quotes = dict(state['quotes'])
+        self.positions = {}
+        self.triggers = TriggerIndex()
+        for data in state['positions']:
+            position = Position.from_dict(data)
+            self.positions[position.ticket] = position
+            self.triggers.add(position.ticket, position.symbol, position.side,
+                              position.stop_loss, position.take_profit)
+        self._next_ticket = state['next_ticket']
+        self._time = datetime.fromisoformat(state['time']) if state['time'] else None
+        self._day = date.fromisoformat(state['day']) if state['day'] else None
+        self.daily_pnl = state['daily_pnl']
+        self.daily_trades = state['daily_trades']
+        self.consecutive_losses = state['consecutive_losses']
+        self.stats = dict(state['stats'])
@@ -0,0 +1,237 @@
+"""
+Portfolio Risk - Correlation-Aware Exposure and VaR
+Nets open positions into per-currency exposure and keeps an EWMA covariance
+matrix of pair returns, updated with one O(k²) rank-1 step per sample
+"""
+
+import logging
+import math
+import numpy as np
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+from config import Config
+
+SECONDS_PER_DAY = 86400
+
+def split_pair(symbol: str):
+    """'EURUSD' → ('EUR', 'USD')"""
+    return symbol[:3], symbol[3:6]
+
+class PortfolioRisk:
+    """
+    Parametric (variance-covariance) VaR over FX pairs
+    - on_price(): latest quote; a covariance sample is taken every sample_seconds
+    - sample(): cov = λ·cov + (1-λ)·r·rᵀ on the log returns since the previous sample
+    - exposure is held as signed base-currency units per pair, valued in USD
+    - VaR is one-day, scaled from the sample interval: z · sqrt(wᵀΣw) · sqrt(day / interval)
+    """
+
+    def __init__(self, symbols: Sequence[str],
+                 ewma_lambda: float = Config.PORTFOLIO_EWMA_LAMBDA,
+                 sample_seconds: float = Config.PORTFOLIO_SAMPLE_SECONDS,
+                 min_observations: int = Config.PORTFOLIO_MIN_OBSERVATIONS,
+                 z_score: float = Config.PORTFOLIO_VAR_Z,
+                 var_limit: float = Config.ACCOUNT_BALANCE * Config.MAX_PORTFOLIO_VAR_PERCENT / 100):
+        self.symbols: List[str] = list(symbols)
+        self.index: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.ewma_lambda = ewma_lambda
+        self.sample_seconds = sample_seconds
+        self.min_observations = min_observations
+        self.var_multiplier = z_score * math.sqrt(SECONDS_PER_DAY / sample_seconds)
+        self.var_limit = var_limit
+
+        k = len(self.symbols)
+        self.cov = np.zeros((k, k))
+        self.prices = np.full(k, np.nan)  # Latest quote per pair
+        self.units = np.zeros(k)  # Signed base-currency units per pair
+        self.observations = 0
+        self._sampled = np.full(k, np.nan)  # Quotes at the previous sample
+        self._last_sample: Optional[datetime] = None
+
+    # ------------------------------------------------------------------
+    # Market data
+    # ------------------------------------------------------------------
+
+    def on_price(self, symbol: str, price: float, timestamp: Optional[datetime] = None):
+        """Record a quote; takes a covariance sample once sample_seconds have passed"""
+        i = self.index.get(symbol)
+        if i is None or not price > 0:
+            return
+        self.prices[i] = price
+        if timestamp is None:
+            return
+        if self._last_sample is None:
+            self._last_sample = timestamp
+            self._sampled[i] = price
+        elif (timestamp - self._last_sample).total_seconds() >= self.sample_seconds:
+            self.sample()
+            self._last_sample = timestamp
+        elif np.isnan(self._sampled[i]):
+            self._sampled[i] = price  # First quote for this pair - becomes its return base
+
+    def update(self, prices: Dict[str, float]):
+        """One synchronous observation, e.g. the closes of a bar across all pairs"""
+        for symbol, price in prices.items():
+            i = self.index.get(symbol)
+            if i is not None and price > 0:
+                self.prices[i] = price
+        self.sample()
+
+    def sample(self):
+        """Rank-1 EWMA covariance step on log returns since the last sample - O(k²)"""
+        known = ~np.isnan(self._sampled) & ~np.isnan(self.prices)
+        returns = np.zeros(len(self.symbols))
+        returns[known] = np.log(self.prices[known] / self._sampled[known])
+
+        if known.any():
+            self.cov *= self.ewma_lambda
+            self.cov += (1 - self.ewma_lambda) * np.outer(returns, returns)
+            self.observations += 1
+        self._sampled = self.prices.copy()
+
+    # ------------------------------------------------------------------
+    # Exposure
+    # ------------------------------------------------------------------
+
+    def set_position(self, symbol: str, units: float):
+        """Net signed base-currency units held in a pair"""
+        i = self.index.get(symbol)
+        if i is not None:
+            self.units[i] = units
+
+    def add_position(self, symbol: str, units: float):
+        i = self.index.get(symbol)
+        if i is not None:
+            self.units[i] += units
+
+    def _to_usd(self, currency: str) -> float:
+        if currency == 'USD':
+            return 1.0
+        direct = self.index.get(currency + 'USD')
+        if direct is not None:
+            return self.prices[direct]
+        inverse = self.index.get('USD' + currency)
+        if inverse is not None:
+            return 1.0 / self.prices[inverse]
+        return math.nan
+
+    def unit_values(self) -> np.ndarray:
+        """USD value of one base-currency unit of each pair (NaN while a quote is missing)"""
+        return np.array([self.prices[i] * self._to_usd(split_pair(symbol)[1])
+                         for i, symbol in enumerate(self.symbols)])
+
+    def unit_value(self, symbol: str, price: float) -> float:
+        """USD value of one base-currency unit at price - the quote itself while no USD rate is known"""
+        rate = self._to_usd(split_pair(symbol)[1])
+        return float(price * rate) if rate > 0 else price
+
+    def exposure(self) -> np.ndarray:
+        """USD exposure per pair, the weight vector w of the VaR"""
+        return np.nan_to_num(self.units * self.unit_values())
+
+    def currency_exposure(self) -> Dict[str, float]:
+        """Net USD exposure per currency leg - long EURUSD is +EUR / -USD"""
+        legs: Dict[str, float] = {}
+        for symbol, value in zip(self.symbols, self.exposure().tolist()):
+            if value:
+                base, quote = split_pair(symbol)
+                legs[base] = legs.get(base, 0.0) + value
+                legs[quote] = legs.get(quote, 0.0) - value
+        return legs
+
+    # ------------------------------------------------------------------
+    # Value at Risk
+    # ------------------------------------------------------------------
+
+    @property
+    def ready(self) -> bool:
+        return self.observations >= self.min_observations
+
+    def value_at_risk(self) -> float:
+        w = self.exposure()
+        return self.var_multiplier * math.sqrt(max(float(w @ self.cov @ w), 0.0))
+
+    def var_after(self, symbols: Sequence[str], units: Sequence[float]) -> np.ndarray:
+        """
+        VaR after adding units of each symbol, every trade judged on its own
+        Uses wᵀΣw + 2Δ(Σw)ᵢ + Δ²Σᵢᵢ - O(k²) once, then O(1) per trade
+        Unknown symbols and pairs without a quote add no exposure
+        """
+        w = self.exposure()
+        sigma_w = self.cov @ w
+        variance = float(w @ sigma_w)
+
+        positions = np.array([self.index.get(symbol, -1) for symbol in symbols], dtype=np.intp)
+        tracked = positions >= 0
+        safe = np.where(tracked, positions, 0)
+        delta = np.where(tracked, np.asarray(units, dtype=np.float64) * self.unit_values()[safe], 0.0)
+        delta = np.nan_to_num(delta)
+
+        variance_after = variance + 2 * delta * sigma_w[safe] + delta * delta * np.diag(self.cov)[safe]
+        return self.var_multiplier * np.sqrt(np.maximum(variance_after, 0.0))
+
+    def check_trades(self, symbols: Sequence[str], units: Sequence[float]) -> np.ndarray:
+        """Allowed mask - a trade is blocked when it pushes VaR over the limit and increases it"""
+        if not self.ready:
+            return np.ones(len(symbols), dtype=bool)  # Covariance still warming up
+        var_now = self.value_at_risk()
+        var_after = self.var_after(symbols, units)
+        return ~((var_after > self.var_limit) & (var_after > var_now))
+
+    def check_trade(self, symbol: str, units: float) -> Dict:
+        """Pre-trade VaR check for a single order"""
+        if not self.ready:
+            return {"allowed": True, "reason": f"Covariance warming up ({self.observations}/{self.min_observations})"}
+        var_now = self.value_at_risk()
+        var_after = float(self.var_after([symbol], [units])[0])
+        if var_after > self.var_limit and var_after > var_now:
+            return {
+                "allowed": False,
+                "reason": f"Portfolio VaR ${var_after:.2f} over limit ${self.var_limit:.2f}",
+                "var": var_now,
+                "var_after": var_after
+            }
+        return {"allowed": True, "reason": "Portfolio VaR within limit", "var": var_now, "var_after": var_after}
+
+    # ------------------------------------------------------------------
+    # Reporting / persistence
+    # ------------------------------------------------------------------
+
+    def correlation(self) -> np.ndarray:
+        std = np.sqrt(np.diag(self.cov))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.nan_to_num(self.cov / np.outer(std, std))
+
+    def get_stats(self) -> Dict:
+        return {
+            'symbols': self.symbols,
+            'observations': self.observations,
+            'ready': self.ready,
+            'var': self.value_at_risk(),
+            'var_limit': self.var_limit,
+            'exposure': dict(zip(self.symbols, self.exposure().tolist())),
+            'currency_exposure': self.currency_exposure(),
+            'correlation': np.round(self.correlation(), 3).tolist()
+        }
+
+    def get_state(self) -> Dict:
+        return {
+            'symbols': self.symbols,
+            'cov': self.cov.tolist(),
+            'prices': [None if np.isnan(p) else p for p in self.prices.tolist()],
+            'sampled': [None if np.isnan(p) else p for p in self._sampled.tolist()],
+            'units': self.units.tolist(),
+            'observations': self.observations,
+            'last_sample': self._last_sample.isoformat() if self._last_sample else None
+        }
+
+    def restore_state(self, state: Dict):
+        if state['symbols'] != self.symbols:
+            logging.warning("⚠️ Portfolio symbols changed - covariance history discarded")
+            return
+        self.cov = np.array(state['cov'], dtype=np.float64)
+        self.prices = np.array([np.nan if p is None else p for p in state['prices']], dtype=np.float64)
+        self._sampled = np.array([np.nan if p is None else p for p in state['sampled']], dtype=np.float64)
+        self.units = np.array(state['units'], dtype=np.float64)
+        self.observations = state['observations']
+        self._last_sample = datetime.fromisoformat(state['last_sample']) if state['last_sample'] else None
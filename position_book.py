@@ -0,0 +1,155 @@
+"""
+Position Book - Open Positions Built From Execution Events
+TRADE_EXECUTED opens a position, TRADE_CLOSED removes it; lookups by ticket
+and by symbol are dict hits and exposure totals are kept up to date per event
+"""
+
+from typing import Dict, Iterator, List, Optional
+
+class Position:
+    """One open position; units are in the base currency of the pair"""
+    __slots__ = ('ticket', 'symbol', 'side', 'units', 'entry_price', 'stop_loss',
+                 'take_profit', 'notional', 'opened_at')
+
+    def __init__(self, ticket: str, symbol: str, side: str, units: float, entry_price: float,
+                 stop_loss: float = 0.0, take_profit: float = 0.0, notional: float = 0.0,
+                 opened_at: Optional[str] = None):
+        self.ticket = ticket
+        self.symbol = symbol
+        self.side = side  # 'BUY' (long) or 'SELL' (short)
+        self.units = units
+        self.entry_price = entry_price
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.notional = notional  # USD value at entry
+        self.opened_at = opened_at
+
+    @property
+    def direction(self) -> int:
+        return -1 if self.side == 'SELL' else 1
+
+    @property
+    def signed_units(self) -> float:
+        return self.direction * self.units
+
+    def profit_percent(self, price: float) -> float:
+        """Unrealised P&L in percent of the entry price"""
+        return self.direction * (price - self.entry_price) / self.entry_price * 100
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Position':
+        return cls(**data)
+
+class PositionBook:
+    """
+    Open positions indexed by ticket and by symbol
+    Also usable as the `positions` mapping RiskManager expects:
+    len() is the number of open positions, `symbol in book` and iteration go by symbol
+    """
+
+    def __init__(self):
+        self._by_ticket: Dict[str, Position] = {}
+        self._by_symbol: Dict[str, Dict[str, Position]] = {}  # symbol → tickets in opening order
+        self._net_units: Dict[str, float] = {}
+        self._notional: Dict[str, float] = {}
+        self.total_notional = 0.0
+        self._next_ticket = 1
+
+    def new_ticket(self, prefix: str = 'EA') -> str:
+        """Ticket for a reported position that arrived without one"""
+        ticket = f"{prefix}-{self._next_ticket}"
+        self._next_ticket += 1
+        return ticket
+
+    def open(self, position: Position) -> Position:
+        """Add a position; a ticket that is already open is returned unchanged"""
+        existing = self._by_ticket.get(position.ticket)
+        if existing is not None:
+            return existing
+
+        self._by_ticket[position.ticket] = position
+        self._by_symbol.setdefault(position.symbol, {})[position.ticket] = position
+        self._net_units[position.symbol] = self._net_units.get(position.symbol, 0.0) + position.signed_units
+        self._notional[position.symbol] = self._notional.get(position.symbol, 0.0) + position.notional
+        self.total_notional += position.notional
+        return position
+
+    def close(self, ticket: Optional[str] = None, symbol: Optional[str] = None) -> Optional[Position]:
+        """
+        Remove a position by ticket, or the oldest one in symbol when no ticket is given
+        Returns the closed position, None when nothing matched
+        """
+        if ticket is not None:
+            position = self._by_ticket.get(ticket)
+        else:
+            tickets = self._by_symbol.get(symbol)
+            position = next(iter(tickets.values())) if tickets else None
+        if position is None:
+            return None
+
+        del self._by_ticket[position.ticket]
+        tickets = self._by_symbol[position.symbol]
+        del tickets[position.ticket]
+        if tickets:
+            self._net_units[position.symbol] -= position.signed_units
+            self._notional[position.symbol] -= position.notional
+        else:
+            # Last one out - drop the running sums instead of leaving float residue
+            del self._by_symbol[position.symbol]
+            del self._net_units[position.symbol]
+            del self._notional[position.symbol]
+        self.total_notional = self.total_notional - position.notional if self._by_ticket else 0.0
+        return position
+
+    def get(self, ticket: str) -> Optional[Position]:
+        return self._by_ticket.get(ticket)
+
+    def positions_for(self, symbol: str) -> List[Position]:
+        return list(self._by_symbol.get(symbol, {}).values())
+
+    def net_units(self, symbol: str) -> float:
+        """Signed base-currency units held in symbol (long minus short)"""
+        return self._net_units.get(symbol, 0.0)
+
+    def notional(self, symbol: str) -> float:
+        return self._notional.get(symbol, 0.0)
+
+    def __len__(self) -> int:
+        return len(self._by_ticket)
+
+    def __contains__(self, symbol) -> bool:
+        return symbol in self._by_symbol
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._by_symbol)
+
+    def __getitem__(self, symbol: str) -> List[Position]:
+        if symbol not in self._by_symbol:
+            raise KeyError(symbol)
+        return self.positions_for(symbol)
+
+    def all(self) -> List[Position]:
+        return list(self._by_ticket.values())
+
+    def get_summary(self) -> Dict:
+        return {
+            'open_positions': len(self._by_ticket),
+            'total_notional': self.total_notional,
+            'net_units': dict(self._net_units),
+            'notional': dict(self._notional)
+        }
+
+    def get_state(self) -> Dict:
+        return {
+            'positions': [position.to_dict() for position in self._by_ticket.values()],
+            'next_ticket': self._next_ticket
+        }
+
+    def restore_state(self, state: Dict):
+        self.__init__()
+        for data in state['positions']:
+            self.open(Position.from_dict(data))
+        self._next_ticket = state['next_ticket']
@@ -3,11 +3,21 @@ Profitable Trading App - Enhanced Flask Server
 Handles the profitable trading system with automation phases
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+import atexit
 import json
 import logging
+import threading
+import time
+from collections import deque
 from datetime import datetime
 from profitable_bot import ProfitableTradingBot
+from signal_schema import SignalValidationError, loads, parse_batch
+from dedup_cache import IDEMPOTENCY_HEADERS, IdempotencyCache, process_once
+from trade_journal import InvalidCursorError, TradeJournal
+from state_store import StateStore
+from event_stream import EventBroadcaster, format_sse
+import metrics
 from config import Config
 
 # Setup logging
@@ -24,40 +34,150 @@ app = Flask(__name__)
 
 # Initialize profitable trading bot
 try:
-    trading_bot = ProfitableTradingBot()
+    trade_journal = TradeJournal(Config.TRADE_JOURNAL_PATH) if Config.TRADE_JOURNAL_PATH else None
+    state_store = StateStore(Config.STATE_DIR) if Config.STATE_DIR else None
+    event_stream = EventBroadcaster()
+    trading_bot = ProfitableTradingBot(trade_journal=trade_journal, state_store=state_store,
+                                       event_stream=event_stream)
+    metrics.TRADE_HISTORY_EVENTS.set_function(lambda: len(trading_bot.trade_history))
+    metrics.TRADE_HISTORY_TOTAL.set_function(lambda: trading_bot.trade_history.total_count)
+    atexit.register(trading_bot.trade_history.close)  # Last - the newest events reach disk after the checkpoint
+    if trade_journal is not None:
+        atexit.register(trade_journal.close)
+    if state_store is not None:
+        atexit.register(state_store.close)
+        atexit.register(trading_bot.checkpoint)  # atexit runs in reverse - snapshot first
     logging.info("🚀 Profitable Trading Bot server started successfully")
 except Exception as e:
     logging.error(f"Failed to initialize profitable trading bot: {str(e)}")
     trading_bot = None
 
+# Duplicate alert suppression - checked and filled under the same lock as the bot
+dedup_cache = IdempotencyCache()
+signal_lock = threading.Lock()
+
+def _idempotency_header():
+    for header in IDEMPOTENCY_HEADERS:
+        if request.headers.get(header):
+            return request.headers[header]
+    return None
+
+# Serialized read endpoints, keyed by path → (etag, JSON body)
+_response_cache = {}
+
+def _conditional_json(build):
+    """
+    Serve a state-derived JSON body with an ETag
+    Unchanged state → 304 without a body; the body is serialized once per state version
+    The version is one int read, so the 304 check needs no lock; the body and the
+    ETag it is cached under are read together under the signal lock
+    """
+    etag = trading_bot.status_etag()
+    if request.if_none_match.contains_raw(etag):
+        return app.response_class(status=304, headers={'ETag': etag})
+    
+    cached = _response_cache.get(request.path)
+    if cached is None or cached[0] != etag:
+        with signal_lock:
+            etag = trading_bot.status_etag()
+            body = build()
+        cached = (etag, jsonify(body).get_data())
+        _response_cache[request.path] = cached
+    return app.response_class(cached[1], status=200, mimetype='application/json', headers={'ETag': cached[0]})
+
 @app.route('/webhook', methods=['POST'])
 def webhook():
     """
     Enhanced webhook for profitable trading system
     Handles signals, trade executions, closures, and emergency stops
     """
+    started = time.perf_counter()
     try:
-        data = request.get_json()
+        body = request.get_data()
+        try:
+            data = loads(body) if body else None
+        except SignalValidationError as e:
+            return jsonify({"error": str(e)}), 400
         
-        if not data:
+        if not data or not isinstance(data, dict):
             return jsonify({"error": "No data received"}), 400
         
         # Log incoming data
         action = data.get('action', 'UNKNOWN')
         logging.info(f"📡 Received: {action} | Data: {data}")
+        metrics.WEBHOOK_REQUESTS.labels('webhook', metrics.action_label(action)).inc()
         
         # Check if bot is initialized
         if trading_bot is None:
             return jsonify({"error": "Trading bot not initialized"}), 500
         
-        # Process the signal/event
-        result = trading_bot.process_signal(data)
+        # Process the signal/event (duplicates get the first result back)
+        with signal_lock:
+            result, duplicate = process_once(trading_bot, dedup_cache, data, _idempotency_header())
+        
+        if duplicate:
+            logging.info(f"♻️ Duplicate {action} suppressed")
+            return jsonify({"status": "success", "result": result, "duplicate": True}), 200
         
         return jsonify({"status": "success", "result": result}), 200
         
     except Exception as e:
         logging.error(f"Webhook error: {str(e)}")
         return jsonify({"error": str(e)}), 500
+    
+    finally:
+        metrics.WEBHOOK_LATENCY.labels('webhook').observe(time.perf_counter() - started)
+
+@app.route('/webhook/batch', methods=['POST'])
+def webhook_batch():
+    """
+    Batch webhook - JSON array or NDJSON of signals and EA events
+    Items are processed in order and each gets its own result
+    """
+    started = time.perf_counter()
+    try:
+        try:
+            events = parse_batch(request.get_data())
+        except ValueError as e:
+            return jsonify({"error": f"Invalid batch body: {str(e)}"}), 400
+        
+        if not events:
+            return jsonify({"error": "No data received"}), 400
+        
+        if len(events) > Config.MAX_BATCH_SIZE:
+            return jsonify({"error": f"Batch too large: {len(events)} > {Config.MAX_BATCH_SIZE}"}), 413
+        
+        logging.info(f"📦 Received batch of {len(events)} events")
+        
+        # Check if bot is initialized
+        if trading_bot is None:
+            return jsonify({"error": "Trading bot not initialized"}), 500
+        
+        results = []
+        duplicates = 0
+        for event in events:
+            action = event.get('action') if isinstance(event, dict) else None
+            metrics.WEBHOOK_REQUESTS.labels('batch', metrics.action_label(action)).inc()
+        
+        with signal_lock:
+            for event in events:
+                result, duplicate = process_once(trading_bot, dedup_cache, event)
+                results.append(result)
+                duplicates += duplicate
+        
+        return jsonify({
+            "status": "success",
+            "count": len(results),
+            "duplicates": duplicates,
+            "results": results
+        }), 200
+        
+    except Exception as e:
+        logging.error(f"Batch webhook error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+    
+    finally:
+        metrics.WEBHOOK_LATENCY.labels('batch').observe(time.perf_counter() - started)
 
 @app.route('/status', methods=['GET'])
 def status():
@@ -66,12 +186,67 @@ def status():
         if trading_bot is None:
             return jsonify({"error": "Trading bot not initialized"}), 500
         
-        status_info = trading_bot.get_status()
-        return jsonify(status_info), 200
+        return _conditional_json(trading_bot.get_status)
     except Exception as e:
         logging.error(f"Status error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/events', methods=['GET'])
+def events():
+    """
+    Server-Sent Events stream of bot state deltas
+    - 'snapshot': full /status body (first message, or when Last-Event-ID cannot be resumed)
+    - 'state': {"version", "changes"} - changed top-level /status sections
+    - 'trade': one new trade history event
+    Reconnect with Last-Event-ID (header or ?last_event_id=) to resume without a resync
+    """
+    if trading_bot is None:
+        return jsonify({"error": "Trading bot not initialized"}), 500
+    
+    stream = trading_bot.event_stream
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    
+    def snapshot():
+        # Under the signal lock so no event lands between the snapshot and its id
+        with signal_lock:
+            event_id = stream.last_id
+            status_info = trading_bot.get_status()
+        return event_id, format_sse(event_id, 'snapshot', jsonify(status_info).get_data(as_text=True), retry_ms=3000)
+    
+    def generate():
+        position = last_event_id
+        if not stream.can_resume(position):
+            position, message = snapshot()
+            yield message
+        while True:
+            pending = stream.wait(position, Config.EVENT_STREAM_KEEPALIVE)
+            if pending is None:
+                # Fell out of the replay buffer - start over from a snapshot
+                position, message = snapshot()
+                yield message
+                continue
+            if not pending:
+                yield ": keepalive\n\n"
+                continue
+            for event_id, event, data in pending:
+                yield format_sse(event_id, event, data)
+            position = pending[-1][0]
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # Disable proxy buffering so events go out immediately
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus text exposition of the signal path metrics"""
+    return app.response_class(metrics.REGISTRY.render(), status=200, headers={'Content-Type': metrics.CONTENT_TYPE})
+
+@app.route('/dedup', methods=['GET'])
+def dedup_stats():
+    """Duplicate alert suppression counters"""
+    return jsonify(dedup_cache.get_stats()), 200
+
 @app.route('/health', methods=['GET'])
 def health():
     """Enhanced health check"""
@@ -85,12 +260,18 @@ def health():
         }
         
         if trading_bot:
-            health_info.update({
-                "automation_phase": trading_bot.automation_phase,
-                "emergency_stop": trading_bot.emergency_stop,
-                "daily_trades": trading_bot.daily_stats['trades'],
-                "daily_pnl": trading_bot.daily_stats['pnl_percent']
-            })
+            def build():
+                # timestamp is when this state version was first served
+                return {
+                    **health_info,
+                    "automation_phase": trading_bot.automation_phase,
+                    "emergency_stop": trading_bot.emergency_stop,
+                    "daily_trades": trading_bot.daily_stats['trades'],
+                    "daily_pnl": trading_bot.daily_stats['pnl_percent'],
+                    "recovery": trading_bot.recovery_stats,
+                    "state_version": trading_bot.state_version
+                }
+            return _conditional_json(build)
         
         return jsonify(health_info), 200
     except Exception as e:
@@ -107,7 +288,8 @@ def set_automation():
         data = request.get_json()
         phase = data.get('phase', '').upper()
         
-        result = trading_bot.set_automation_phase(phase)
+        with signal_lock:
+            result = trading_bot.set_automation_phase(phase)
         return jsonify(result), 200
         
     except Exception as e:
@@ -121,11 +303,11 @@ def get_automation():
         if trading_bot is None:
             return jsonify({"error": "Trading bot not initialized"}), 500
         
-        return jsonify({
+        return _conditional_json(lambda: {
             "automation_phase": trading_bot.automation_phase,
             "available_phases": ["SIGNAL_ONLY", "SEMI_AUTO", "FULL_AUTO"],
             "emergency_stop": trading_bot.emergency_stop
-        }), 200
+        })
         
     except Exception as e:
         logging.error(f"Automation get error: {str(e)}")
@@ -138,14 +320,10 @@ def emergency_stop():
         if trading_bot is None:
             return jsonify({"error": "Trading bot not initialized"}), 500
         
-        trading_bot.emergency_stop = True
-        logging.critical("🚨 MANUAL EMERGENCY STOP ACTIVATED")
+        with signal_lock:
+            result = trading_bot.activate_emergency_stop("MANUAL")
         
-        return jsonify({
-            "status": "success",
-            "message": "Emergency stop activated",
-            "timestamp": datetime.now().isoformat()
-        }), 200
+        return jsonify(result), 200
         
     except Exception as e:
         logging.error(f"Emergency stop error: {str(e)}")
@@ -158,7 +336,8 @@ def reset_emergency():
         if trading_bot is None:
             return jsonify({"error": "Trading bot not initialized"}), 500
         
-        result = trading_bot.reset_emergency_stop()
+        with signal_lock:
+            result = trading_bot.reset_emergency_stop()
         return jsonify(result), 200
         
     except Exception as e:
@@ -172,32 +351,105 @@ def profit_info():
         if trading_bot is None:
             return jsonify({"error": "Trading bot not initialized"}), 500
         
-        status = trading_bot.get_status()
+        def build():
+            status = trading_bot.get_status()
+            return {
+                "profit_tracker": status['profit_tracker'],
+                "withdrawal_recommendation": status['withdrawal_recommendation'],
+                "daily_stats": status['daily_stats']
+            }
+        
+        return _conditional_json(build)
+        
+    except Exception as e:
+        logging.error(f"Profit info error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/portfolio', methods=['GET'])
+def portfolio_info():
+    """Correlation-aware exposure: per-currency legs, 1-day VaR and the pair correlation matrix"""
+    try:
+        if trading_bot is None:
+            return jsonify({"error": "Trading bot not initialized"}), 500
+        
+        with signal_lock:
+            stats = trading_bot.portfolio.get_stats()
+        return jsonify(stats), 200
         
+    except Exception as e:
+        logging.error(f"Portfolio info error: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/positions', methods=['GET'])
+def open_positions():
+    """Open positions from the position book, optionally for one symbol"""
+    try:
+        if trading_bot is None:
+            return jsonify({"error": "Trading bot not initialized"}), 500
+        
+        symbol = request.args.get('symbol')
+        with signal_lock:
+            positions = trading_bot.positions.positions_for(symbol.upper()) if symbol else trading_bot.positions.all()
+            summary = trading_bot.positions.get_summary()
+            triggers = trading_bot.triggers.get_stats()
         return jsonify({
-            "profit_tracker": status['profit_tracker'],
-            "withdrawal_recommendation": status['withdrawal_recommendation'],
-            "daily_stats": status['daily_stats']
+            "positions": [position.to_dict() for position in positions],
+            "summary": summary,
+            "triggers": triggers
         }), 200
         
     except Exception as e:
-        logging.error(f"Profit info error: {str(e)}")
+        logging.error(f"Positions error: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @app.route('/trades', methods=['GET'])
 def get_trades():
-    """Get trade history"""
+    """
+    Get trade history
+    Filters: symbol, action, since/until (ISO timestamps), cursor (from next_cursor), limit
+    """
     try:
         if trading_bot is None:
             return jsonify({"error": "Trading bot not initialized"}), 500
         
-        limit = request.args.get('limit', 50, type=int)
-        trades = trading_bot.trade_history[-limit:] if limit > 0 else trading_bot.trade_history
+        history = trading_bot.trade_history
+        journal = trading_bot.trade_journal
+        limit = min(request.args.get('limit', 50, type=int), Config.MAX_TRADES_PAGE)
+        symbol = request.args.get('symbol', '').upper() or None
+        action = request.args.get('action', '').upper() or None
+        since = request.args.get('since')
+        until = request.args.get('until')
+        next_cursor = None
+        
+        if journal is not None:
+            # Indexed query against the journal - one page at a time
+            try:
+                trades, next_cursor = journal.query(
+                    symbol=symbol, action=action, since=since, until=until,
+                    cursor=request.args.get('cursor'),
+                    limit=limit if limit > 0 else Config.MAX_TRADES_PAGE
+                )
+            except InvalidCursorError as e:
+                return jsonify({"error": str(e)}), 400
+            total_count = journal.count(symbol=symbol, action=action, since=since, until=until)
+        elif since or until or symbol or action:
+            # Filter first, then page - streams archived segments, holding only the page in memory
+            page = deque(maxlen=limit if limit > 0 else Config.MAX_TRADES_PAGE)
+            total_count = 0
+            for trade in history.iter_range(since=since, until=until):
+                if (not symbol or trade.get('symbol') == symbol) and (not action or trade.get('action') == action):
+                    page.append(trade)
+                    total_count += 1
+            trades = list(page)
+        else:
+            trades = history.tail(limit) if limit > 0 else list(history)
+            total_count = history.total_count
         
         return jsonify({
             "trades": trades,
-            "total_count": len(trading_bot.trade_history),
-            "returned_count": len(trades)
+            "total_count": total_count,
+            "returned_count": len(trades),
+            "next_cursor": next_cursor
         }), 200
         
     except Exception as e:
@@ -4,23 +4,38 @@ Enhanced version focused on small wins and strict risk management
 """
 
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+from clock import Clock
 from risk import RiskManager
+from portfolio_risk import PortfolioRisk
+from position_book import Position, PositionBook
+from trigger_index import TriggerIndex
+from paper_broker import PaperBroker
 from config import Config
+from trade_history import TradeHistory
+from trade_journal import TradeJournal
+from state_store import StateStore
+from event_stream import EventBroadcaster
+from metrics import SIGNAL_LATENCY, SIGNALS
+from signal_schema import (
+    SignalEvent, SignalValidationError, UnknownActionError, decode_event,
+    TradingSignal, TradeExecution, TradeClosure, EmergencyStop
+)
 
 class ProfitableTradingBot:
-    def __init__(self):
-        self.risk_manager = RiskManager()
+    def __init__(self, trade_history: Optional[TradeHistory] = None,
+                 trade_journal: Optional[TradeJournal] = None,
+                 state_store: Optional[StateStore] = None,
+                 event_stream: Optional[EventBroadcaster] = None,
+                 clock: Optional[Clock] = None):
+        self.clock = clock or Clock()  # Trading-day boundaries (TRADING_TIMEZONE) or simulated time
+        self.now = self.clock.now  # Handlers see it pinned to the input time
+        self.risk_manager = RiskManager(clock=self.clock)
         self.automation_phase = "SIGNAL_ONLY"  # SIGNAL_ONLY, SEMI_AUTO, FULL_AUTO
-        self.daily_stats = {
-            'trades': 0,
-            'wins': 0,
-            'losses': 0,
-            'pnl_percent': 0.0,
-            'consecutive_losses': 0,
-            'last_reset': datetime.now().date()
-        }
+        self.daily_stats = self._new_daily_stats(self.clock.today())
         self.profit_tracker = {
             'starting_balance': Config.ACCOUNT_BALANCE,
             'current_balance': Config.ACCOUNT_BALANCE,
@@ -29,10 +44,33 @@ class ProfitableTradingBot:
             'last_withdrawal': 0.0
         }
         self.emergency_stop = False
-        self.trade_history = []
+        # Recent events in memory, older ones spilled to disk segments
+        self.trade_history = trade_history if trade_history is not None else TradeHistory()
+        self.trade_journal = trade_journal  # Optional persistent store behind /trades
+        self.state_store = state_store  # Optional write-ahead journal + snapshots of the risk state
+        self._replaying = False
+        self._input_seq = None  # WAL seq of the input being handled - keys its journal rows
+        self._input_events = 0  # Journal rows written for that input so far
+        self._dispatching = False  # True while a handler runs - broker reports arrive nested
+        self.recovery_stats = None
+        
+        # Status snapshot - rebuilt only when state_version moves
+        self.instance_id = uuid.uuid4().hex[:8]  # Keeps ETags from an earlier process from matching
+        self.state_version = 0
+        self._status_cache = None  # (state_version, trading day, status dict)
+        self.event_stream = event_stream  # Optional /events broadcaster for dashboards
+        self._published_sections = {}
         
         # Multi-currency support
         self.supported_currencies = ['EURUSD', 'GBPUSD', 'USDJPY', 'AUDUSD', 'EURJPY', 'GBPJPY', 'EURGBP']
+        # Correlation-aware exposure - fed by every quote, consulted by Risk Rule 8
+        self.portfolio = PortfolioRisk(self.supported_currencies)
+        self.risk_manager.portfolio = self.portfolio
+        self.positions = PositionBook()  # Open positions from TRADE_EXECUTED / TRADE_CLOSED
+        self.triggers = TriggerIndex()  # SL/TP levels of the open positions, checked on every quote
+        # FULL_AUTO fills - spread, slippage and SL/TP exits, reported back through process_signal
+        self.broker = PaperBroker(report=self.process_signal, balance=self.profit_tracker['starting_balance'],
+                                  clock=self.clock)
         self.currency_stats = {}
         for currency in self.supported_currencies:
             self.currency_stats[currency] = {
@@ -44,60 +82,104 @@ class ProfitableTradingBot:
                 'last_signal': None
             }
         
+        # Decoded event type → handler
+        self._handlers = {
+            TradingSignal: self._handle_trading_signal,
+            TradeExecution: self._handle_trade_execution,
+            TradeClosure: self._handle_trade_closure,
+            EmergencyStop: self._handle_emergency_stop
+        }
+        
         logging.info("🚀 Multi-Currency Profitable Trading Bot initialized")
         logging.info(f"📊 Automation Phase: {self.automation_phase}")
         logging.info(f"💰 Starting Balance: ${Config.ACCOUNT_BALANCE}")
         logging.info(f"🌍 Supported Currencies: {', '.join(self.supported_currencies)}")
+        
+        if self.state_store is not None:
+            self.recover()
+        self._published_sections = self._state_sections()
     
-    def process_signal(self, signal_data: Dict) -> Dict:
+    def process_signal(self, signal_data) -> Dict:
         """
         Enhanced signal processing with automation phases
+        Accepts a raw payload dict or an already decoded SignalEvent
         """
+        started = time.perf_counter()
         try:
-            action = signal_data.get('action', '').upper()
+            # Decode once - malformed payloads never reach the handlers
+            event = signal_data if isinstance(signal_data, SignalEvent) else decode_event(signal_data)
+        except UnknownActionError as e:
+            return {"status": "unknown_action", "action": e.action}
+        except SignalValidationError as e:
+            logging.warning(f"Rejected malformed signal: {str(e)}")
+            return {"status": "invalid", "reason": str(e)}
+        
+        nested = self._dispatching
+        try:
+            # Write ahead - the input is durable before it changes any state
+            # Broker fill reports arrive nested and replay with the input that caused them
+            timestamp = self.now()
+            if not nested:
+                # A payload dict decodes to the same event again, so it is journaled as received
+                self._journal_input('signal', signal_data if signal_data.__class__ is dict else event.to_dict(), timestamp)
+                self._check_new_day()  # Rollover only on this locked write path - readers never reset
             
-            # Handle different message types
-            if action == "EMERGENCY_STOP":
-                return self._handle_emergency_stop(signal_data)
-            elif action == "TRADE_EXECUTED":
-                return self._handle_trade_execution(signal_data)
-            elif action == "TRADE_CLOSED":
-                return self._handle_trade_closure(signal_data)
-            elif action in ["BUY", "SELL"]:
-                return self._handle_trading_signal(signal_data)
-            else:
-                return {"status": "unknown_action", "action": action}
+            # Handle different message types (clock pinned so replay sees the same time)
+            self._dispatching = True
+            try:
+                result = self._at(timestamp, self._handlers[type(event)], event)
+            finally:
+                self._dispatching = nested
+            if not nested:
+                self._checkpoint()
+            return result
                 
         except Exception as e:
             logging.error(f"Signal processing error: {str(e)}")
             return {"status": "error", "reason": str(e)}
+        
+        finally:
+            self._state_changed()  # After the handler, so a cached status never mixes old and new state
+            SIGNAL_LATENCY.labels(event.action.value).observe(time.perf_counter() - started)
     
-    def _handle_trading_signal(self, signal_data: Dict) -> Dict:
+    def process_batch(self, events: List) -> List[Dict]:
+        """
+        Process a batch of signals/events in order
+        Returns one result per item; a bad item does not stop the batch
+        """
+        return [self.process_signal(event) for event in events]
+    
+    def _handle_trading_signal(self, signal: TradingSignal) -> Dict:
         """Handle BUY/SELL signals based on automation phase with multi-currency support"""
         
-        # Reset daily stats if new day
-        self._check_new_day()
+        # Quotes keep the covariance current even while trading is stopped
+        self.portfolio.on_price(signal.symbol, signal.price, self.now())
+        self.broker.on_price(signal.symbol, signal.price, self.now())
+        self._check_triggers(signal.symbol, signal.price)
         
         # Check if emergency stop is active
         if self.emergency_stop:
             return {"status": "rejected", "reason": "Emergency stop active"}
         
-        action = signal_data['action']
-        symbol = signal_data.get('symbol', 'UNKNOWN')
-        price = float(signal_data.get('price', 0))
-        strategy = signal_data.get('strategy', 'UNKNOWN')
-        timeframe = signal_data.get('timeframe', '15m')
+        action = signal.action.value
+        symbol = signal.symbol
+        price = signal.price
+        strategy = signal.strategy
+        timeframe = signal.timeframe
+        timestamp = self.now().isoformat()
         
         logging.info(f"📊 {action} Signal: {symbol} @ {price} | Strategy: {strategy} | TF: {timeframe}")
         
         # Update currency stats
-        if symbol in self.currency_stats:
-            self.currency_stats[symbol]['signals_today'] += 1
-            self.currency_stats[symbol]['last_signal'] = datetime.now().isoformat()
+        currency = self.currency_stats.get(symbol)
+        if currency is not None:
+            currency['signals_today'] += 1
+            currency['last_signal'] = timestamp
+        SIGNALS.labels(symbol if currency is not None else 'OTHER', action).inc()  # Bounded label set
         
         # Log signal regardless of automation phase
         signal_log = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
             'action': action,
             'symbol': symbol,
             'price': price,
@@ -106,7 +188,7 @@ class ProfitableTradingBot:
             'automation_phase': self.automation_phase,
             'status': 'signal_received'
         }
-        self.trade_history.append(signal_log)
+        self._record(signal_log)
         
         # Process based on automation phase
         if self.automation_phase == "SIGNAL_ONLY":
@@ -130,26 +212,42 @@ class ProfitableTradingBot:
         
         return {"status": "unknown_phase", "automation_phase": self.automation_phase}
     
-    def _handle_trade_execution(self, signal_data: Dict) -> Dict:
+    def _handle_trade_execution(self, execution: TradeExecution) -> Dict:
         """Handle trade execution confirmation from MT5 EA"""
         
-        symbol = signal_data.get('symbol', 'UNKNOWN')
-        side = signal_data.get('side', 'UNKNOWN')
-        price = float(signal_data.get('price', 0))
-        lot_size = float(signal_data.get('lot_size', 0))
-        stop_loss = float(signal_data.get('stop_loss', 0))
-        take_profit = float(signal_data.get('take_profit', 0))
-        reason = signal_data.get('reason', 'NO_REASON')
-        daily_trades = int(signal_data.get('daily_trades', 0))
+        symbol = execution.symbol
+        side = str(execution.side)
+        price = execution.price
+        lot_size = execution.lot_size
+        stop_loss = execution.stop_loss
+        take_profit = execution.take_profit
+        reason = execution.reason
+        daily_trades = execution.daily_trades
         
         logging.info(f"✅ Trade Executed: {side} {symbol} @ {price} | Lot: {lot_size} | SL: {stop_loss} | TP: {take_profit}")
         
+        self.portfolio.on_price(symbol, price, self.now())
+        
         # Update daily stats
         self.daily_stats['trades'] = daily_trades
         
+        # Track the open position so risk checks see it
+        ticket = execution.ticket
+        if side in ('BUY', 'SELL'):
+            ticket = ticket or self.positions.new_ticket('EA')
+            if self.positions.get(ticket) is None:  # A resent confirmation is not a second position
+                units = lot_size * Config.CONTRACT_SIZE
+                position = self.positions.open(Position(
+                    ticket, symbol, side, units, price, stop_loss, take_profit,
+                    notional=units * self.portfolio.unit_value(symbol, price),
+                    opened_at=self.now().isoformat()
+                ))
+                self.portfolio.add_position(symbol, position.signed_units)
+                self.triggers.add(ticket, symbol, side, stop_loss, take_profit)
+        
         # Log trade execution
         trade_log = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self.now().isoformat(),
             'action': 'TRADE_EXECUTED',
             'symbol': symbol,
             'side': side,
@@ -159,9 +257,10 @@ class ProfitableTradingBot:
             'take_profit': take_profit,
             'reason': reason,
             'daily_trades': daily_trades,
+            'ticket': ticket,
             'status': 'executed'
         }
-        self.trade_history.append(trade_log)
+        self._record(trade_log)
         
         return {
             "status": "trade_logged",
@@ -169,17 +268,23 @@ class ProfitableTradingBot:
             "daily_trades": daily_trades
         }
     
-    def _handle_trade_closure(self, signal_data: Dict) -> Dict:
+    def _handle_trade_closure(self, closure: TradeClosure) -> Dict:
         """Handle trade closure and P&L update"""
         
-        symbol = signal_data.get('symbol', 'UNKNOWN')
-        profit_percent = float(signal_data.get('profit_percent', 0))
-        is_win = signal_data.get('is_win', False)
-        daily_pnl = float(signal_data.get('daily_pnl', 0))
-        consecutive_losses = int(signal_data.get('consecutive_losses', 0))
+        symbol = closure.symbol
+        profit_percent = closure.profit_percent
+        is_win = closure.is_win
+        daily_pnl = closure.daily_pnl
+        consecutive_losses = closure.consecutive_losses
         
         logging.info(f"📊 Trade Closed: {symbol} | P&L: {profit_percent:.3f}% | Win: {is_win} | Daily: {daily_pnl:.2f}%")
         
+        # Drop the position from the book - by ticket, else the oldest one in the symbol
+        position = self.positions.close(closure.ticket, symbol)
+        if position is not None:
+            self.portfolio.add_position(symbol, -position.signed_units)
+            self.triggers.remove(position.ticket)
+        
         # Update daily stats
         self.daily_stats['pnl_percent'] = daily_pnl
         self.daily_stats['consecutive_losses'] = consecutive_losses
@@ -189,21 +294,28 @@ class ProfitableTradingBot:
         else:
             self.daily_stats['losses'] += 1
         
-        # Update profit tracker
+        currency = self.currency_stats.get(symbol)
+        if currency is not None:
+            currency['wins' if is_win else 'losses'] += 1
+            currency['pnl'] += profit_percent
+        
+        # Update profit tracker and the risk counters behind Risk Rules 1-3
         self._update_profit_tracker(profit_percent)
+        self.risk_manager.record_trade_result((profit_percent / 100) * self.profit_tracker['starting_balance'])
         
         # Log trade closure
         trade_log = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self.now().isoformat(),
             'action': 'TRADE_CLOSED',
             'symbol': symbol,
             'profit_percent': profit_percent,
             'is_win': is_win,
             'daily_pnl': daily_pnl,
             'consecutive_losses': consecutive_losses,
+            'ticket': position.ticket if position is not None else closure.ticket,
             'status': 'closed'
         }
-        self.trade_history.append(trade_log)
+        self._record(trade_log)
         
         # Check for withdrawal recommendation
         withdrawal_rec = self._check_withdrawal_recommendation()
@@ -216,13 +328,13 @@ class ProfitableTradingBot:
             "withdrawal_recommendation": withdrawal_rec
         }
     
-    def _handle_emergency_stop(self, signal_data: Dict) -> Dict:
+    def _handle_emergency_stop(self, alert: EmergencyStop) -> Dict:
         """Handle emergency stop from MT5 EA"""
         
-        alert_type = signal_data.get('alert_type', 'UNKNOWN')
-        daily_pnl = float(signal_data.get('daily_pnl', 0))
-        daily_trades = int(signal_data.get('daily_trades', 0))
-        consecutive_losses = int(signal_data.get('consecutive_losses', 0))
+        alert_type = alert.alert_type
+        daily_pnl = alert.daily_pnl
+        daily_trades = alert.daily_trades
+        consecutive_losses = alert.consecutive_losses
         
         logging.critical(f"🚨 EMERGENCY STOP: {alert_type} | P&L: {daily_pnl}% | Trades: {daily_trades} | Losses: {consecutive_losses}")
         
@@ -233,7 +345,7 @@ class ProfitableTradingBot:
         
         # Log emergency stop
         emergency_log = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self.now().isoformat(),
             'action': 'EMERGENCY_STOP',
             'alert_type': alert_type,
             'daily_pnl': daily_pnl,
@@ -241,7 +353,7 @@ class ProfitableTradingBot:
             'consecutive_losses': consecutive_losses,
             'status': 'emergency_stop'
         }
-        self.trade_history.append(emergency_log)
+        self._record(emergency_log)
         
         return {
             "status": "emergency_stop_activated",
@@ -249,20 +361,200 @@ class ProfitableTradingBot:
             "message": "Trading stopped due to risk limits"
         }
     
-    def _validate_trade_conditions(self, signal_data: Dict) -> Dict:
+    def _record(self, event: Dict):
+        """Append an event to the in-memory history and the journal"""
+        self.trade_history.append(event)
+        if self.trade_journal is not None:
+            # Keyed by the store id and the input's WAL seq, so a replay re-journals only the rows
+            # a crash lost, and a wiped STATE_DIR (seq back at 1) never collides with older rows
+            source = None
+            if self._input_seq is not None:
+                source = f"{self._input_seq}:{self._input_events}"
+                if self.state_store.store_id:
+                    source = f"{self.state_store.store_id}:{source}"
+                self._input_events += 1
+            self.trade_journal.append(event, source)
+        if self._replaying:
+            return  # Replayed events were already streamed
+        if self.event_stream is not None:
+            self.event_stream.publish('trade', event)
+    
+    def _state_changed(self):
+        """Bump state_version and stream the status sections that changed"""
+        self.state_version += 1
+        if self.event_stream is None or self._replaying:
+            return
+        sections = self._state_sections()
+        changes = {key: value for key, value in sections.items() if self._published_sections.get(key) != value}
+        if changes:
+            self._published_sections = sections
+            self.event_stream.publish('state', {'version': self.state_version, 'changes': changes})
+    
+    def _state_sections(self) -> Dict:
+        """
+        Parts of get_status() that change with bot state, copied so they can be compared later
+        Changes no state: a rollover still pending shows as the new day's empty counters
+        """
+        daily_stats = self.daily_stats
+        currency_stats = self.currency_stats
+        today = self.clock.today()
+        if today != daily_stats['last_reset']:
+            daily_stats = self._new_daily_stats(today)
+            currency_stats = {symbol: {**stats, 'signals_today': 0, 'trades_today': 0}
+                              for symbol, stats in currency_stats.items()}
+        total_closed = daily_stats['wins'] + daily_stats['losses']
+        win_rate = (daily_stats['wins'] / total_closed * 100) if total_closed > 0 else 0
+        return {
+            'automation_phase': self.automation_phase,
+            'emergency_stop': self.emergency_stop,
+            'daily_stats': {
+                **daily_stats,
+                'win_rate': win_rate,
+                'total_closed_trades': total_closed
+            },
+            'profit_tracker': dict(self.profit_tracker),
+            'withdrawal_recommendation': self._check_withdrawal_recommendation(),
+            'positions': self.positions.get_summary(),
+            'currency_stats': {symbol: dict(stats) for symbol, stats in currency_stats.items()}
+        }
+    
+    # ------------------------------------------------------------------
+    # Crash-safe state
+    # ------------------------------------------------------------------
+    
+    def _journal_input(self, kind: str, data: Optional[Dict] = None, timestamp: Optional[datetime] = None):
+        if self.state_store is not None and not self._replaying:
+            self._input_seq = self.state_store.append(kind, data, (timestamp or self.now()).isoformat())
+            self._input_events = 0
+    
+    def _at(self, timestamp: datetime, handler, *args):
+        """Run handler with the clock fixed at timestamp"""
+        clock = self.now
+        self.now = lambda: timestamp
+        try:
+            return handler(*args)
+        finally:
+            self.now = clock
+    
+    def _checkpoint(self):
+        if self.state_store is not None and not self._replaying and self.state_store.should_snapshot():
+            self.checkpoint()
+    
+    def checkpoint(self):
+        """Write a snapshot now so the next startup has nothing to replay"""
+        if self.state_store is not None:
+            if self.trade_journal is not None:
+                self.trade_journal.flush()  # The snapshot drops WAL records a replay would re-journal from
+            self.state_store.write_snapshot(self.snapshot_state())
+    
+    def snapshot_state(self) -> Dict:
+        """Compact, JSON-safe copy of everything the risk decisions depend on"""
+        return {
+            'automation_phase': self.automation_phase,
+            'emergency_stop': self.emergency_stop,
+            'daily_stats': {**self.daily_stats, 'last_reset': self.daily_stats['last_reset'].isoformat()},
+            'profit_tracker': dict(self.profit_tracker),
+            'currency_stats': {symbol: dict(stats) for symbol, stats in self.currency_stats.items()},
+            'risk_manager': self.risk_manager.get_state(),
+            'portfolio': self.portfolio.get_state(),
+            'positions': self.positions.get_state(),
+            'broker': self.broker.get_state()
+        }
+    
+    def restore_state(self, state: Dict):
+        self.automation_phase = state['automation_phase']
+        self.emergency_stop = state['emergency_stop']
+        self.daily_stats = {
+            **state['daily_stats'],
+            'last_reset': datetime.fromisoformat(state['daily_stats']['last_reset']).date()
+        }
+        self.profit_tracker = dict(state['profit_tracker'])
+        for symbol, stats in state['currency_stats'].items():
+            self.currency_stats.setdefault(symbol, {}).update(stats)
+        self.risk_manager.restore_state(state['risk_manager'])
+        if 'portfolio' in state:  # Snapshots written before the portfolio engine have none
+            self.portfolio.restore_state(state['portfolio'])
+        if 'positions' in state:
+            self.positions.restore_state(state['positions'])
+            self.triggers = TriggerIndex()
+            for position in self.positions.all():
+                self.triggers.add(position.ticket, position.symbol, position.side,
+                                  position.stop_loss, position.take_profit)
+        if 'broker' in state:
+            self.broker.restore_state(state['broker'])
+        self._state_changed()
+    
+    def recover(self) -> Dict:
+        """
+        Load the latest snapshot and replay the journal tail written after it
+        Replay is bounded by STATE_SNAPSHOT_EVERY inputs, so startup time is too
+        """
+        started = time.perf_counter()
+        state, records = self.state_store.load()
+        if state is not None:
+            self.restore_state(state)
+        
+        replay = {
+            'signal': self.process_signal,
+            'automation_phase': lambda data: self.set_automation_phase(data['phase']),
+            'emergency_stop': lambda data: self.activate_emergency_stop(data['reason']),
+            'reset_emergency_stop': lambda data: self.reset_emergency_stop(),
+            'toggle_emergency_stop': lambda data: self.toggle_emergency_stop()
+        }
+        
+        # Day rollover follows the journaled times, not the restart time
+        live_clock = self.clock
+        replay_clock = live_clock.simulated()
+        self.set_clock(replay_clock)
+        self._replaying = True
+        try:
+            for record in records:
+                handler = replay.get(record['kind'])
+                if handler is None:
+                    logging.warning(f"Skipping unknown journal record: {record['kind']}")
+                    continue
+                timestamp = datetime.fromisoformat(record['ts'])
+                replay_clock.set(timestamp)
+                self._input_seq, self._input_events = record['seq'], 0
+                self._at(timestamp, handler, record['data'])
+        finally:
+            self._replaying = False
+            self.set_clock(live_clock)
+        
+        if records:
+            self.checkpoint()  # Compact the replayed tail into a fresh snapshot
+        
+        self.recovery_stats = {
+            'snapshot_loaded': state is not None,
+            'replayed_inputs': len(records),
+            'seq': self.state_store.seq,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+        logging.info(f"♻️ State recovered: snapshot={state is not None}, replayed {len(records)} inputs "
+                     f"in {self.recovery_stats['duration_ms']} ms")
+        return self.recovery_stats
+    
+    def set_clock(self, clock: Clock):
+        """Switch the bot and its RiskManager to another clock (simulated time for replay)"""
+        self.clock = clock
+        self.now = clock.now
+        self.risk_manager.clock = clock
+        self.broker.clock = clock
+    
+    def _validate_trade_conditions(self, signal: TradingSignal) -> Dict:
         """Validate if trade should be allowed"""
         
         # Basic validation
         if self.emergency_stop:
             return {"allowed": False, "reason": "Emergency stop active"}
         
-        if self.daily_stats['trades'] >= 5:  # Max trades per day
+        if self.daily_stats['trades'] >= Config.EA_MAX_DAILY_TRADES:  # Max trades per day
             return {"allowed": False, "reason": "Daily trade limit reached"}
         
-        if self.daily_stats['pnl_percent'] <= -2.0:  # Max daily loss
+        if self.daily_stats['pnl_percent'] <= -Config.EA_MAX_DAILY_LOSS_PERCENT:  # Max daily loss
             return {"allowed": False, "reason": "Daily loss limit reached"}
         
-        if self.daily_stats['consecutive_losses'] >= 2:  # Max consecutive losses
+        if self.daily_stats['consecutive_losses'] >= Config.EA_MAX_CONSECUTIVE_LOSSES:  # Max consecutive losses
             return {"allowed": False, "reason": "Too many consecutive losses"}
         
         return {"allowed": True, "reason": "All conditions passed"}
@@ -302,23 +594,31 @@ class ProfitableTradingBot:
             "message": "Consider withdrawing profits" if should_withdraw else "Continue trading"
         }
     
+    @staticmethod
+    def _new_daily_stats(day) -> Dict:
+        return {
+            'trades': 0,
+            'wins': 0,
+            'losses': 0,
+            'pnl_percent': 0.0,
+            'consecutive_losses': 0,
+            'last_reset': day
+        }
+    
     def _check_new_day(self):
-        """Check if it's a new day and reset counters"""
+        """Check if it's a new day and reset counters - call with the signal lock held"""
         
-        today = datetime.now().date()
+        today = self.clock.today()
         if today != self.daily_stats['last_reset']:
             logging.info(f"📅 New day - Resetting daily stats")
             logging.info(f"📊 Yesterday: {self.daily_stats}")
             
-            self.daily_stats = {
-                'trades': 0,
-                'wins': 0,
-                'losses': 0,
-                'pnl_percent': 0.0,
-                'consecutive_losses': 0,
-                'last_reset': today
-            }
-            self.emergency_stop = False  # Reset emergency stop for new day
+            self.daily_stats = self._new_daily_stats(today)
+            # Reset currency daily stats
+            for currency in self.currency_stats:
+                self.currency_stats[currency]['signals_today'] = 0
+                self.currency_stats[currency]['trades_today'] = 0
+            self._state_changed()
     
     def set_automation_phase(self, phase: str) -> Dict:
         """Set automation phase"""
@@ -327,8 +627,11 @@ class ProfitableTradingBot:
         if phase not in valid_phases:
             return {"status": "error", "message": f"Invalid phase. Must be one of: {valid_phases}"}
         
+        self._journal_input('automation_phase', {'phase': phase})
         old_phase = self.automation_phase
         self.automation_phase = phase
+        self._state_changed()
+        self._checkpoint()
         
         logging.info(f"🔄 Automation phase changed: {old_phase} → {phase}")
         
@@ -339,34 +642,43 @@ class ProfitableTradingBot:
             "message": f"Automation phase set to {phase}"
         }
     
+    def status_etag(self) -> str:
+        """ETag of the current state - changes whenever get_status() would; changes no state"""
+        return f'"{self.instance_id}-{self.state_version}-{self.clock.today().isoformat()}"'
+    
     def get_status(self) -> Dict:
-        """Get comprehensive bot status"""
+        """
+        Get comprehensive bot status
+        Cached per state_version and trading day - treat the returned dict as read-only
+        Never changes bot state, but reads live state - call it under the signal lock
+        """
         
-        self._check_new_day()
+        today = self.clock.today()
+        cached = self._status_cache
+        if cached is not None and cached[0] == self.state_version and cached[1] == today:
+            return cached[2]
         
-        # Calculate win rate
-        total_closed = self.daily_stats['wins'] + self.daily_stats['losses']
-        win_rate = (self.daily_stats['wins'] / total_closed * 100) if total_closed > 0 else 0
+        recent_trades = self.trade_history[-10:]
         
-        return {
+        status = {
             'running': True,
-            'automation_phase': self.automation_phase,
-            'emergency_stop': self.emergency_stop,
-            'daily_stats': {
-                **self.daily_stats,
-                'win_rate': win_rate,
-                'total_closed_trades': total_closed
-            },
-            'profit_tracker': self.profit_tracker,
-            'withdrawal_recommendation': self._check_withdrawal_recommendation(),
-            'recent_trades': self.trade_history[-10:],
-            'total_signals': len(self.trade_history)
+            **self._state_sections(),
+            'supported_currencies': self.supported_currencies,
+            'recent_trades': recent_trades,
+            'recent_signals': recent_trades,
+            'total_signals': self.trade_history.total_count,
+            'state_version': self.state_version
         }
+        self._status_cache = (self.state_version, today, status)
+        return status
     
     def reset_emergency_stop(self) -> Dict:
         """Manual reset of emergency stop (admin function)"""
         
+        self._journal_input('reset_emergency_stop')
         self.emergency_stop = False
+        self._state_changed()
+        self._checkpoint()
         logging.info("🔄 Emergency stop manually reset")
         
         return {
@@ -375,14 +687,15 @@ class ProfitableTradingBot:
         }
     def _process_semi_auto_signal(self, signal_log: Dict) -> Dict:
         """Process signal in semi-automatic mode"""
-        # In semi-auto, we validate but don't execute automatically
-        validation = self.risk_manager.validate_trade(
-            signal_log['symbol'], 
-            signal_log['action'], 
-            float(signal_log['price'])
+        # In semi-auto, we validate against the open positions but don't execute automatically
+        validation = self.risk_manager.check_trade_allowed(
+            signal_log['symbol'],
+            signal_log['action'],
+            float(signal_log['price']),
+            self.positions
         )
         
-        if validation['valid']:
+        if validation['allowed']:
             return {
                 "status": "validated",
                 "message": f"{signal_log['symbol']} {signal_log['action']} signal validated - Manual approval required",
@@ -399,22 +712,23 @@ class ProfitableTradingBot:
     def _process_full_auto_signal(self, signal_log: Dict) -> Dict:
         """Process signal in full automatic mode"""
         # Check daily limits
-        if self.daily_stats['trades'] >= 5:
+        if self.daily_stats['trades'] >= Config.EA_MAX_DAILY_TRADES:
             return {"status": "rejected", "reason": "Daily trade limit reached"}
         
-        if self.daily_stats['pnl_percent'] <= -2.0:
+        if self.daily_stats['pnl_percent'] <= -Config.EA_MAX_DAILY_LOSS_PERCENT:
             return {"status": "rejected", "reason": "Daily loss limit reached"}
         
-        # Validate trade
-        validation = self.risk_manager.validate_trade(
-            signal_log['symbol'], 
-            signal_log['action'], 
-            float(signal_log['price'])
+        # Validate trade against the open positions
+        validation = self.risk_manager.check_trade_allowed(
+            signal_log['symbol'],
+            signal_log['action'],
+            float(signal_log['price']),
+            self.positions
         )
         
-        if validation['valid']:
+        if validation['allowed']:
             # Execute trade automatically
-            trade_result = self._execute_trade(signal_log)
+            trade_result = self._execute_trade(signal_log, validation['position_size'])
             return trade_result
         else:
             return {
@@ -423,110 +737,81 @@ class ProfitableTradingBot:
                 "signal": signal_log
             }
     
-    def _execute_trade(self, signal_log: Dict) -> Dict:
-        """Execute trade in simulation mode"""
-        # Simulate trade execution
-        self.daily_stats['trades'] += 1
-        
-        # Update currency stats
+    def _execute_trade(self, signal_log: Dict, position_size: float) -> Dict:
+        """
+        Execute trade in simulation mode through the paper broker
+        BUY opens a position, SELL closes the oldest paper one in the symbol; the broker
+        reports each fill back through process_signal like the EA would
+        """
         symbol = signal_log['symbol']
-        if symbol in self.currency_stats:
-            self.currency_stats[symbol]['trades_today'] += 1
-        
-        # Simulate profit/loss (for demo purposes)
-        import random
-        win_rate = 0.65  # 65% win rate for small wins strategy
-        
-        if random.random() < win_rate:
-            # Win
-            profit_percent = random.uniform(0.4, 0.8)  # 0.4-0.8% profit
-            self.daily_stats['wins'] += 1
-            self.daily_stats['consecutive_losses'] = 0
+        price = float(signal_log['price'])
+        
+        if signal_log['action'] == 'BUY':
+            fill = self.broker.submit(
+                symbol, 'BUY', position_size,
+                stop_loss=price * (1 - Config.STOP_LOSS_PERCENT / 100),
+                take_profit=price * (1 + Config.TAKE_PROFIT_PERCENT / 100)
+            )
+            if fill['status'] != 'filled':
+                return {"status": "rejected", "reason": fill['reason'], "signal": signal_log}
             if symbol in self.currency_stats:
-                self.currency_stats[symbol]['wins'] += 1
-                self.currency_stats[symbol]['pnl'] += profit_percent
-        else:
-            # Loss
-            profit_percent = -0.5  # Fixed 0.5% loss (tight stop)
-            self.daily_stats['losses'] += 1
-            self.daily_stats['consecutive_losses'] += 1
-            if symbol in self.currency_stats:
-                self.currency_stats[symbol]['losses'] += 1
-                self.currency_stats[symbol]['pnl'] += profit_percent
-        
-        self.daily_stats['pnl_percent'] += profit_percent
-        
-        # Update profit tracker
-        profit_amount = (profit_percent / 100) * self.profit_tracker['current_balance']
-        self.profit_tracker['current_balance'] += profit_amount
-        self.profit_tracker['total_profit'] += profit_amount
-        
-        if self.profit_tracker['total_profit'] > 0:
-            self.profit_tracker['withdrawable_profit'] = self.profit_tracker['total_profit'] * 0.8
+                self.currency_stats[symbol]['trades_today'] += 1
+            return {
+                "status": "executed",
+                "message": f"{symbol} BUY paper position opened @ {fill['price']:.5f}",
+                "ticket": fill['ticket'],
+                "fill_price": fill['price'],
+                "position_size": position_size,
+                "signal": signal_log
+            }
         
+        # EA positions may sit ahead of ours in the book - the EA closes those itself
+        position = next((p for p in self.positions.positions_for(symbol) if p.ticket in self.broker), None)
+        if position is None:
+            return {
+                "status": "rejected",
+                "reason": f"{symbol} positions are managed by the EA",
+                "signal": signal_log
+            }
+        fill = self.broker.close(position.ticket)
         return {
             "status": "executed",
-            "message": f"{symbol} {signal_log['action']} trade executed",
-            "profit_percent": profit_percent,
+            "message": f"{symbol} SELL closed paper position {position.ticket} @ {fill['price']:.5f}",
+            "ticket": position.ticket,
+            "fill_price": fill['price'],
+            "profit_percent": fill['profit_percent'],
             "new_balance": self.profit_tracker['current_balance'],
             "signal": signal_log
         }
     
-    def _check_new_day(self):
-        """Reset daily stats if new day"""
-        today = datetime.now().date()
-        if self.daily_stats['last_reset'] != today:
-            self.daily_stats = {
-                'trades': 0,
-                'wins': 0,
-                'losses': 0,
-                'pnl_percent': 0.0,
-                'consecutive_losses': 0,
-                'last_reset': today
-            }
-            # Reset currency daily stats
-            for currency in self.currency_stats:
-                self.currency_stats[currency]['signals_today'] = 0
-                self.currency_stats[currency]['trades_today'] = 0
+    def _check_triggers(self, symbol: str, price: float):
+        """Log EA positions whose stop loss or take profit this quote crossed - the EA reports the close"""
+        for ticket, reason, level in self.triggers.on_price(symbol, price):
+            if ticket in self.broker:
+                continue  # Paper positions are closed by the broker's own trigger index
+            logging.info(f"⏳ {symbol} #{ticket} crossed {reason} @ {level} - waiting for the EA close report")
     
-    def _handle_emergency_stop(self, signal_data: Dict) -> Dict:
-        """Handle emergency stop signal"""
+    def activate_emergency_stop(self, reason: str = "MANUAL") -> Dict:
+        """Manual emergency stop (admin function)"""
+        
+        self._journal_input('emergency_stop', {'reason': reason})
         self.emergency_stop = True
-        logging.warning("🚨 EMERGENCY STOP ACTIVATED")
-        return {"status": "emergency_stop_activated"}
-    
-    def _handle_trade_execution(self, signal_data: Dict) -> Dict:
-        """Handle trade execution notification"""
-        return {"status": "trade_execution_logged"}
-    
-    def _handle_trade_closure(self, signal_data: Dict) -> Dict:
-        """Handle trade closure notification"""
-        return {"status": "trade_closure_logged"}
-    
-    def get_status(self) -> Dict:
-        """Get comprehensive bot status including multi-currency data"""
+        self._state_changed()
+        self._checkpoint()
+        logging.critical(f"🚨 {reason} EMERGENCY STOP ACTIVATED")
+        
         return {
-            "automation_phase": self.automation_phase,
-            "emergency_stop": self.emergency_stop,
-            "daily_stats": self.daily_stats,
-            "profit_tracker": self.profit_tracker,
-            "currency_stats": self.currency_stats,
-            "supported_currencies": self.supported_currencies,
-            "recent_signals": self.trade_history[-10:] if self.trade_history else []
+            "status": "success",
+            "message": "Emergency stop activated",
+            "timestamp": self.now().isoformat()
         }
     
-    def set_automation_phase(self, phase: str) -> bool:
-        """Set automation phase"""
-        valid_phases = ["SIGNAL_ONLY", "SEMI_AUTO", "FULL_AUTO"]
-        if phase in valid_phases:
-            self.automation_phase = phase
-            logging.info(f"🔄 Automation phase changed to: {phase}")
-            return True
-        return False
-    
     def toggle_emergency_stop(self) -> bool:
         """Toggle emergency stop"""
+        self._journal_input('toggle_emergency_stop')
         self.emergency_stop = not self.emergency_stop
+        self._state_changed()
+        self._checkpoint()
         status = "ACTIVATED" if self.emergency_stop else "DEACTIVATED"
         logging.warning(f"🚨 Emergency stop {status}")
         return self.emergency_stop
\ No newline at end of file
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Replay - Offline Event Stream Through the Bot
+Feeds a recorded (STATE_DIR/wal.jsonl, NDJSON or JSON array of webhook
+payloads) or generated stream of BUY / SELL / TRADE_EXECUTED / TRADE_CLOSED /
+EMERGENCY_STOP events straight into a ProfitableTradingBot - no HTTP, no
+journal, no WAL. The bot's clock is a SimulatedClock set to each event's time,
+so day rollover and every logged timestamp follow the stream, not the wall
+Reports the final state and the throughput in events per second
+"""
+
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from clock import Clock, SimulatedClock
+from config import Config
+from profitable_bot import ProfitableTradingBot
+from trade_history import TradeHistory
+
+SYMBOLS = ['EURUSD', 'GBPUSD', 'USDJPY', 'AUDUSD', 'EURJPY', 'GBPJPY', 'EURGBP']
+START_PRICES = {'EURUSD': 1.085, 'GBPUSD': 1.265, 'USDJPY': 150.0, 'AUDUSD': 0.655,
+                'EURJPY': 162.5, 'GBPJPY': 189.5, 'EURGBP': 0.857}
+
+Record = Tuple[datetime, str, Dict]  # (event time, WAL kind, payload)
+
+def _parse_time(value, clock: Clock) -> datetime:
+    """ISO string or epoch seconds / milliseconds → naive wall time in the clock's trading timezone"""
+    if isinstance(value, (int, float)):
+        value = datetime.fromtimestamp(value / 1000 if value > 1e11 else value, tz=timezone.utc)
+    else:
+        value = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    return clock.localize(value)
+
+def load_events(path: str, clock: Optional[Clock] = None) -> List[Record]:
+    """
+    Events from a file, in file order
+    - WAL records {'seq', 'kind', 'ts', 'data'} replay exactly as recover() would (admin actions included)
+    - raw webhook payloads take their time from 'timestamp' or 'time'; without one they reuse the previous time
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    items = json.loads(text) if text.lstrip().startswith('[') else \
+        [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    clock = clock or Clock()
+    records = []
+    previous = None
+    for item in items:
+        if 'kind' in item and 'ts' in item:
+            timestamp, kind, data = _parse_time(item['ts'], clock), item['kind'], item.get('data') or {}
+        else:
+            raw_time = item.get('timestamp', item.get('time'))
+            timestamp, kind, data = _parse_time(raw_time, clock) if raw_time is not None else previous, 'signal', item
+        if timestamp is None:
+            raise ValueError(f"First event in {path} has no timestamp")
+        records.append((timestamp, kind, data))
+        previous = timestamp
+    return records
+
+def save_events(records: Iterable[Record], path: str):
+    """Write records as WAL-format NDJSON, readable by load_events"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for seq, (timestamp, kind, data) in enumerate(records, 1):
+            f.write(json.dumps({'seq': seq, 'kind': kind, 'ts': timestamp.isoformat(), 'data': data}) + '\n')
+
+def generate_events(count: int = 100_000, symbols: Sequence[str] = SYMBOLS,
+                    start: datetime = datetime(2026, 1, 5), mean_gap_seconds: float = 60.0,
+                    seed: int = 42) -> List[Record]:
+    """
+    A synthetic stream shaped like live traffic: random-walk quotes behind BUY / SELL
+    signals, EA fills (TRADE_EXECUTED) later closed with a P&L (TRADE_CLOSED), and
+    an EMERGENCY_STOP whenever the EA's daily loss / consecutive-loss limit trips
+    The operator's reset_emergency_stop follows at the next day's first event
+    """
+    rng = np.random.default_rng(seed)
+    gaps = rng.exponential(mean_gap_seconds, count)
+    picks = rng.integers(0, len(symbols), count)
+    moves = rng.normal(0.0, 0.0004, count)
+    draws = rng.random(count)
+    buys = rng.random(count) < 0.5  # Side of a BUY / SELL signal
+    results = rng.normal(0.05, 0.6, count)  # profit_percent of a closed trade
+
+    prices = {symbol: START_PRICES.get(symbol, 1.0) for symbol in symbols}
+    open_trades: Dict[str, str] = {}  # symbol → ticket of the EA's open trade
+    day, daily_trades, daily_pnl, consecutive_losses, stopped = None, 0, 0.0, 0, False
+    now = start
+    records: List[Record] = []
+
+    for i in range(count):
+        now += timedelta(seconds=float(gaps[i]))
+        if now.date() != day:
+            if stopped:
+                records.append((now, 'reset_emergency_stop', None))
+            day, daily_trades, daily_pnl, consecutive_losses, stopped = now.date(), 0, 0.0, 0, False
+
+        symbol = symbols[picks[i]]
+        prices[symbol] *= 1.0 + float(moves[i])
+        price = round(prices[symbol], 3 if 'JPY' in symbol else 5)
+        draw = float(draws[i])
+
+        if symbol in open_trades and draw < 0.15:
+            ticket = open_trades.pop(symbol)
+            profit = round(float(results[i]), 3)
+            daily_pnl = round(daily_pnl + profit, 3)
+            consecutive_losses = 0 if profit > 0 else consecutive_losses + 1
+            records.append((now, 'signal', {
+                'action': 'TRADE_CLOSED', 'symbol': symbol, 'profit_percent': profit, 'is_win': profit > 0,
+                'daily_pnl': daily_pnl, 'consecutive_losses': consecutive_losses, 'ticket': ticket
+            }))
+            if not stopped and (daily_pnl <= -Config.EA_MAX_DAILY_LOSS_PERCENT or
+                                consecutive_losses >= Config.EA_MAX_CONSECUTIVE_LOSSES):
+                stopped = True
+                alert = 'DAILY_LOSS_LIMIT' if daily_pnl <= -Config.EA_MAX_DAILY_LOSS_PERCENT else 'CONSECUTIVE_LOSSES'
+                records.append((now, 'signal', {
+                    'action': 'EMERGENCY_STOP', 'alert_type': alert, 'daily_pnl': daily_pnl,
+                    'daily_trades': daily_trades, 'consecutive_losses': consecutive_losses
+                }))
+        elif symbol not in open_trades and not stopped and daily_trades < Config.EA_MAX_DAILY_TRADES and draw < 0.25:
+            side = 'BUY' if draw < 0.125 else 'SELL'
+            direction = 1 if side == 'BUY' else -1
+            daily_trades += 1
+            ticket = f"G{i}"
+            open_trades[symbol] = ticket
+            records.append((now, 'signal', {
+                'action': 'TRADE_EXECUTED', 'symbol': symbol, 'side': side, 'price': price, 'lot_size': 0.01,
+                'stop_loss': round(price * (1 - direction * Config.STOP_LOSS_PERCENT / 100), 5),
+                'take_profit': round(price * (1 + direction * Config.TAKE_PROFIT_PERCENT / 100), 5),
+                'reason': 'EMA_CROSS', 'daily_trades': daily_trades, 'ticket': ticket
+            }))
+        else:
+            records.append((now, 'signal', {
+                'action': 'BUY' if buys[i] else 'SELL', 'symbol': symbol, 'price': price,
+                'strategy': 'EMA_RSI', 'timeframe': '15m', 'reason': 'EMA_CROSS'
+            }))
+    return records
+
+def replay(records: Sequence[Record], phase: str = 'SIGNAL_ONLY', quiet: bool = True) -> Dict:
+    """
+    Run records through a fresh in-memory bot and return the report
+    quiet silences the bot's per-event logging, which would otherwise dominate the timing
+    """
+    clock = SimulatedClock(records[0][0] if records else None)
+    previous_level = logging.root.manager.disable
+    if quiet:
+        logging.disable(logging.CRITICAL)
+    try:
+        bot = ProfitableTradingBot(trade_history=TradeHistory(directory=''), clock=clock)
+        bot.set_automation_phase(phase)
+
+        handlers = {
+            'signal': bot.process_signal,
+            'automation_phase': lambda data: bot.set_automation_phase(data['phase']),
+            'emergency_stop': lambda data: bot.activate_emergency_stop(data['reason']),
+            'reset_emergency_stop': lambda data: bot.reset_emergency_stop(),
+            'toggle_emergency_stop': lambda data: bot.toggle_emergency_stop()
+        }
+        statuses = Counter()
+        actions = Counter()
+        rollovers = 0
+        day = bot.daily_stats['last_reset']
+
+        started = time.perf_counter()
+        for timestamp, kind, data in records:
+            clock.set(timestamp)
+            handler = handlers.get(kind)
+            if handler is None:
+                statuses['skipped'] += 1
+                continue
+            result = handler(data)
+            statuses[result.get('status', 'ok') if isinstance(result, dict) else kind] += 1
+            actions[str(data.get('action', '')).upper() if kind == 'signal' else kind] += 1
+            if bot.daily_stats['last_reset'] != day:
+                day = bot.daily_stats['last_reset']
+                rollovers += 1
+        elapsed = time.perf_counter() - started
+    finally:
+        logging.disable(previous_level)
+
+    return {
+        'events': len(records),
+        'elapsed_seconds': round(elapsed, 4),
+        'events_per_second': round(len(records) / elapsed, 1) if elapsed > 0 else 0.0,
+        'first_event': records[0][0].isoformat() if records else None,
+        'last_event': records[-1][0].isoformat() if records else None,
+        'day_rollovers': rollovers,
+        'actions': dict(actions),
+        'results': dict(statuses),
+        'open_positions': len(bot.positions.all()),
+        'final_state': bot.snapshot_state()
+    }
+
+def format_report(report: Dict) -> str:
+    state = report['final_state']
+    tracker = state['profit_tracker']
+    lines = [
+        f"Events:        {report['events']:,} ({report['first_event']} → {report['last_event']})",
+        f"Throughput:    {report['events_per_second']:,.0f} events/s ({report['elapsed_seconds']:.3f} s)",
+        f"Day rollovers: {report['day_rollovers']}",
+        "Actions:       " + ", ".join(f"{name} {count:,}" for name, count in sorted(report['actions'].items())),
+        "Results:       " + ", ".join(f"{name} {count:,}" for name, count in sorted(report['results'].items())),
+        f"Final state:   phase {state['automation_phase']}, emergency stop {state['emergency_stop']}, "
+        f"{report['open_positions']} open positions",
+        f"Balance:       ${tracker['current_balance']:,.2f} (total profit ${tracker['total_profit']:,.2f})",
+        f"Today:         {state['daily_stats']}"
+    ]
+    return "\n".join(lines)
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python replay.py <events.jsonl | wal.jsonl | generate[:count]> [SIGNAL_ONLY|SEMI_AUTO|FULL_AUTO] [--json]")
+        sys.exit(1)
+
+    source = sys.argv[1]
+    phase = sys.argv[2].upper() if len(sys.argv) > 2 and not sys.argv[2].startswith('--') else 'SIGNAL_ONLY'
+    if source.startswith('generate'):
+        count = int(source.split(':', 1)[1]) if ':' in source else 100_000
+        records = generate_events(count)
+    else:
+        records = load_events(source)
+
+    report = replay(records, phase)
+    if '--json' in sys.argv:
+        print(json.dumps(report, indent=2, default=str))
+        return
+    print(f"⏪ Replay of {source} in {phase}")
+    print("=" * 72)
+    print(format_report(report))
+    print("=" * 72)
+
+if __name__ == "__main__":
+    main()
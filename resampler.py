@@ -0,0 +1,233 @@
+"""
+Resampler - Streaming Ticks / 1m Bars → 15m, 1h, 4h OHLCV
+Buckets are aligned to UTC epoch boundaries (a 4h bar opens at 00:00, 04:00,
+...). The feed time is the latest timestamp seen (or advance()d by a timer);
+a bucket closes once the feed time passes its end plus a grace window, and
+one BarBatch per timeframe and boundary is emitted with every symbol's bar
+State is two buckets per symbol and timeframe (the one filling and the one
+still inside its grace window), so memory does not grow with the tick count
+"""
+
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+from config import Config
+
+TIMEFRAMES = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '1h': 3600,
+    '4h': 14400,
+    '1d': 86400
+}
+
+Timestamp = Union[int, float, datetime]
+
+def _epoch(timestamp: Timestamp) -> float:
+    return timestamp.timestamp() if isinstance(timestamp, datetime) else float(timestamp)
+
+class BarBatch:
+    """Bars of one timeframe that closed at the same boundary; NaN where a symbol had no ticks"""
+    __slots__ = ('timeframe', 'time', 'symbols', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, timeframe: str, time: int, symbols: List[str], open, high, low, close, volume):
+        self.timeframe = timeframe
+        self.time = time  # Bucket start, epoch seconds (TradingView bar time)
+        self.symbols = symbols
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @property
+    def close_time(self) -> int:
+        return self.time + TIMEFRAMES[self.timeframe]
+
+    def __iter__(self) -> Iterator[Tuple[str, float, float, float, float, float]]:
+        """(symbol, open, high, low, close, volume) for symbols that have a bar"""
+        for i in np.flatnonzero(~np.isnan(self.close)).tolist():
+            yield self.symbols[i], self.open[i], self.high[i], self.low[i], self.close[i], self.volume[i]
+
+class _Buckets:
+    """Open and grace-window buckets of one timeframe, two slots per symbol (bucket % 2)"""
+
+    def __init__(self, timeframe: str, count: int):
+        self.timeframe = timeframe
+        self.seconds = TIMEFRAMES[timeframe]
+        self.bucket = [[-1] * count, [-1] * count]  # Bucket index held by each slot, -1 = empty
+        self.open = [[0.0] * count, [0.0] * count]
+        self.high = [[0.0] * count, [0.0] * count]
+        self.low = [[0.0] * count, [0.0] * count]
+        self.close = [[0.0] * count, [0.0] * count]
+        self.volume = [[0.0] * count, [0.0] * count]
+        self.first = [[0.0] * count, [0.0] * count]  # Times of the earliest and latest input in the bucket,
+        self.last = [[0.0] * count, [0.0] * count]  # so a late tick only sets open/close if it belongs there
+        self.next = 0  # Lowest bucket index not yet emitted
+
+class Resampler:
+    """
+    Multi-symbol, multi-timeframe bar builder
+    - on_tick(symbol, price, timestamp, volume) / on_minute_bar(symbol, timestamp, o, h, l, c, v)
+    - advance(now): move the feed clock without a tick so quiet feeds still close bars
+    - ticks for a bucket that was already emitted (older than the grace window) are dropped and counted
+    - subscribers get each BarBatch; attach_engine / attach_store wire up an IndicatorEngine / BarStore
+    """
+
+    def __init__(self, symbols: Sequence[str], timeframes: Sequence[str] = Config.RESAMPLE_TIMEFRAMES,
+                 grace_seconds: float = Config.RESAMPLE_GRACE_SECONDS):
+        for timeframe in timeframes:
+            if timeframe not in TIMEFRAMES:
+                raise ValueError(f"Unknown timeframe {timeframe} (use {', '.join(TIMEFRAMES)})")
+        if not 0 <= grace_seconds < min(TIMEFRAMES[timeframe] for timeframe in timeframes):
+            raise ValueError("grace_seconds must be shorter than the smallest timeframe")
+
+        self.symbols = list(symbols)
+        self.index: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.grace_seconds = grace_seconds
+        self._timeframes = sorted((_Buckets(timeframe, len(self.symbols)) for timeframe in timeframes),
+                                  key=lambda buckets: buckets.seconds)  # Shorter timeframes emit first
+        self._subscribers: List[Tuple[Callable[[BarBatch], None], Optional[set]]] = []
+        self.now = float('-inf')  # Feed clock: latest timestamp seen
+        self.stats = {'ticks': 0, 'late_merged': 0, 'late_dropped': 0, 'unknown_symbol': 0, 'batches': 0}
+
+    # ------------------------------------------------------------------
+    # Subscribers
+    # ------------------------------------------------------------------
+
+    def subscribe(self, callback: Callable[[BarBatch], None], timeframes: Optional[Sequence[str]] = None):
+        self._subscribers.append((callback, set(timeframes) if timeframes else None))
+
+    def attach_engine(self, engine, timeframe: str):
+        """Advance an IndicatorEngine by one bar per closed batch; symbols without a bar get NaN"""
+        columns = np.array([self.index.get(symbol, -1) for symbol in engine.symbols])
+        aligned = engine.symbols == self.symbols
+
+        def update(batch: BarBatch):
+            if aligned:
+                engine.update(batch.close, batch.volume)
+                return
+            closes = np.where(columns >= 0, batch.close[columns], np.nan)
+            volumes = np.where(columns >= 0, batch.volume[columns], 0.0)
+            engine.update(closes, volumes)
+
+        self.subscribe(update, [timeframe])
+
+    def attach_store(self, store, timeframes: Optional[Sequence[str]] = None):
+        """Append every closed bar to a BarStore"""
+        def append(batch: BarBatch):
+            for symbol, open_, high, low, close, volume in batch:
+                store.append_bar(symbol, batch.timeframe, batch.time, open_, high, low, close, volume)
+
+        self.subscribe(append, timeframes)
+
+    # ------------------------------------------------------------------
+    # Input
+    # ------------------------------------------------------------------
+
+    def on_tick(self, symbol: str, price: float, timestamp: Timestamp, volume: float = 0.0):
+        self._add(symbol, _epoch(timestamp), price, price, price, price, volume)
+
+    def on_minute_bar(self, symbol: str, timestamp: Timestamp, open_: float, high: float, low: float,
+                      close: float, volume: float = 0.0):
+        """A closed 1m bar (timestamp = its open time); it counts as seen at its close"""
+        start = _epoch(timestamp)
+        self._add(symbol, start, open_, high, low, close, volume)
+        self.advance(start + 60)
+
+    def _add(self, symbol: str, time: float, open_: float, high: float, low: float, close: float, volume: float):
+        i = self.index.get(symbol)
+        if i is None:
+            self.stats['unknown_symbol'] += 1
+            return
+        self.stats['ticks'] += 1
+        late = time < self.now
+        self.advance(time)  # Closes buckets past their grace window, freeing this bucket's slot
+
+        shortest = self._timeframes[0]
+        if int(time // shortest.seconds) < shortest.next:
+            # Its shortest bucket is gone; dropped everywhere so longer bars stay the sum of shorter ones
+            self.stats['late_dropped'] += 1
+            logging.debug(f"⏰ Dropped late tick for {symbol} at {time}")
+            return
+        if late:
+            self.stats['late_merged'] += 1
+
+        for buckets in self._timeframes:
+            bucket = int(time // buckets.seconds)
+            slot = bucket % 2
+            if buckets.bucket[slot][i] != bucket:
+                buckets.bucket[slot][i] = bucket
+                buckets.open[slot][i] = open_
+                buckets.high[slot][i] = high
+                buckets.low[slot][i] = low
+                buckets.close[slot][i] = close
+                buckets.volume[slot][i] = volume
+                buckets.first[slot][i] = buckets.last[slot][i] = time
+                continue
+            if high > buckets.high[slot][i]:
+                buckets.high[slot][i] = high
+            if low < buckets.low[slot][i]:
+                buckets.low[slot][i] = low
+            if time >= buckets.last[slot][i]:
+                buckets.close[slot][i] = close
+                buckets.last[slot][i] = time
+            elif time < buckets.first[slot][i]:
+                buckets.open[slot][i] = open_
+                buckets.first[slot][i] = time
+            buckets.volume[slot][i] += volume
+
+    # ------------------------------------------------------------------
+    # Closing buckets
+    # ------------------------------------------------------------------
+
+    def advance(self, now: Timestamp):
+        """Move the feed clock forward and emit every bucket that ended grace_seconds before it"""
+        now = _epoch(now)
+        if now <= self.now:
+            return
+        self.now = now
+        for buckets in self._timeframes:
+            self._emit_until(buckets, int((now - self.grace_seconds) // buckets.seconds))
+
+    def flush(self):
+        """Emit every bucket still open (end of a replay)"""
+        for buckets in self._timeframes:
+            self._emit_until(buckets, max(max(slot) for slot in buckets.bucket) + 1)
+
+    def _emit_until(self, buckets: _Buckets, limit: int):
+        """Emit buckets below limit in order, skipping stretches where no symbol had a tick"""
+        while buckets.next < limit:
+            live = [bucket for slot in buckets.bucket for bucket in slot if bucket >= buckets.next]
+            bucket = min(live) if live else limit
+            if bucket >= limit:
+                buckets.next = limit
+                return
+            self._emit(buckets, bucket)
+            buckets.next = bucket + 1
+
+    def _emit(self, buckets: _Buckets, bucket: int):
+        slot = bucket % 2
+        present = np.array(buckets.bucket[slot]) == bucket
+        columns = [np.where(present, np.array(values[slot]), np.nan)
+                   for values in (buckets.open, buckets.high, buckets.low, buckets.close)]
+        volume = np.where(present, np.array(buckets.volume[slot]), np.nan)
+        for i in np.flatnonzero(present).tolist():
+            buckets.bucket[slot][i] = -1
+
+        batch = BarBatch(buckets.timeframe, bucket * buckets.seconds, self.symbols, *columns, volume)
+        self.stats['batches'] += 1
+        for callback, timeframes in self._subscribers:
+            if timeframes is None or buckets.timeframe in timeframes:
+                callback(batch)
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            'symbols': len(self.symbols),
+            'timeframes': [buckets.timeframe for buckets in self._timeframes],
+            'grace_seconds': self.grace_seconds
+        }
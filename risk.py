@@ -4,15 +4,34 @@ Protects your capital with position sizing, stop loss, and risk limits
 """
 
 import logging
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional, Sequence
+from clock import Clock
 from config import Config
+from metrics import RISK_CHECKS, RISK_REJECTIONS
+from portfolio_risk import PortfolioRisk
+
+# Rejection codes returned by check_trades_batch - index into this tuple, 0 = allowed
+RISK_RULES = (
+    'allowed',
+    'daily_loss_limit',
+    'daily_trade_limit',
+    'consecutive_losses',
+    'max_positions',
+    'duplicate_position',
+    'no_position',
+    'min_position_size',
+    'portfolio_var'
+)
 
 class RiskManager:
-    def __init__(self):
+    def __init__(self, portfolio: Optional[PortfolioRisk] = None, clock: Optional[Clock] = None):
+        self.portfolio = portfolio  # Correlation-aware VaR check, skipped when None
+        self.clock = clock or Clock()  # Trading-day boundaries - shared with the bot
         self.daily_loss = 0.0
         self.daily_trades = 0
-        self.last_reset_date = datetime.now().date()
+        self.last_reset_date = self.clock.today()
         self.consecutive_losses = 0
         
         logging.info("Risk Manager initialized")
@@ -21,6 +40,7 @@ class RiskManager:
         """
         Master risk check - ALL trades must pass this
         Returns: {"allowed": bool, "reason": str, "position_size": float}
+        Rejections also carry "rule" - the code of the rule that blocked the trade
         """
         
         # Reset daily counters if new day
@@ -28,70 +48,137 @@ class RiskManager:
         
         # Risk Rule 1: Daily loss limit
         if self.daily_loss >= Config.MAX_DAILY_LOSS:
-            return {
-                "allowed": False,
-                "reason": f"Daily loss limit reached: ${self.daily_loss:.2f}",
-                "position_size": 0
-            }
+            return self._reject("daily_loss_limit", f"Daily loss limit reached: ${self.daily_loss:.2f}")
         
         # Risk Rule 2: Maximum daily trades
         if self.daily_trades >= Config.MAX_DAILY_TRADES:
-            return {
-                "allowed": False,
-                "reason": f"Daily trade limit reached: {self.daily_trades}",
-                "position_size": 0
-            }
+            return self._reject("daily_trade_limit", f"Daily trade limit reached: {self.daily_trades}")
         
         # Risk Rule 3: Consecutive loss cooldown
         if self.consecutive_losses >= Config.MAX_CONSECUTIVE_LOSSES:
-            return {
-                "allowed": False,
-                "reason": f"Too many consecutive losses: {self.consecutive_losses}",
-                "position_size": 0
-            }
+            return self._reject("consecutive_losses", f"Too many consecutive losses: {self.consecutive_losses}")
         
         # Risk Rule 4: Maximum positions
         if action == 'BUY' and len(positions) >= Config.MAX_POSITIONS:
-            return {
-                "allowed": False,
-                "reason": f"Maximum positions reached: {len(positions)}",
-                "position_size": 0
-            }
+            return self._reject("max_positions", f"Maximum positions reached: {len(positions)}")
         
         # Risk Rule 5: No double positions
         if action == 'BUY' and symbol in positions:
-            return {
-                "allowed": False,
-                "reason": f"Already in position for {symbol}",
-                "position_size": 0
-            }
+            return self._reject("duplicate_position", f"Already in position for {symbol}")
         
         # Risk Rule 6: Must have position to sell
         if action == 'SELL' and symbol not in positions:
-            return {
-                "allowed": False,
-                "reason": f"No position to sell for {symbol}",
-                "position_size": 0
-            }
+            return self._reject("no_position", f"No position to sell for {symbol}")
         
         # Calculate position size
         position_size = self._calculate_position_size(price)
         
         # Risk Rule 7: Minimum position size
         if position_size < Config.MIN_POSITION_SIZE:
-            return {
-                "allowed": False,
-                "reason": f"Position size too small: {position_size}",
-                "position_size": 0
-            }
+            return self._reject("min_position_size", f"Position size too small: {position_size}")
+        
+        # Risk Rule 8: Portfolio VaR - only new exposure is checked, closing a position never is
+        if action == 'BUY' and self.portfolio is not None:
+            portfolio_check = self.portfolio.check_trade(symbol, position_size)
+            if not portfolio_check["allowed"]:
+                return self._reject("portfolio_var", portfolio_check["reason"])
         
         # All checks passed ✅
+        RISK_CHECKS.labels('allowed').inc()
         return {
             "allowed": True,
             "reason": "All risk checks passed",
             "position_size": position_size
         }
     
+    def check_trades_batch(self, symbols: Sequence[str], actions: Sequence[str],
+                           prices: Sequence[float], positions: Dict) -> Dict:
+        """
+        Vectorized check_trade_allowed for many signals against the same risk state
+        Gives the same decision, first failing rule and position size as calling
+        check_trade_allowed on each signal in turn (the checks do not change state)
+        Returns: {"allowed": bool array, "rule": int8 array (index into RISK_RULES),
+                  "position_size": float array, 0 where rejected}
+        """
+        
+        self._reset_daily_counters_if_needed()
+        
+        actions = np.asarray(actions, dtype=str)
+        prices = np.asarray(prices, dtype=np.float64)
+        count = len(prices)
+        rule = np.zeros(count, dtype=np.int8)
+        position_size = np.zeros(count, dtype=np.float64)
+        
+        # Risk Rules 1-3 depend only on the account state - one decision for the whole batch
+        if self.daily_loss >= Config.MAX_DAILY_LOSS:
+            rule[:] = 1
+        elif self.daily_trades >= Config.MAX_DAILY_TRADES:
+            rule[:] = 2
+        elif self.consecutive_losses >= Config.MAX_CONSECUTIVE_LOSSES:
+            rule[:] = 3
+        else:
+            buy = actions == 'BUY'
+            sell = actions == 'SELL'
+            held = np.isin(np.asarray(symbols, dtype=str), list(positions)) if positions else np.zeros(count, dtype=bool)
+            
+            # Risk Rules 4-6 - assigned in order so the first failing rule wins
+            if len(positions) >= Config.MAX_POSITIONS:
+                rule[buy] = 4
+            rule[(rule == 0) & buy & held] = 5
+            rule[(rule == 0) & sell & ~held] = 6
+            
+            # Risk Rule 7: Minimum position size
+            position_size = self._calculate_position_sizes(prices)
+            rule[(rule == 0) & (position_size < Config.MIN_POSITION_SIZE)] = 7
+            
+            # Risk Rule 8: Portfolio VaR, each BUY judged against the current book
+            if self.portfolio is not None:
+                candidates = np.flatnonzero((rule == 0) & buy)
+                if len(candidates):
+                    portfolio_ok = self.portfolio.check_trades(np.asarray(symbols, dtype=str)[candidates],
+                                                               position_size[candidates])
+                    rule[candidates[~portfolio_ok]] = 8
+        
+        allowed = rule == 0
+        position_size = np.where(allowed, position_size, 0.0)
+        
+        per_rule = np.bincount(rule, minlength=len(RISK_RULES))
+        RISK_CHECKS.labels('allowed').inc(int(per_rule[0]))
+        RISK_CHECKS.labels('rejected').inc(int(count - per_rule[0]))
+        for code in np.flatnonzero(per_rule[1:]) + 1:
+            RISK_REJECTIONS.labels(RISK_RULES[code]).inc(int(per_rule[code]))
+        
+        logging.debug(f"Batch risk check: {int(per_rule[0])}/{count} allowed")
+        
+        return {"allowed": allowed, "rule": rule, "position_size": position_size}
+    
+    def _calculate_position_sizes(self, prices: np.ndarray) -> np.ndarray:
+        """_calculate_position_size over an array, with identical float arithmetic and rounding"""
+        account_balance = Config.ACCOUNT_BALANCE
+        risk_amount = account_balance * (Config.RISK_PERCENT / 100)
+        max_position_value = account_balance * (Config.MAX_POSITION_PERCENT / 100)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            position_size = np.minimum(risk_amount / (prices * (Config.STOP_LOSS_PERCENT / 100)),
+                                       max_position_value / prices)
+        position_size[prices == 0] = 0.0  # The scalar path fails on a zero price and returns 0
+        
+        # np.round scales by 1e6 before rounding, so a value sitting on a half-way point can
+        # land on the other side of it - redo those few with Python's correctly rounded round()
+        rounded = np.round(position_size, 6)
+        with np.errstate(invalid='ignore'):
+            scaled = position_size * 1e6
+            halfway = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) <= np.abs(scaled) * 1e-15 + 1e-12
+        for index in np.flatnonzero(halfway):
+            rounded[index] = round(float(position_size[index]), 6)
+        return rounded
+    
+    def _reject(self, rule: str, reason: str) -> Dict:
+        """Rejection result tagged with the rule code that blocked the trade"""
+        RISK_CHECKS.labels('rejected').inc()
+        RISK_REJECTIONS.labels(rule).inc()
+        return {"allowed": False, "reason": reason, "rule": rule, "position_size": 0}
+    
     def _calculate_position_size(self, price: float) -> float:
         """
         Calculate position size based on risk percentage
@@ -148,7 +235,7 @@ class RiskManager:
     
     def _reset_daily_counters_if_needed(self):
         """Reset daily counters at start of new day"""
-        current_date = datetime.now().date()
+        current_date = self.clock.today()
         
         if current_date > self.last_reset_date:
             logging.info("New day - resetting daily risk counters")
@@ -173,6 +260,21 @@ class RiskManager:
             )
         }
     
+    def get_state(self) -> Dict:
+        """Counters needed to restore the risk state after a restart"""
+        return {
+            'daily_loss': self.daily_loss,
+            'daily_trades': self.daily_trades,
+            'last_reset_date': self.last_reset_date.isoformat(),
+            'consecutive_losses': self.consecutive_losses
+        }
+    
+    def restore_state(self, state: Dict):
+        self.daily_loss = state['daily_loss']
+        self.daily_trades = state['daily_trades']
+        self.last_reset_date = datetime.fromisoformat(state['last_reset_date']).date()
+        self.consecutive_losses = state['consecutive_losses']
+    
     def emergency_stop(self):
         """Emergency stop all trading"""
         logging.critical("🚨 EMERGENCY STOP ACTIVATED 🚨")
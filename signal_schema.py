@@ -0,0 +1,319 @@
+"""
+Signal Schema - Typed Webhook Payloads
+Decodes raw TradingView / MT5 EA alerts once into compact slotted objects
+Malformed payloads are rejected here, before they reach the bot
+"""
+
+import json
+import sys
+from enum import Enum
+from functools import partial
+from typing import Dict, List, Optional
+
+try:
+    import orjson
+    _fast_loads = orjson.loads
+except ImportError:  # orjson is optional - fall back to the stdlib decoder
+    orjson = None
+    _fast_loads = json.loads
+
+class SignalValidationError(ValueError):
+    """Raised when a webhook payload cannot be decoded into a signal"""
+
+class UnknownActionError(SignalValidationError):
+    """Raised when the payload carries an action the bot does not handle"""
+
+    def __init__(self, action: str):
+        super().__init__(f"Unknown action: {action}")
+        self.action = action
+
+class Action(str, Enum):
+    BUY = 'BUY'
+    SELL = 'SELL'
+    TRADE_EXECUTED = 'TRADE_EXECUTED'
+    TRADE_CLOSED = 'TRADE_CLOSED'
+    EMERGENCY_STOP = 'EMERGENCY_STOP'
+
+    def __str__(self):
+        return self.value
+
+_ACTIONS = {action.value: action for action in Action}
+_SIDES = {'BUY': Action.BUY, 'SELL': Action.SELL}  # Exact side strings of the fast path
+_SYMBOLS: Dict[str, str] = {}
+_MAX_INTERNED_SYMBOLS = 1024
+_INF = float('inf')
+
+def loads(raw):
+    """Decode a JSON body with orjson when installed, else the stdlib json module"""
+    try:
+        return _fast_loads(raw)
+    except ValueError as e:  # orjson.JSONDecodeError subclasses ValueError
+        raise SignalValidationError(f"Invalid JSON: {str(e)}")
+
+def parse_batch(raw) -> List:
+    """
+    Parse a batch webhook body
+    Accepts a JSON array, a single JSON object, or NDJSON (one object per line)
+    """
+    try:
+        data = _fast_loads(raw)
+        return data if isinstance(data, list) else [data]
+    except ValueError:
+        # Not a single JSON document - fall back to NDJSON
+        text = raw.decode('utf-8') if isinstance(raw, bytes) else raw
+        return [loads(line) for line in text.splitlines() if line.strip()]
+
+def intern_symbol(symbol) -> str:
+    """Return the shared instance of a symbol string so comparisons and dict lookups stay cheap"""
+    try:
+        cached = _SYMBOLS.get(symbol)
+    except TypeError:  # Unhashable - a list or object where a string belongs
+        cached = None
+    if cached is not None:
+        return cached
+    if not isinstance(symbol, str) or not symbol:
+        raise SignalValidationError(f"Invalid symbol: {symbol!r}")
+    value = sys.intern(symbol.strip().upper())
+    if len(_SYMBOLS) < _MAX_INTERNED_SYMBOLS:
+        _SYMBOLS[symbol] = value
+    return value
+
+def _float(data: Dict, key: str, default: float = 0.0) -> float:
+    value = data.get(key)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        if value is None or value == '':
+            return default
+        raise SignalValidationError(f"Invalid {key}: {value!r}")
+    if number - number != 0.0:  # NaN or ±inf
+        raise SignalValidationError(f"Invalid {key}: {value!r}")
+    return number
+
+def _int(data: Dict, key: str, default: int = 0) -> int:
+    value = data.get(key)
+    if value.__class__ is int:
+        return value
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        if value is None or value == '':
+            return default
+        raise SignalValidationError(f"Invalid {key}: {value!r}")
+
+def _bool(data: Dict, key: str, default: bool = False) -> bool:
+    value = data.get(key, default)
+    if isinstance(value, str):
+        return value.strip().lower() in ('true', '1', 'yes')
+    return bool(value)
+
+def _str(data: Dict, key: str, default: str) -> str:
+    value = data.get(key)
+    return default if value is None else str(value)
+
+def _symbol(data: Dict) -> str:
+    symbol = data.get('symbol')
+    return 'UNKNOWN' if symbol is None else intern_symbol(symbol)
+
+def _finite(total: float) -> bool:
+    """False when any number summed into total was NaN or ±inf"""
+    return -_INF < total < _INF
+
+# from_dict() takes a fast path for well-formed payloads - numbers or numeric
+# strings, string fields as strings, a symbol seen before - with no helper calls,
+# which cost as much as the conversions themselves. Anything else goes through
+# _decode(), the validating decoder that defines what is accepted
+
+class SignalEvent:
+    """Base class for decoded webhook payloads"""
+    __slots__ = ()
+    action: Action
+
+    def to_dict(self) -> Dict:
+        """Plain payload that decode_event() turns back into an equal event"""
+        data = {'action': self.action.value}
+        for slot in self.__slots__:
+            value = getattr(self, slot)
+            data[slot] = value.value if isinstance(value, Action) else value
+        return data
+
+class TradingSignal(SignalEvent):
+    """BUY/SELL alert from TradingView or the EA"""
+    __slots__ = ('action', 'symbol', 'price', 'strategy', 'timeframe', 'reason', 'auto_trading')
+
+    def __init__(self, action: Action, symbol: str, price: float, strategy: str = 'UNKNOWN',
+                 timeframe: str = '15m', reason: str = 'NO_REASON', auto_trading: bool = False):
+        self.action = action
+        self.symbol = symbol
+        self.price = price
+        self.strategy = strategy
+        self.timeframe = timeframe
+        self.reason = reason
+        self.auto_trading = auto_trading
+
+    @classmethod
+    def from_dict(cls, action: Action, data: Dict) -> 'TradingSignal':
+        get = data.get
+        try:
+            symbol = _SYMBOLS[get('symbol')]
+            price = float(get('price', 0.0))
+        except (KeyError, TypeError, ValueError):
+            return cls._decode(action, data)
+        strategy = get('strategy', 'UNKNOWN')
+        timeframe = get('timeframe', '15m')
+        reason = get('reason', 'NO_REASON')
+        auto_trading = get('auto_trading', False)
+        if (strategy.__class__ is not str or timeframe.__class__ is not str or reason.__class__ is not str
+                or auto_trading.__class__ is not bool or not 0.0 <= price < _INF):
+            return cls._decode(action, data)
+        return cls(action, symbol, price, strategy, timeframe, reason, auto_trading)
+
+    @classmethod
+    def _decode(cls, action: Action, data: Dict) -> 'TradingSignal':
+        price = _float(data, 'price')
+        if price < 0:
+            raise SignalValidationError(f"Invalid price: {price}")
+        return cls(action, _symbol(data), price,
+                   _str(data, 'strategy', 'UNKNOWN'), _str(data, 'timeframe', '15m'),
+                   _str(data, 'reason', 'NO_REASON'), _bool(data, 'auto_trading'))
+
+class TradeExecution(SignalEvent):
+    """TRADE_EXECUTED confirmation from the EA"""
+    __slots__ = ('symbol', 'side', 'price', 'lot_size', 'stop_loss', 'take_profit',
+                 'reason', 'daily_trades', 'ticket')
+    action = Action.TRADE_EXECUTED
+
+    def __init__(self, symbol: str, side: str, price: float, lot_size: float = 0.0,
+                 stop_loss: float = 0.0, take_profit: float = 0.0, reason: str = 'NO_REASON',
+                 daily_trades: int = 0, ticket: Optional[str] = None):
+        self.symbol = symbol
+        self.side = side
+        self.price = price
+        self.lot_size = lot_size
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.reason = reason
+        self.daily_trades = daily_trades
+        self.ticket = ticket
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TradeExecution':
+        get = data.get
+        try:
+            symbol = _SYMBOLS[get('symbol')]
+            side = _SIDES[get('side')]
+            price = float(get('price', 0.0))
+            lot_size = float(get('lot_size', 0.0))
+            stop_loss = float(get('stop_loss', 0.0))
+            take_profit = float(get('take_profit', 0.0))
+        except (KeyError, TypeError, ValueError):
+            return cls._decode(data)
+        reason = get('reason', 'NO_REASON')
+        daily_trades = get('daily_trades', 0)
+        if (reason.__class__ is not str or daily_trades.__class__ is not int
+                or not _finite(price + lot_size + stop_loss + take_profit)):
+            return cls._decode(data)
+        ticket = get('ticket')
+        return cls(symbol, side, price, lot_size, stop_loss, take_profit, reason, daily_trades,
+                   None if ticket is None else str(ticket))
+
+    @classmethod
+    def _decode(cls, data: Dict) -> 'TradeExecution':
+        side = _str(data, 'side', 'UNKNOWN').upper()
+        side = _ACTIONS[side] if side in ('BUY', 'SELL') else sys.intern(side)
+        ticket = data.get('ticket')
+        return cls(_symbol(data), side, _float(data, 'price'), _float(data, 'lot_size'),
+                   _float(data, 'stop_loss'), _float(data, 'take_profit'),
+                   _str(data, 'reason', 'NO_REASON'), _int(data, 'daily_trades'),
+                   None if ticket is None else str(ticket))
+
+class TradeClosure(SignalEvent):
+    """TRADE_CLOSED report with the realised P&L"""
+    __slots__ = ('symbol', 'profit_percent', 'is_win', 'daily_pnl', 'consecutive_losses', 'ticket')
+    action = Action.TRADE_CLOSED
+
+    def __init__(self, symbol: str, profit_percent: float, is_win: bool = False,
+                 daily_pnl: float = 0.0, consecutive_losses: int = 0, ticket: Optional[str] = None):
+        self.symbol = symbol
+        self.profit_percent = profit_percent
+        self.is_win = is_win
+        self.daily_pnl = daily_pnl
+        self.consecutive_losses = consecutive_losses
+        self.ticket = ticket
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TradeClosure':
+        get = data.get
+        try:
+            symbol = _SYMBOLS[get('symbol')]
+            profit_percent = float(get('profit_percent', 0.0))
+            daily_pnl = float(get('daily_pnl', 0.0))
+        except (KeyError, TypeError, ValueError):
+            return cls._decode(data)
+        is_win = get('is_win', False)
+        consecutive_losses = get('consecutive_losses', 0)
+        if (is_win.__class__ is not bool or consecutive_losses.__class__ is not int
+                or not _finite(profit_percent + daily_pnl)):
+            return cls._decode(data)
+        ticket = get('ticket')
+        return cls(symbol, profit_percent, is_win, daily_pnl, consecutive_losses,
+                   None if ticket is None else str(ticket))
+
+    @classmethod
+    def _decode(cls, data: Dict) -> 'TradeClosure':
+        ticket = data.get('ticket')
+        return cls(_symbol(data), _float(data, 'profit_percent'), _bool(data, 'is_win'),
+                   _float(data, 'daily_pnl'), _int(data, 'consecutive_losses'),
+                   None if ticket is None else str(ticket))
+
+class EmergencyStop(SignalEvent):
+    """EMERGENCY_STOP alert raised by the EA when a risk limit is hit - rare, so no fast path"""
+    __slots__ = ('alert_type', 'daily_pnl', 'daily_trades', 'consecutive_losses')
+    action = Action.EMERGENCY_STOP
+
+    def __init__(self, alert_type: str = 'UNKNOWN', daily_pnl: float = 0.0,
+                 daily_trades: int = 0, consecutive_losses: int = 0):
+        self.alert_type = alert_type
+        self.daily_pnl = daily_pnl
+        self.daily_trades = daily_trades
+        self.consecutive_losses = consecutive_losses
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'EmergencyStop':
+        return cls(_str(data, 'alert_type', 'UNKNOWN'), _float(data, 'daily_pnl'),
+                   _int(data, 'daily_trades'), _int(data, 'consecutive_losses'))
+
+def decode_event(data) -> SignalEvent:
+    """
+    Decode a raw webhook payload (dict, bytes or str) into a typed event
+    Raises SignalValidationError for malformed payloads, UnknownActionError for unsupported actions
+    """
+    if data.__class__ is not dict:
+        if isinstance(data, (bytes, bytearray, str)):
+            data = loads(data)
+        if not isinstance(data, dict):
+            raise SignalValidationError("Payload must be a JSON object")
+
+    raw_action = data.get('action')
+    if raw_action.__class__ is not str:
+        if raw_action is None:
+            raise UnknownActionError('')
+        if not isinstance(raw_action, str):
+            raise SignalValidationError(f"Invalid action: {raw_action!r}")
+    decoder = _DECODERS.get(raw_action)
+    if decoder is None:
+        normalized = raw_action.strip().upper()
+        decoder = _DECODERS.get(normalized)
+        if decoder is None:
+            raise UnknownActionError(normalized)
+    return decoder(data)
+
+# Action string → payload decoder; one dict lookup instead of comparing Enum members,
+# whose attribute access is a descriptor call on every signal
+_DECODERS = {
+    Action.BUY.value: partial(TradingSignal.from_dict, Action.BUY),
+    Action.SELL.value: partial(TradingSignal.from_dict, Action.SELL),
+    Action.TRADE_EXECUTED.value: TradeExecution.from_dict,
+    Action.TRADE_CLOSED.value: TradeClosure.from_dict,
+    Action.EMERGENCY_STOP.value: EmergencyStop.from_dict
+}
@@ -0,0 +1,135 @@
+"""
+State Store - Write-Ahead Journal + Compact Snapshots
+Every state-changing input is appended to the WAL before it is applied;
+a snapshot of the risk state is written every N events so a restart only
+replays the short tail after the latest snapshot
+"""
+
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+SNAPSHOT_FILE = 'snapshot.json'
+WAL_FILE = 'wal.jsonl'
+STORE_ID_FILE = 'store_id'
+
+class StateStore:
+    """
+    Crash-safe persistence for bot state
+    - append(): one JSON line per input, flushed (and optionally fsynced) before it is applied
+    - write_snapshot(): atomic replace of snapshot.json, then the WAL is truncated
+    - load(): latest snapshot + WAL records newer than it (a torn last line is ignored)
+    - store_id: new whenever seq restarts from 0, so (store_id, seq) never repeats
+      even when the directory is wiped and other stores keyed by seq are kept
+    """
+
+    def __init__(self, directory: str = Config.STATE_DIR,
+                 snapshot_every: int = Config.STATE_SNAPSHOT_EVERY,
+                 fsync: bool = Config.STATE_FSYNC):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+        self.wal_path = os.path.join(directory, WAL_FILE)
+        self.seq = 0
+        self.snapshot_seq = 0
+        self.store_id = ''  # Set by load()
+        self._wal = None
+
+        os.makedirs(directory, exist_ok=True)
+
+    def load(self) -> Tuple[Optional[Dict], List[Dict]]:
+        """
+        Read persisted state
+        Returns: (snapshot state or None, WAL records to replay in order)
+        """
+        state = None
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            state = snapshot['state']
+            self.snapshot_seq = self.seq = snapshot['seq']
+
+        records = []
+        if os.path.exists(self.wal_path):
+            with open(self.wal_path, 'rb+') as f:
+                good_offset = 0
+                for line in f:
+                    try:
+                        record = json.loads(line) if line.strip() else None
+                    except ValueError:
+                        record = None
+                    if record is None or not line.endswith(b'\n'):
+                        # Torn write from a crash mid-append - cut it so new records are not appended after it
+                        logging.warning("⚠️ Truncating incomplete WAL record")
+                        f.truncate(good_offset)
+                        break
+                    good_offset += len(line)
+                    if record['seq'] > self.snapshot_seq:
+                        records.append(record)
+                        self.seq = record['seq']
+
+        self.store_id = self._load_store_id(fresh=state is None and self.seq == 0)
+        return state, records
+
+    def _load_store_id(self, fresh: bool) -> str:
+        path = os.path.join(self.directory, STORE_ID_FILE)
+        if not fresh:
+            if not os.path.exists(path):
+                return ''  # Written before store ids existed - keep its seq-only keys
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read().strip()
+
+        store_id = uuid.uuid4().hex[:12]
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(store_id)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return store_id
+
+    def append(self, kind: str, data: Optional[Dict] = None, timestamp: Optional[str] = None) -> int:
+        """Write one input record ahead of applying it; returns its sequence number"""
+        if self._wal is None:
+            self._wal = open(self.wal_path, 'a', encoding='utf-8')
+
+        self.seq += 1
+        record = {
+            'seq': self.seq,
+            'ts': timestamp or datetime.now().isoformat(),
+            'kind': kind,
+            'data': data
+        }
+        self._wal.write(json.dumps(record, default=str) + '\n')
+        self._wal.flush()
+        if self.fsync:
+            os.fsync(self._wal.fileno())
+        return self.seq
+
+    def should_snapshot(self) -> bool:
+        return self.seq - self.snapshot_seq >= self.snapshot_every
+
+    def write_snapshot(self, state: Dict):
+        """Atomically replace the snapshot, then drop the WAL records it covers"""
+        tmp_path = self.snapshot_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # dumps() + write, not dump() - dump() streams through the pure-Python encoder
+            f.write(json.dumps({'seq': self.seq, 'saved_at': datetime.now().isoformat(), 'state': state}, default=str))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        self.snapshot_seq = self.seq
+
+        # Records <= snapshot seq are skipped on load, so a crash before this truncate is harmless
+        self.close()
+        open(self.wal_path, 'w', encoding='utf-8').close()
+
+    def close(self):
+        if self._wal is not None:
+            self._wal.close()
+            self._wal = None
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Batch webhook - JSON array and NDJSON bodies, one result per item, bad items isolated
+"""
+
+import json
+import logging
+import pytest
+from datetime import datetime
+from clock import SimulatedClock
+from config import Config
+from dedup_cache import IdempotencyCache
+from profitable_bot import ProfitableTradingBot
+from signal_schema import parse_batch
+from trade_history import TradeHistory
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Flask test client over a fresh in-memory bot - nothing is written outside tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(Config, 'STATE_DIR', '')
+    monkeypatch.setattr(Config, 'TRADE_JOURNAL_PATH', '')
+    monkeypatch.setattr(Config, 'TRADE_HISTORY_DIR', '')
+    import profitable_app
+
+    logging.disable(logging.CRITICAL)
+    bot = ProfitableTradingBot(trade_history=TradeHistory(directory=''),
+                               clock=SimulatedClock(datetime(2026, 1, 5, 10)))
+    monkeypatch.setattr(profitable_app, 'trading_bot', bot)
+    monkeypatch.setattr(profitable_app, 'dedup_cache', IdempotencyCache())
+    yield profitable_app.app.test_client()
+    logging.disable(logging.NOTSET)
+
+EVENTS = [
+    {'action': 'BUY', 'symbol': 'EURUSD', 'price': 1.085, 'time': '2026-01-05T10:00:00Z'},
+    {'action': 'TRADE_EXECUTED', 'symbol': 'EURUSD', 'side': 'BUY', 'price': 1.085, 'lot_size': 0.01, 'ticket': 'T1'},
+    {'action': 'SELL', 'symbol': 'GBPUSD', 'price': 1.27, 'time': '2026-01-05T10:00:00Z'}
+]
+
+def _statuses(response):
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body['count'] == len(body['results'])
+    return [result['status'] for result in body['results']]
+
+def test_parse_batch_formats():
+    array = json.dumps(EVENTS).encode()
+    ndjson = '\n'.join(json.dumps(event) for event in EVENTS).encode() + b'\n\n'
+    assert parse_batch(array) == EVENTS
+    assert parse_batch(ndjson) == EVENTS
+    assert parse_batch(json.dumps(EVENTS[0])) == [EVENTS[0]]
+    with pytest.raises(ValueError):
+        parse_batch(b'{"action": "BUY"}\n{not json}')
+
+def test_array_and_ndjson_give_the_same_results(client, monkeypatch):
+    array = _statuses(client.post('/webhook/batch', data=json.dumps(EVENTS), content_type='application/json'))
+    assert array == ['logged', 'trade_logged', 'logged']
+
+    import profitable_app
+    monkeypatch.setattr(profitable_app, 'trading_bot',
+                        ProfitableTradingBot(trade_history=TradeHistory(directory=''),
+                                             clock=SimulatedClock(datetime(2026, 1, 5, 10))))
+    monkeypatch.setattr(profitable_app, 'dedup_cache', IdempotencyCache())
+    ndjson = '\n'.join(json.dumps(event) for event in EVENTS)
+    assert _statuses(client.post('/webhook/batch', data=ndjson, content_type='application/x-ndjson')) == array
+
+def test_bad_item_in_the_middle_is_isolated(client):
+    """A malformed item gets its own rejection; the items around it still run in order"""
+    events = [EVENTS[0],
+              {'action': ['BUY'], 'symbol': 'EURUSD', 'price': 1.085},
+              {'action': 'BUY', 'symbol': 'USDJPY', 'price': 'abc', 'time': '2026-01-05T10:00:00Z'},
+              'not an object',
+              EVENTS[1]]
+    statuses = _statuses(client.post('/webhook/batch', data=json.dumps(events), content_type='application/json'))
+    assert len(statuses) == len(events)
+    assert statuses == ['logged', 'invalid', 'invalid', 'invalid', 'trade_logged']
+
+def test_duplicates_replay_within_a_batch(client):
+    body = client.post('/webhook/batch', data=json.dumps([EVENTS[1], EVENTS[1]]),
+                       content_type='application/json').get_json()
+    assert body['duplicates'] == 1
+    assert body['results'][0] == body['results'][1]
+
+def test_rejected_bodies(client, monkeypatch):
+    assert client.post('/webhook/batch', data=b'').status_code == 400
+    assert client.post('/webhook/batch', data=b'[1, 2').status_code == 400
+    assert client.post('/webhook/batch', data=b'[]').status_code == 400
+    monkeypatch.setattr(Config, 'MAX_BATCH_SIZE', 2)
+    assert client.post('/webhook/batch', data=json.dumps(EVENTS)).status_code == 413
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Idempotency cache - expiry order and which results are replayed
+"""
+
+from dedup_cache import IdempotencyCache, idempotency_key, process_once
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self) -> float:
+        return self.time
+
+class FlakyBot:
+    """Fails the first call, then succeeds"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def process_signal(self, data):
+        self.calls += 1
+        if self.calls == 1:
+            return {"status": "error", "reason": "broker timeout"}
+        return {"status": "success"}
+
+def test_hit_does_not_hide_expired_entries():
+    """A hit on the oldest key must not let expired keys behind it outlive their TTL"""
+    clock = FakeClock()
+    cache = IdempotencyCache(max_entries=10, ttl_seconds=10, clock=clock)
+    cache.put('a', 1)
+    clock.time = 1
+    cache.put('b', 2)
+    clock.time = 5
+    assert cache.get('a') == 1
+    clock.time = 10.5  # 'a' expired, 'b' still live
+    cache.put('c', 3)
+    assert len(cache) == 2
+    assert cache.get('a') is None and cache.get('b') == 2
+
+def test_errors_are_not_cached():
+    """A retry after a failure is processed again, not replayed as a duplicate"""
+    cache = IdempotencyCache(max_entries=10, ttl_seconds=60)
+    bot = FlakyBot()
+    payload = {'action': 'BUY', 'symbol': 'EURUSD', 'time': '2026-01-05T10:00:00'}
+    assert process_once(bot, cache, payload) == ({"status": "error", "reason": "broker timeout"}, False)
+    assert process_once(bot, cache, payload) == ({"status": "success"}, False)
+    assert process_once(bot, cache, payload) == ({"status": "success"}, True)
+    assert bot.calls == 2
+
+def test_payload_without_bar_time_is_not_deduplicated():
+    """Identical alerts with no key, bar time or ticket are separate signals - both run, nothing is cached"""
+    cache = IdempotencyCache(max_entries=10, ttl_seconds=60)
+    bot = FlakyBot()
+    bot.calls = 1  # Past the failing call
+    payload = {'action': 'BUY', 'symbol': 'EURUSD', 'price': '1.085', 'timeframe': '15'}
+    assert idempotency_key(payload) is None
+    assert process_once(bot, cache, payload) == ({"status": "success"}, False)
+    assert process_once(bot, cache, dict(payload)) == ({"status": "success"}, False)
+    assert bot.calls == 3 and len(cache) == 0
+
+    # An explicit key or the bar time still identifies the alert
+    assert idempotency_key(payload, 'retry-1') == 'retry-1'
+    assert idempotency_key({**payload, 'time': '1767607200000'}) != idempotency_key({**payload, 'time': '1767608100000'})
+    assert process_once(bot, cache, payload, 'retry-1') == ({"status": "success"}, False)
+    assert process_once(bot, cache, payload, 'retry-1') == ({"status": "success"}, True)
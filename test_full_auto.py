@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+FULL_AUTO execution - a SELL closes the bot's own paper position, never the EA's
+"""
+
+import logging
+from datetime import datetime
+from clock import SimulatedClock
+from profitable_bot import ProfitableTradingBot
+from trade_history import TradeHistory
+
+def _bot():
+    clock = SimulatedClock(datetime(2026, 1, 5, 10))
+    bot = ProfitableTradingBot(trade_history=TradeHistory(directory=''), clock=clock)
+    bot.set_automation_phase('FULL_AUTO')
+    return bot, clock
+
+def test_sell_skips_ea_position_ahead_of_paper_one():
+    """EA position opened first, paper position behind it: SELL closes the paper one"""
+    logging.disable(logging.CRITICAL)
+    try:
+        bot, clock = _bot()
+        bot.process_signal({'action': 'TRADE_EXECUTED', 'symbol': 'EURUSD', 'side': 'BUY', 'price': 1.085,
+                            'lot_size': 0.01, 'ticket': 'E1'})
+        bot.broker.on_price('EURUSD', 1.085, clock.now())
+        paper = bot.broker.submit('EURUSD', 'BUY', 1000.0)
+        assert paper['status'] == 'filled'
+        assert [p.ticket for p in bot.positions.positions_for('EURUSD')] == ['E1', paper['ticket']]
+
+        clock.advance(600)
+        result = bot.process_signal({'action': 'SELL', 'symbol': 'EURUSD', 'price': 1.0855})
+        assert result['status'] == 'executed', result
+        assert result['ticket'] == paper['ticket']
+        assert [p.ticket for p in bot.positions.all()] == ['E1']
+    finally:
+        logging.disable(logging.NOTSET)
+
+def test_sell_rejected_when_only_ea_positions():
+    logging.disable(logging.CRITICAL)
+    try:
+        bot, clock = _bot()
+        bot.process_signal({'action': 'TRADE_EXECUTED', 'symbol': 'EURUSD', 'side': 'BUY', 'price': 1.085,
+                            'lot_size': 0.01, 'ticket': 'E1'})
+        clock.advance(600)
+        result = bot.process_signal({'action': 'SELL', 'symbol': 'EURUSD', 'price': 1.0855})
+        assert result['status'] == 'rejected'
+        assert 'managed by the EA' in result['reason']
+        assert [p.ticket for p in bot.positions.all()] == ['E1']
+    finally:
+        logging.disable(logging.NOTSET)
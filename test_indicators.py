@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Indicators - parity with Pine's ta.ema / ta.rma / ta.rsi
+The reference below is a bar-by-bar transcription of the Pine definitions:
+SMA seed over the first `length` inputs, na before it, Wilder RSI on ta.change
+"""
+
+import math
+import numpy as np
+from indicators import IndicatorEngine, ema, rma, rsi, sma
+
+def _pine_smoothed(values, length, alpha):
+    out = []
+    previous = math.nan
+    for bar, value in enumerate(values):
+        if bar < length - 1:
+            out.append(math.nan)
+            continue
+        if bar == length - 1:
+            previous = sum(values[:length]) / length
+        else:
+            previous = alpha * value + (1 - alpha) * previous
+        out.append(previous)
+    return out
+
+def _pine_ema(values, length):
+    return _pine_smoothed(values, length, 2.0 / (length + 1))
+
+def _pine_rma(values, length):
+    return _pine_smoothed(values, length, 1.0 / length)
+
+def _pine_rsi(values, length):
+    change = [b - a for a, b in zip(values, values[1:])]  # ta.change is na on the first bar
+    up = _pine_rma([max(c, 0.0) for c in change], length)
+    down = _pine_rma([max(-c, 0.0) for c in change], length)
+    out = [math.nan]
+    for u, d in zip(up, down):
+        if math.isnan(u) or math.isnan(d):
+            out.append(math.nan)
+        elif d == 0:
+            out.append(100.0)
+        elif u == 0:
+            out.append(0.0)
+        else:
+            out.append(100.0 - 100.0 / (1.0 + u / d))
+    return out
+
+def _closes(count=300, seed=1):
+    rng = np.random.default_rng(seed)
+    return (1.1 * np.exp(np.cumsum(rng.normal(0, 0.001, count)))).tolist()
+
+def _assert_same(actual, expected):
+    actual = np.asarray(actual, dtype=np.float64)
+    expected = np.asarray(expected, dtype=np.float64)
+    assert np.array_equal(np.isnan(actual), np.isnan(expected))
+    assert np.allclose(actual, expected, rtol=1e-12, atol=1e-12, equal_nan=True)
+
+def test_series_match_pine_reference():
+    closes = _closes()
+    for length in (1, 2, 9, 14, 21, 200):
+        _assert_same(ema(closes, length), _pine_ema(closes, length))
+        _assert_same(rma(closes, length), _pine_rma(closes, length))
+        _assert_same(rsi(closes, length), _pine_rsi(closes, length))
+
+def test_warm_up_is_na_until_length_bars():
+    closes = _closes(30)
+    assert np.isnan(ema(closes, 9)[:8]).all() and not np.isnan(ema(closes, 9)[8])
+    assert ema(closes, 9)[8] == sum(closes[:9]) / 9  # Seeded with the SMA, not the first close
+    assert np.isnan(rsi(closes, 14)[:14]).all() and not np.isnan(rsi(closes, 14)[14])
+    assert np.isnan(ema(closes[:5], 9)).all()
+    _assert_same(sma(closes, 5)[4:], [sum(closes[i - 4:i + 1]) / 5 for i in range(4, 30)])
+
+def test_rsi_known_values():
+    assert rsi(list(range(1, 30)), 14)[-1] == 100.0  # Only gains
+    assert rsi(list(range(30, 1, -1)), 14)[-1] == 0.0  # Only losses
+    # Worked by hand: changes +1 +1 -1 +1, up RMA 1 → 0.5 → 0.75, down RMA 0 → 0.5 → 0.25
+    _assert_same(rsi([1.0, 2.0, 3.0, 2.0, 3.0], 2), [math.nan, math.nan, 100.0, 50.0, 75.0])
+
+def test_engine_matches_series_per_column():
+    """Streaming updates with per-column lengths and missed bars give the same values as the series"""
+    closes = np.array([_closes(seed=seed) for seed in (1, 2, 3)]).T
+    closes[40:45, 1] = np.nan  # Column 1 misses a few bars
+    engine = IndicatorEngine(['A', 'B', 'C'], fast=[5, 9, 12], slow=21, trend=50, rsi_length=[7, 14, 14])
+    history = {'fast': [], 'slow': [], 'trend': [], 'rsi': []}
+    for row in closes:
+        engine.update(row, np.ones(3))
+        for key, values in (('fast', engine.ema_fast), ('slow', engine.ema_slow),
+                            ('trend', engine.ema_trend), ('rsi', engine.rsi)):
+            history[key].append(values.copy())
+
+    for column, (fast, rsi_length) in enumerate(((5, 7), (9, 14), (12, 14))):
+        bars = ~np.isnan(closes[:, column])
+        present = closes[bars, column].tolist()
+        _assert_same(np.array(history['fast'])[bars, column], _pine_ema(present, fast))
+        _assert_same(np.array(history['slow'])[bars, column], _pine_ema(present, 21))
+        _assert_same(np.array(history['trend'])[bars, column], _pine_ema(present, 50))
+        _assert_same(np.array(history['rsi'])[bars, column], _pine_rsi(present, rsi_length))
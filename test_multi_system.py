@@ -6,12 +6,11 @@ Send multiple currency signals to test the enhanced system
 
 import json
 import urllib.request
-import time
 
 def send_multi_currency_signals():
     """Send test signals for multiple currencies"""
     
-    webhook_url = "https://trading-bot-production-c863.up.railway.app/webhook"
+    batch_url = "https://trading-bot-production-c863.up.railway.app/webhook/batch"
     
     # Test signals for different currencies
     test_signals = [
@@ -23,34 +22,30 @@ def send_multi_currency_signals():
     
     print("🌍 Testing Multi-Currency Trading System...")
     print("=" * 60)
+    print(f"\n📦 Sending {len(test_signals)} signals in one batch request")
     
-    for i, signal in enumerate(test_signals, 1):
-        print(f"\n📊 Sending Signal {i}/4: {signal['symbol']} {signal['action']} @ {signal['price']}")
+    try:
+        # Prepare request - one NDJSON line per signal
+        data = "\n".join(json.dumps(signal) for signal in test_signals).encode('utf-8')
+        req = urllib.request.Request(
+            batch_url,
+            data=data,
+            headers={'Content-Type': 'application/x-ndjson'}
+        )
         
-        try:
-            # Prepare request
-            data = json.dumps(signal).encode('utf-8')
-            req = urllib.request.Request(
-                webhook_url,
-                data=data,
-                headers={'Content-Type': 'application/json'}
-            )
-            
-            # Send request
-            with urllib.request.urlopen(req, timeout=10) as response:
-                result = response.read().decode('utf-8')
-                status = response.getcode()
-            
-            if status == 200:
-                print(f"✅ {signal['symbol']} signal sent successfully")
-            else:
-                print(f"❌ {signal['symbol']} signal failed: {status}")
-                
-        except Exception as e:
-            print(f"❌ Error sending {signal['symbol']} signal: {str(e)}")
+        # Send request
+        with urllib.request.urlopen(req, timeout=10) as response:
+            result = json.loads(response.read().decode('utf-8'))
+            status = response.getcode()
         
-        # Small delay between signals
-        time.sleep(1)
+        if status == 200:
+            for signal, item in zip(test_signals, result.get('results', [])):
+                print(f"✅ {signal['symbol']} {signal['action']} @ {signal['price']} → {item.get('status')}")
+        else:
+            print(f"❌ Batch failed: {status}")
+            
+    except Exception as e:
+        print(f"❌ Error sending batch: {str(e)}")
     
     print("\n" + "=" * 60)
     print("🎉 Multi-currency test complete!")
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Paper broker P&L - a stop-out must cost what the position actually lost
+"""
+
+import logging
+from datetime import datetime
+from clock import SimulatedClock
+from config import Config
+from paper_broker import PaperBroker
+from profitable_bot import ProfitableTradingBot
+from trade_history import TradeHistory
+
+def test_stop_out_dollar_pnl():
+    """$100 long EURUSD stopped out 2% lower loses $2, reported as 0.2% of a $1000 account"""
+    logging.disable(logging.CRITICAL)
+    try:
+        clock = SimulatedClock(datetime(2026, 1, 5, 10))
+        bot = ProfitableTradingBot(trade_history=TradeHistory(directory=''), clock=clock)
+        balance = bot.profit_tracker['starting_balance']
+        broker = PaperBroker(report=bot.process_signal, spread_pips={'EURUSD': 0.0}, slippage_pips=0.0,
+                             balance=balance, clock=clock)
+
+        broker.on_price('EURUSD', 1.1, clock.now())
+        broker.submit('EURUSD', 'BUY', 100 / 1.1, stop_loss=1.078, take_profit=1.144)
+        closed = broker.on_price('EURUSD', 1.078, clock.now())
+
+        assert len(closed) == 1
+        assert abs(closed[0]['profit'] - -2.0) < 1e-9
+        assert abs(closed[0]['profit_percent'] - -2.0 / balance * 100) < 1e-9
+        assert abs(bot.risk_manager.daily_loss - 2.0) < 1e-9
+        assert abs(bot.profit_tracker['current_balance'] - (balance - 2.0)) < 1e-9
+        assert bot.risk_manager.daily_loss < Config.MAX_DAILY_LOSS
+    finally:
+        logging.disable(logging.NOTSET)
+
+def test_daily_counters_follow_trading_day():
+    """Counters reset at the clock's rollover hour, not at calendar midnight"""
+    clock = SimulatedClock(datetime(2026, 1, 5, 17, 30), timezone='', rollover_hour=17)
+    broker = PaperBroker(spread_pips={'EURUSD': 0.0}, slippage_pips=0.0, clock=clock)
+    broker.on_price('EURUSD', 1.1, datetime(2026, 1, 5, 17, 30))
+    broker.submit('EURUSD', 'BUY', 1000.0)
+    broker.on_price('EURUSD', 1.1, datetime(2026, 1, 5, 23, 59))
+    assert broker.daily_trades == 1
+    broker.on_price('EURUSD', 1.1, datetime(2026, 1, 6, 0, 1))
+    assert broker.daily_trades == 1  # Same trading day until 17:00
+    broker.on_price('EURUSD', 1.1, datetime(2026, 1, 6, 17, 0))
+    assert broker.daily_trades == 0
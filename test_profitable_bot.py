@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Profitable bot status - reading it must never change bot state
+"""
+
+import logging
+from datetime import datetime
+from clock import SimulatedClock
+from profitable_bot import ProfitableTradingBot
+from trade_history import TradeHistory
+
+def test_status_reads_never_roll_the_day_over():
+    """After midnight /status shows the new day, but the reset waits for the next signal"""
+    logging.disable(logging.CRITICAL)
+    try:
+        clock = SimulatedClock(datetime(2026, 1, 5, 10), timezone='', rollover_hour=0)
+        bot = ProfitableTradingBot(trade_history=TradeHistory(directory=''), clock=clock)
+        bot.process_signal({'action': 'TRADE_CLOSED', 'symbol': 'EURUSD', 'profit_percent': -0.5, 'is_win': False})
+        etag = bot.status_etag()
+
+        clock.set(datetime(2026, 1, 6, 1))
+        version = bot.state_version
+        assert bot.status_etag() != etag
+        status = bot.get_status()
+        assert status['daily_stats']['losses'] == 0
+        assert status['daily_stats']['last_reset'] == clock.today()
+        assert bot.state_version == version
+        assert bot.daily_stats['losses'] == 1  # Not reset by the reads
+
+        bot.process_signal({'action': 'TRADE_CLOSED', 'symbol': 'EURUSD', 'profit_percent': 0.5, 'is_win': True})
+        assert bot.daily_stats['last_reset'] == clock.today()
+        assert (bot.daily_stats['wins'], bot.daily_stats['losses']) == (1, 0)
+    finally:
+        logging.disable(logging.NOTSET)
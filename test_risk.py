@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Batch risk check - check_trades_batch must match check_trade_allowed row by row
+"""
+
+import logging
+import numpy as np
+from config import Config
+from portfolio_risk import PortfolioRisk
+from risk import RiskManager, RISK_RULES
+
+SYMBOLS = ['EURUSD', 'GBPUSD', 'USDJPY', 'AUDUSD', 'EURJPY']
+
+def _signals(count: int = 400, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    symbols = rng.choice(SYMBOLS, count)
+    actions = rng.choice(['BUY', 'SELL', 'CLOSE'], count)
+    # Mostly FX-like prices, plus a zero price and prices large enough to fail the minimum size
+    prices = rng.uniform(0.5, 200.0, count)
+    prices[::37] = 0.0
+    prices[5::41] = 1e9
+    return symbols, actions, prices
+
+def _assert_rows_match(risk_manager: RiskManager, positions, symbols, actions, prices):
+    batch = risk_manager.check_trades_batch(symbols, actions, prices, positions)
+    for row, (symbol, action, price) in enumerate(zip(symbols.tolist(), actions.tolist(), prices.tolist())):
+        scalar = risk_manager.check_trade_allowed(symbol, action, price, positions)
+        assert bool(batch['allowed'][row]) == scalar['allowed'], (row, symbol, action, price)
+        assert RISK_RULES[batch['rule'][row]] == scalar.get('rule', 'allowed'), (row, symbol, action, price)
+        assert float(batch['position_size'][row]) == scalar['position_size'], (row, symbol, action, price)
+    return batch
+
+def test_batch_matches_scalar_per_rule():
+    """Open book, full book and each account-level limit give the same decision per row"""
+    logging.disable(logging.CRITICAL)
+    try:
+        symbols, actions, prices = _signals()
+        some = {'EURUSD': {}, 'USDJPY': {}}
+        full = {symbol: {} for symbol in SYMBOLS[:Config.MAX_POSITIONS]}
+        seen = set()
+
+        for positions in ({}, some, full):
+            batch = _assert_rows_match(RiskManager(), positions, symbols, actions, prices)
+            seen.update(RISK_RULES[code] for code in batch['rule'])
+
+        for counter, value in (('daily_loss', Config.MAX_DAILY_LOSS),
+                               ('daily_trades', Config.MAX_DAILY_TRADES),
+                               ('consecutive_losses', Config.MAX_CONSECUTIVE_LOSSES)):
+            risk_manager = RiskManager()
+            setattr(risk_manager, counter, value)
+            batch = _assert_rows_match(risk_manager, some, symbols, actions, prices)
+            seen.update(RISK_RULES[code] for code in batch['rule'])
+
+        # Every rule except the portfolio one is exercised above
+        assert seen == set(RISK_RULES) - {'portfolio_var'}
+    finally:
+        logging.disable(logging.NOTSET)
+
+def test_batch_matches_scalar_with_portfolio_var():
+    """BUYs are judged against the current book - the same ones are blocked on both paths"""
+    logging.disable(logging.CRITICAL)
+    try:
+        rng = np.random.default_rng(3)
+        portfolio = PortfolioRisk(SYMBOLS, sample_seconds=60, min_observations=5, var_limit=150.0)
+        quotes = np.array([1.08, 1.27, 150.0, 0.66, 162.0])
+        for _ in range(30):
+            quotes = quotes * np.exp(rng.normal(0, 0.002, len(quotes)))
+            portfolio.update(dict(zip(SYMBOLS, quotes.tolist())))
+        portfolio.set_position('EURUSD', 20000)
+        assert portfolio.ready
+
+        symbols, actions, prices = _signals(seed=11)
+        batch = _assert_rows_match(RiskManager(portfolio=portfolio), {'EURUSD': {}}, symbols, actions, prices)
+        rules = {RISK_RULES[code] for code in batch['rule']}
+        assert 'portfolio_var' in rules and 'allowed' in rules
+    finally:
+        logging.disable(logging.NOTSET)
+
+def test_empty_batch():
+    batch = RiskManager().check_trades_batch([], [], [], {})
+    assert len(batch['allowed']) == len(batch['rule']) == len(batch['position_size']) == 0
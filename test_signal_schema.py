@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Signal schema - malformed payloads are rejected with an error result, never an exception
+"""
+
+import logging
+import pytest
+from profitable_bot import ProfitableTradingBot
+from signal_schema import SignalValidationError, TradingSignal, decode_event
+from trade_history import TradeHistory
+
+MALFORMED = [
+    {'action': ['BUY'], 'symbol': 'EURUSD', 'price': 1},
+    {'action': {'side': 'BUY'}, 'symbol': 'EURUSD', 'price': 1},
+    {'action': 'BUY', 'symbol': ['EURUSD'], 'price': 1},
+    {'action': 'TRADE_CLOSED', 'symbol': {'name': 'EURUSD'}, 'profit_percent': 0.5},
+]
+
+@pytest.fixture
+def bot():
+    logging.disable(logging.CRITICAL)
+    yield ProfitableTradingBot(trade_history=TradeHistory(directory=''))
+    logging.disable(logging.NOTSET)
+
+@pytest.mark.parametrize('payload', MALFORMED)
+def test_unhashable_fields_raise_validation_error(payload):
+    with pytest.raises(SignalValidationError):
+        decode_event(payload)
+
+@pytest.mark.parametrize('payload', MALFORMED)
+def test_unhashable_fields_return_invalid(bot, payload):
+    assert bot.process_signal(payload)['status'] == 'invalid'
+
+def test_bad_item_does_not_stop_batch(bot):
+    good = {'action': 'BUY', 'symbol': 'EURUSD', 'price': 1.0850}
+    results = bot.process_batch([good, MALFORMED[0], MALFORMED[2], dict(good, symbol='GBPUSD')])
+    assert [result['status'] for result in results[1:3]] == ['invalid', 'invalid']
+    assert results[0]['status'] != 'invalid' and results[3]['status'] != 'invalid'
+
+def test_string_fields_still_decode():
+    event = decode_event({'action': ' buy ', 'symbol': 'eurusd', 'price': '1.0850'})
+    assert isinstance(event, TradingSignal)
+    assert (event.action.value, event.symbol, event.price) == ('BUY', 'EURUSD', 1.085)
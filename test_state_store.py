@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+State store - write-ahead journal, snapshots and recovery
+"""
+
+import logging
+import os
+import shutil
+from datetime import datetime
+import pytest
+from clock import SimulatedClock
+from profitable_bot import ProfitableTradingBot
+from state_store import StateStore, WAL_FILE
+from trade_history import TradeHistory
+from trade_journal import TradeJournal
+
+CLOSE = {'action': 'TRADE_CLOSED', 'symbol': 'EURUSD', 'profit_percent': 0.4, 'is_win': True}
+
+@pytest.fixture(autouse=True)
+def quiet():
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+INPUTS = [
+    {'action': 'TRADE_EXECUTED', 'symbol': 'EURUSD', 'side': 'BUY', 'price': 1.085, 'lot_size': 0.01,
+     'stop_loss': 1.07, 'take_profit': 1.1, 'ticket': 'E1'},
+    {'action': 'TRADE_CLOSED', 'symbol': 'EURUSD', 'profit_percent': -0.6, 'is_win': False, 'ticket': 'E1'},
+    {'action': 'TRADE_CLOSED', 'symbol': 'GBPUSD', 'profit_percent': 0.9, 'is_win': True},
+    {'action': 'EMERGENCY_STOP', 'alert_type': 'DAILY_LOSS_LIMIT', 'daily_pnl': -2.1},
+    {'action': 'TRADE_CLOSED', 'symbol': 'USDJPY', 'profit_percent': -0.3, 'is_win': False}
+]
+
+def _bot(state_dir, journal=None, snapshot_every=100, clock=None):
+    return ProfitableTradingBot(trade_history=TradeHistory(directory=''), trade_journal=journal,
+                                state_store=StateStore(str(state_dir), snapshot_every=snapshot_every),
+                                clock=clock)
+
+def _run(bot, clock):
+    for payload in INPUTS:
+        clock.advance(60)
+        bot.process_signal(payload)
+    bot.reset_emergency_stop()
+
+def test_wal_replay_restores_state(tmp_path):
+    """No snapshot yet - a restart replays every journaled input to the same state"""
+    clock = SimulatedClock(datetime(2026, 1, 5, 10))
+    bot = _bot(tmp_path, clock=clock)
+    _run(bot, clock)
+    bot.state_store.close()  # Crash - no checkpoint
+
+    recovered = _bot(tmp_path, clock=clock)
+    assert recovered.recovery_stats['snapshot_loaded'] is False
+    assert recovered.recovery_stats['replayed_inputs'] == len(INPUTS) + 1
+    assert recovered.snapshot_state() == bot.snapshot_state()
+
+def test_snapshot_plus_wal_tail(tmp_path):
+    """Inputs up to the last snapshot come from it, only the tail after it is replayed"""
+    clock = SimulatedClock(datetime(2026, 1, 5, 10))
+    bot = _bot(tmp_path, snapshot_every=4, clock=clock)
+    _run(bot, clock)
+    bot.state_store.close()
+
+    recovered = _bot(tmp_path, snapshot_every=4, clock=clock)
+    assert recovered.recovery_stats['snapshot_loaded'] is True
+    assert recovered.recovery_stats['replayed_inputs'] == (len(INPUTS) + 1) % 4
+    assert recovered.snapshot_state() == bot.snapshot_state()
+
+def test_torn_wal_line_is_truncated(tmp_path):
+    """A record cut short by a crash is dropped, and the next append starts on a clean line"""
+    store = StateStore(str(tmp_path))
+    store.load()
+    for i in range(3):
+        store.append('signal', {'i': i}, '2026-01-05T10:00:00')
+    store.close()
+    with open(os.path.join(str(tmp_path), WAL_FILE), 'a', encoding='utf-8') as f:
+        f.write('{"seq": 4, "kind": "sig')
+
+    store = StateStore(str(tmp_path))
+    _, records = store.load()
+    assert [record['data']['i'] for record in records] == [0, 1, 2]
+    assert store.append('signal', {'i': 3}, '2026-01-05T10:00:01') == 4
+    store.close()
+
+    _, records = StateStore(str(tmp_path)).load()
+    assert [record['seq'] for record in records] == [1, 2, 3, 4]
+
+def test_crash_between_snapshot_and_wal_truncate(tmp_path):
+    """The snapshot is replaced before the WAL is cut - records it covers are skipped, not replayed twice"""
+    store = StateStore(str(tmp_path))
+    store.load()
+    for i in range(3):
+        store.append('signal', {'i': i}, '2026-01-05T10:00:00')
+    wal_path = os.path.join(str(tmp_path), WAL_FILE)
+    with open(wal_path, 'rb') as f:
+        wal = f.read()
+    store.write_snapshot({'marker': 3})
+    with open(wal_path, 'wb') as f:
+        f.write(wal)  # As if the process died before the truncate
+
+    store = StateStore(str(tmp_path))
+    state, records = store.load()
+    assert state == {'marker': 3}
+    assert records == []
+    assert store.append('signal', {'i': 3}) == 4
+    store.close()
+
+def test_wiped_state_dir_keeps_journaling(tmp_path):
+    """A reset STATE_DIR restarts the WAL seq at 1 - new rows must not collide with the kept journal's"""
+    journal = TradeJournal(str(tmp_path / 'trades.db'))
+    bot = _bot(tmp_path / 'state', journal)
+    bot.process_signal(CLOSE)
+    bot.state_store.close()
+    assert journal.count() == 1
+
+    shutil.rmtree(tmp_path / 'state')
+    bot = _bot(tmp_path / 'state', journal)
+    bot.process_signal(CLOSE)
+    bot.state_store.close()
+    assert journal.count() == 2
+    journal.close()
+
+def test_store_id_survives_restart(tmp_path):
+    store = StateStore(str(tmp_path))
+    store.load()
+    store.append('signal', CLOSE)
+    store.close()
+    reopened = StateStore(str(tmp_path))
+    reopened.load()
+    assert reopened.store_id and reopened.store_id == store.store_id
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Trade history - close() must leave every event on disk for the next run
+"""
+
+from trade_history import TradeHistory
+
+def test_close_spills_recent_events(tmp_path):
+    """8 events with 5 in memory: all 8 are readable after a restart"""
+    history = TradeHistory(capacity=5, directory=str(tmp_path), segment_size=3)
+    for i in range(8):
+        history.append({'timestamp': f"2026-01-05T10:00:{i:02d}", 'i': i})
+    history.close()
+
+    restarted = TradeHistory(capacity=5, directory=str(tmp_path), segment_size=3)
+    assert restarted.total_count == 8
+    assert [event['i'] for event in restarted.tail(8)] == list(range(8))
+    assert [event['i'] for event in restarted.query(since="2026-01-05T10:00:04")] == [4, 5, 6, 7]
+
+def test_torn_last_line_is_truncated(tmp_path):
+    """A record cut short by a crash is dropped on load, and later appends land on a clean line"""
+    history = TradeHistory(capacity=2, directory=str(tmp_path), segment_size=10)
+    for i in range(5):
+        history.append({'timestamp': f"2026-01-05T10:00:{i:02d}", 'i': i})
+    history.close()
+    segment = next(tmp_path.glob('segment-*.jsonl'))
+    with open(segment, 'a', encoding='utf-8') as f:
+        f.write('{"timestamp": "2026-01-05T10:00:05", "i"')
+
+    restarted = TradeHistory(capacity=2, directory=str(tmp_path), segment_size=10)
+    assert restarted.total_count == 5
+    assert [event['i'] for event in restarted.tail(5)] == list(range(5))
+    for i in range(5, 8):
+        restarted.append({'timestamp': f"2026-01-05T10:00:{i:02d}", 'i': i})
+    restarted.close()
+
+    reopened = TradeHistory(capacity=2, directory=str(tmp_path), segment_size=10)
+    assert [event['i'] for event in reopened.query(since="2026-01-05T10:00:03")] == [3, 4, 5, 6, 7]
+
+def test_torn_only_line_removes_segment(tmp_path):
+    """A segment holding nothing but a torn record is deleted"""
+    (tmp_path / 'segment-000001.jsonl').write_text('{"timestamp": "2026-01-05T10:00:00"', encoding='utf-8')
+    history = TradeHistory(capacity=2, directory=str(tmp_path))
+    assert history.total_count == 0
+    assert not list(tmp_path.glob('segment-*.jsonl'))
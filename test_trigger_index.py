@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Trigger index - a removed ticket's stale levels must not fire after it is re-added
+"""
+
+from trigger_index import STOP_LOSS, TriggerIndex
+
+def test_readded_ticket_ignores_stale_levels():
+    """T1 re-added with a lower stop must not fire at its old 1.05 stop"""
+    index = TriggerIndex()
+    index.add('T1', 'EURUSD', 'BUY', stop_loss=1.05)
+    index.remove('T1')
+    index.add('T1', 'EURUSD', 'BUY', stop_loss=1.00)
+
+    assert index.on_price('EURUSD', 1.04) == []
+    assert 'T1' in index
+    assert index.on_price('EURUSD', 0.99) == [('T1', STOP_LOSS, 1.00)]
+    assert 'T1' not in index
+
+def test_replaced_levels_fire_once():
+    """Re-adding without a remove replaces the levels as well"""
+    index = TriggerIndex()
+    index.add('T1', 'EURUSD', 'SELL', stop_loss=1.12, take_profit=1.08)
+    index.add('T1', 'EURUSD', 'SELL', stop_loss=1.15, take_profit=1.08)
+
+    assert index.on_price('EURUSD', 1.13) == []
+    assert index.on_price('EURUSD', 1.16) == [('T1', STOP_LOSS, 1.15)]
+    assert index.on_price('EURUSD', 1.07) == []
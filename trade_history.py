@@ -0,0 +1,241 @@
+"""
+Trade History - Bounded Ring Buffer with On-Disk Spillover
+Recent events stay in memory; older ones are appended to rotated JSONL
+segment files that are indexed by their first timestamp
+Events must be appended in timestamp order - query() picks segments by their
+first timestamp alone, so an out-of-order event can be missed by a time window
+"""
+
+import json
+import logging
+import os
+from bisect import bisect_right
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+from config import Config
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.jsonl'
+
+class TradeHistory:
+    """
+    Fixed-capacity event log
+    - append() is O(1); the oldest in-memory event spills to the active segment
+    - segments rotate every segment_size events, oldest ones beyond max_segments are deleted
+    - slicing / iteration cover the in-memory window, tail() and query() also read segments
+    - close() spills the in-memory window, so the next run finds every event in segments
+    - timestamps are ISO strings from one clock and never decrease
+    """
+
+    def __init__(self, capacity: int = Config.TRADE_HISTORY_CAPACITY,
+                 directory: Optional[str] = Config.TRADE_HISTORY_DIR,
+                 segment_size: int = Config.TRADE_HISTORY_SEGMENT_SIZE,
+                 max_segments: int = Config.TRADE_HISTORY_MAX_SEGMENTS):
+        self.capacity = capacity
+        self.directory = directory or None
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self._recent = deque(maxlen=capacity)
+        self._segments: List[Dict] = []  # {'number', 'path', 'first_ts', 'count'} oldest first
+        self._segment_starts: List[str] = []  # first_ts of each segment, for bisect
+        self._active_file = None
+        self.spilled_count = 0
+        self.dropped_count = 0
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._load_segments()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, event: Dict):
+        """Add an event; spills the oldest in-memory event to disk when full"""
+        if len(self._recent) == self.capacity:
+            self._spill(self._recent[0])
+        self._recent.append(event)
+
+    def _spill(self, event: Dict):
+        if not self.directory:
+            self.dropped_count += 1
+            return
+
+        active = self._segments[-1] if self._segments else None
+        if active is None or active['count'] >= self.segment_size:
+            active = self._rotate(event.get('timestamp', ''))
+
+        self._active_file.write(json.dumps(event, default=str) + '\n')
+        active['count'] += 1
+        self.spilled_count += 1
+
+    def _rotate(self, first_ts: str) -> Dict:
+        """Close the active segment and start a new one"""
+        if self._active_file is not None:
+            self._active_file.close()
+
+        number = self._segments[-1]['number'] + 1 if self._segments else 1
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}")
+        segment = {'number': number, 'path': path, 'first_ts': first_ts, 'count': 0}
+        self._segments.append(segment)
+        self._segment_starts.append(first_ts)
+        self._active_file = open(path, 'a', encoding='utf-8', buffering=1)  # line buffered
+
+        # Retention - drop the oldest segments
+        while self.max_segments and len(self._segments) > self.max_segments:
+            oldest = self._segments.pop(0)
+            self._segment_starts.pop(0)
+            self.spilled_count -= oldest['count']
+            try:
+                os.remove(oldest['path'])
+            except OSError as e:
+                logging.warning(f"Could not remove history segment {oldest['path']}: {str(e)}")
+
+        return segment
+
+    def _load_segments(self):
+        """Rebuild the timestamp index from segment files left by a previous run"""
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        for name in names:
+            path = os.path.join(self.directory, name)
+            count = 0
+            first_line = last_line = None
+            with open(path, 'rb+') as f:
+                offset = last_offset = 0
+                for line in f:
+                    if line.strip():
+                        first_line = first_line or line
+                        last_offset, last_line = offset, line
+                        count += 1
+                    offset += len(line)
+                if count and (not last_line.endswith(b'\n') or self._decode_line(last_line) is None):
+                    # Torn write from a crash mid-append - cut it so new events are not appended after it
+                    logging.warning(f"⚠️ Truncating incomplete trade history record in {name}")
+                    f.truncate(last_offset)
+                    count -= 1
+            if count == 0:
+                os.remove(path)
+                continue
+            first_ts = self._decode_line(first_line).get('timestamp', '')
+            number = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            self._segments.append({'number': number, 'path': path, 'first_ts': first_ts, 'count': count})
+            self._segment_starts.append(first_ts)
+            self.spilled_count += count
+
+        if self._segments:
+            self._active_file = open(self._segments[-1]['path'], 'a', encoding='utf-8', buffering=1)
+            logging.info(f"📚 Trade history: {len(self._segments)} segments, {self.spilled_count} archived events")
+
+    def flush(self):
+        if self._active_file is not None:
+            self._active_file.flush()
+
+    def close(self):
+        """Spill the in-memory window and close the active segment"""
+        if self.directory:
+            while self._recent:
+                self._spill(self._recent.popleft())
+        if self._active_file is not None:
+            self._active_file.close()
+            self._active_file = None
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    @property
+    def total_count(self) -> int:
+        """Events in memory plus events kept in segments"""
+        return len(self._recent) + self.spilled_count
+
+    def __len__(self) -> int:
+        return len(self._recent)
+
+    def __bool__(self) -> bool:
+        return bool(self._recent)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._recent)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.start is not None and index.start < 0 and index.stop is None and index.step is None:
+                # history[-n:] - walk back n items instead of copying the whole buffer
+                return list(islice(reversed(self._recent), -index.start))[::-1]
+            return list(self._recent)[index]
+        return self._recent[index]
+
+    def tail(self, n: int) -> List[Dict]:
+        """Last n events, reading back through segments when memory is not enough"""
+        if n <= len(self._recent):
+            return list(self._recent)[len(self._recent) - n:]
+
+        needed = n - len(self._recent)
+        older: List[Dict] = []
+        self.flush()
+        for segment in reversed(self._segments):
+            events = self._read_segment(segment['path'])
+            older = events[-needed:] + older if needed < len(events) else events + older
+            needed = n - len(self._recent) - len(older)
+            if needed <= 0:
+                break
+        return older + list(self._recent)
+
+    def query(self, since: Optional[str] = None, until: Optional[str] = None,
+              limit: Optional[int] = None) -> List[Dict]:
+        """
+        Events with since <= timestamp < until (ISO strings), oldest first
+        Only segments whose time range overlaps the window are read
+        """
+        if limit:
+            return list(deque(self.iter_range(since, until), maxlen=limit))
+        return list(self.iter_range(since, until))
+
+    def iter_range(self, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict]:
+        """query() as a stream - segments are read one line at a time, never held in memory"""
+        self.flush()
+        start = 0
+        if since is not None and self._segment_starts:
+            start = max(bisect_right(self._segment_starts, since) - 1, 0)
+        for segment in self._segments[start:]:
+            if until is not None and segment['first_ts'] >= until:
+                break
+            with open(segment['path'], 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        event = json.loads(line)
+                        if self._in_range(event, since, until):
+                            yield event
+
+        yield from (event for event in list(self._recent) if self._in_range(event, since, until))
+
+    @staticmethod
+    def _in_range(event: Dict, since: Optional[str], until: Optional[str]) -> bool:
+        timestamp = event.get('timestamp', '')
+        return (since is None or timestamp >= since) and (until is None or timestamp < until)
+
+    @staticmethod
+    def _decode_line(line: bytes) -> Optional[Dict]:
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _read_segment(path: str) -> List[Dict]:
+        with open(path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def get_stats(self) -> Dict:
+        return {
+            'in_memory': len(self._recent),
+            'capacity': self.capacity,
+            'archived': self.spilled_count,
+            'segments': len(self._segments),
+            'dropped': self.dropped_count,
+            'total': self.total_count
+        }
@@ -0,0 +1,190 @@
+"""
+Trade Journal - Persistent SQLite Store
+Every signal, execution, closure and emergency stop is written once,
+indexed on (symbol, timestamp) and (action, timestamp) for /trades queries
+"""
+
+import base64
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    action TEXT NOT NULL,
+    symbol TEXT,
+    status TEXT,
+    data TEXT NOT NULL,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_trades_symbol_timestamp ON trades (symbol, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_trades_action_timestamp ON trades (action, timestamp, id);
+"""
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+def encode_cursor(timestamp: str, row_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{timestamp}|{row_id}".encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').rsplit('|', 1)
+        return timestamp, int(row_id)
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+class TradeJournal:
+    """
+    SQLite trade journal (WAL mode)
+    Writes are buffered and committed in batches of batch_size events or
+    flush_seconds after the oldest pending one, whichever comes first (a timer
+    commits a lone event); reads flush pending rows first
+    """
+
+    def __init__(self, path: str = Config.TRADE_JOURNAL_PATH,
+                 batch_size: int = Config.TRADE_JOURNAL_BATCH_SIZE,
+                 flush_seconds: float = Config.TRADE_JOURNAL_FLUSH_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._pending: List[Tuple] = []
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None  # Commits pending rows flush_seconds after the first
+
+        directory = os.path.dirname(path)
+        if directory and path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(trades)")]
+        if 'source' not in columns:  # Journals created before rows were keyed
+            self._conn.execute("ALTER TABLE trades ADD COLUMN source TEXT")
+        self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_trades_source ON trades (source)")
+        self._conn.commit()
+
+        logging.info(f"📒 Trade journal opened: {path}")
+
+    def append(self, event: Dict, source: Optional[str] = None):
+        """
+        Buffer one event; commits when the batch is full or the flush interval has passed
+        source is an idempotency key (the bot passes "<WAL seq>:<n>"): a second row with the same key is ignored
+        """
+        row = (
+            event.get('timestamp', ''),
+            event.get('action', 'UNKNOWN'),
+            event.get('symbol'),
+            event.get('status'),
+            json.dumps(event, default=str),
+            source
+        )
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size or time.monotonic() - self._last_commit >= self.flush_seconds:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_seconds, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Commit all buffered events"""
+        with self._lock:
+            self._flush_locked()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._timer = None
+            if self._conn is not None:
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO trades (timestamp, action, symbol, status, data, source) VALUES (?, ?, ?, ?, ?, ?)",
+                self._pending
+            )
+            self._conn.commit()
+            self._pending = []
+        self._last_commit = time.monotonic()
+
+    def query(self, symbol: Optional[str] = None, action: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None,
+              cursor: Optional[str] = None, limit: int = 50) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Newest matching events, returned oldest first
+        since is inclusive, until exclusive (ISO timestamps)
+        Returns: (events, cursor for the next older page or None)
+        """
+        clauses, params = self._filters(symbol, action, since, until)
+        if cursor:
+            # Keyset pagination - continue strictly before the last row of the previous page
+            cursor_ts, cursor_id = decode_cursor(cursor)
+            clauses.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+            params.extend([cursor_ts, cursor_ts, cursor_id])
+
+        sql = "SELECT id, timestamp, data FROM trades"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(sql, params).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][1], rows[-1][0]) if has_more and rows else None
+        return [json.loads(data) for _, _, data in reversed(rows)], next_cursor
+
+    def count(self, symbol: Optional[str] = None, action: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None) -> int:
+        """Events matching the query() filters, across all pages"""
+        clauses, params = self._filters(symbol, action, since, until)
+        sql = "SELECT COUNT(*) FROM trades"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    @staticmethod
+    def _filters(symbol: Optional[str], action: Optional[str],
+                 since: Optional[str], until: Optional[str]) -> Tuple[List[str], List]:
+        clauses = []
+        params: List = []
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if action:
+            clauses.append("action = ?")
+            params.append(action)
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        return clauses, params
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,101 @@
+"""
+Trigger Index - Stop Loss / Take Profit Levels by Symbol
+Each symbol keeps two heaps of levels: those hit when price falls to them and
+those hit when price rises to them. A tick pops only the levels it crosses,
+O(log n) per triggered level instead of a scan over every open position
+"""
+
+import heapq
+import itertools
+from typing import Dict, List, Tuple
+
+STOP_LOSS = 'STOP_LOSS'
+TAKE_PROFIT = 'TAKE_PROFIT'
+
+class TriggerIndex:
+    """
+    SL/TP levels of open positions
+    - long: SL fires at price <= level, TP at price >= level
+    - short: SL fires at price >= level, TP at price <= level
+    Removing a ticket is O(1): its heap entries go stale and are skipped when
+    popped, and the heaps are compacted once stale entries outnumber live ones
+    """
+
+    def __init__(self):
+        self._below: Dict[str, List[Tuple]] = {}  # symbol → max-heap (-level, seq, ticket, generation, reason)
+        self._above: Dict[str, List[Tuple]] = {}  # symbol → min-heap (level, seq, ticket, generation, reason)
+        self._live: Dict[str, int] = {}  # ticket → generation of its current entries
+        self._generations = itertools.count()  # Never reused, so a removed ticket's stale entries can't match a re-add
+        self._entries = 0
+        self._seq = 0
+
+    def add(self, ticket: str, symbol: str, side: str, stop_loss: float = 0.0, take_profit: float = 0.0):
+        """Index a position's levels (0 = no level); re-adding a ticket replaces its levels"""
+        generation = next(self._generations)
+        self._live[ticket] = generation
+        long = side != 'SELL'
+        if stop_loss > 0:
+            self._push(symbol, ticket, generation, STOP_LOSS, stop_loss, below=long)
+        if take_profit > 0:
+            self._push(symbol, ticket, generation, TAKE_PROFIT, take_profit, below=not long)
+
+    def _push(self, symbol: str, ticket: str, generation: int, reason: str, level: float, below: bool):
+        self._seq += 1
+        if below:
+            heapq.heappush(self._below.setdefault(symbol, []), (-level, self._seq, ticket, generation, reason))
+        else:
+            heapq.heappush(self._above.setdefault(symbol, []), (level, self._seq, ticket, generation, reason))
+        self._entries += 1
+
+    def remove(self, ticket: str):
+        """Forget a ticket closed some other way (manual close, EA report)"""
+        if self._live.pop(ticket, None) is not None and self._entries > 2 * len(self._live) + 64:
+            self._compact()
+
+    def on_price(self, symbol: str, price: float) -> List[Tuple[str, str, float]]:
+        """
+        Pop every level crossed by price
+        Returns (ticket, reason, level) per triggered position, oldest level first on ties;
+        a triggered ticket is removed, so its other level can no longer fire
+        """
+        hits = []
+        heap = self._below.get(symbol)
+        while heap and -heap[0][0] >= price:
+            key, _, ticket, generation, reason = heapq.heappop(heap)
+            self._fire(hits, ticket, generation, reason, -key)
+        heap = self._above.get(symbol)
+        while heap and heap[0][0] <= price:
+            level, _, ticket, generation, reason = heapq.heappop(heap)
+            self._fire(hits, ticket, generation, reason, level)
+        return hits
+
+    def _fire(self, hits: List, ticket: str, generation: int, reason: str, level: float):
+        self._entries -= 1
+        if self._live.get(ticket) == generation:
+            del self._live[ticket]
+            hits.append((ticket, reason, level))
+
+    def _compact(self):
+        """Drop stale entries - O(n), amortised over the removals that made them stale"""
+        for heaps in (self._below, self._above):
+            for symbol in list(heaps):
+                heap = [entry for entry in heaps[symbol] if self._live.get(entry[2]) == entry[3]]
+                if heap:
+                    heapq.heapify(heap)
+                    heaps[symbol] = heap
+                else:
+                    del heaps[symbol]
+        self._entries = sum(len(heap) for heaps in (self._below, self._above) for heap in heaps.values())
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, ticket) -> bool:
+        return ticket in self._live
+
+    def get_stats(self) -> Dict:
+        return {
+            'positions': len(self._live),
+            'heap_entries': self._entries,
+            'symbols': sorted(set(self._below) | set(self._above))
+        }
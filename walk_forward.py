@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Walk-Forward - Rolling In-Sample Optimization, Out-of-Sample Evaluation
+History is split into windows: the parameter grid is optimized on each
+in-sample stretch and the winner is traded on the out-of-sample stretch that
+follows it. Windows run in parallel over the optimizer's shared-memory pool
+Indicators are computed once over the whole series (per worker, per length)
+and every window trades a slice of them, so warm-up is shared by overlapping
+windows instead of being recomputed - and each window sees indicators warmed
+on all the history before it, exactly as a live chart would
+"""
+
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from backtester import DEFAULT_PARAMS, Bars, performance_metrics, run_backtest
+from optimizer import DEFAULT_GRID, expand_grid, load_symbols, run_shared, shared_bars
+
+Window = Tuple[int, int, int, int]  # (in-sample start, in-sample stop, out-of-sample start, out-of-sample stop)
+
+def make_windows(count: int, in_sample: int, out_of_sample: int, step: Optional[int] = None,
+                 start: int = 0) -> List[Window]:
+    """Rolling windows over count bars; step defaults to out_of_sample so OOS stretches tile the history"""
+    step = step or out_of_sample
+    windows = []
+    first = start
+    while first + in_sample + out_of_sample <= count:
+        windows.append((first, first + in_sample, first + in_sample, first + in_sample + out_of_sample))
+        first += step
+    return windows
+
+def _score(result: Dict, objective: str, min_trades: int) -> Tuple[bool, float]:
+    return result['total_trades'] >= min_trades, result[objective]
+
+def _run_window(task) -> Dict:
+    """Optimize on the in-sample bars, then trade the winner out of sample"""
+    symbol, number, window, combos, objective, min_trades = task
+    bars, cache = shared_bars(symbol)
+    in_start, in_stop, out_start, out_stop = window
+
+    best, best_score, best_result = None, None, None
+    for combo in combos:
+        result = run_backtest(bars, combo, in_start, in_stop, cache=cache)
+        score = _score(result, objective, min_trades)  # Enough trades first, then the objective
+        if best_score is None or score > best_score:
+            best, best_score, best_result = combo, score, result
+
+    out = run_backtest(bars, best, out_start, out_stop, cache=cache, close_open_trade=True)
+    return {
+        'window': number,
+        'bounds': window,
+        'params': best,
+        'in_sample': {name: value for name, value in best_result.items() if name not in ('equity', 'trades', 'open_trade')},
+        'out_of_sample': {name: value for name, value in out.items() if name not in ('equity', 'trades', 'open_trade')},
+        'equity': out['equity'],
+        'pnl': out['trades']['pnl']
+    }
+
+def run_walk_forward(bars: Bars, in_sample: int, out_of_sample: int, grid: Dict[str, Sequence] = None,
+                     step: Optional[int] = None, objective: str = 'profit_factor', min_trades: int = 10,
+                     workers: Optional[int] = None, symbol: str = 'SYMBOL') -> Dict:
+    """
+    Walk-forward over one symbol's bars (window sizes in bars)
+    Returns per-window results and the stitched out-of-sample equity: each window
+    starts from initial_capital and, since positions are sized in percent of
+    equity, is rescaled to start where the previous window ended
+    """
+    windows = make_windows(len(bars), in_sample, out_of_sample, step)
+    if not windows:
+        raise ValueError(f"{len(bars)} bars are not enough for one {in_sample}+{out_of_sample} bar window")
+    combos = expand_grid(grid or DEFAULT_GRID)
+    tasks = [(symbol, number, window, combos, objective, min_trades) for number, window in enumerate(windows)]
+    results = sorted(run_shared({symbol: bars}, _run_window, tasks, workers, chunksize=1),
+                     key=lambda result: result['window'])
+
+    capital = float(DEFAULT_PARAMS['initial_capital'])
+    scale = 1.0
+    curves, pnls = [], []
+    if step in (None, out_of_sample):  # Overlapping or gapped OOS stretches do not stitch into one curve
+        for result in results:
+            curves.append(result['equity'] * scale)
+            pnls.append(result['pnl'] * scale)
+            scale *= result['equity'][-1] / capital
+
+    stitched = np.concatenate(curves) if curves else np.empty(0)
+    return {
+        'windows': results,
+        'equity': stitched,
+        'time': bars.time[windows[0][2]:windows[-1][3]] if curves else np.empty(0, dtype=np.int64),
+        'summary': performance_metrics({'pnl': np.concatenate(pnls) if pnls else np.empty(0)}, stitched, capital)
+    }
+
+def _date(timestamp: int) -> str:
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc).strftime('%Y-%m-%d')
+
+def format_report(report: Dict, bars: Bars) -> str:
+    params = [" ".join(f"{name}={value}" for name, value in result['params'].items()) for result in report['windows']]
+    width = max(len(text) for text in params + ['params'])
+    header = f"{'#':>3} | {'out of sample':<23} | {'params':<{width}} | {'IS PF':>6} | {'OOS PF':>6} | {'OOS net %':>9} | {'trades':>6}"
+    lines = [header, "-" * len(header)]
+    for result, text in zip(report['windows'], params):
+        _, _, out_start, out_stop = result['bounds']
+        lines.append(f"{result['window']:>3} | {_date(bars.time[out_start])} → {_date(bars.time[out_stop - 1])} | "
+                     f"{text:<{width}} | {result['in_sample']['profit_factor']:>6.2f} | "
+                     f"{result['out_of_sample']['profit_factor']:>6.2f} | "
+                     f"{result['out_of_sample']['net_profit_percent']:>9.2f} | {result['out_of_sample']['total_trades']:>6}")
+    summary = report['summary']
+    lines += ["-" * len(header),
+              f"Stitched OOS: {summary['total_trades']} trades, win rate {summary['win_rate']:.2f}%, "
+              f"PF {summary['profit_factor']:.2f}, net {summary['net_profit_percent']:.2f}%, "
+              f"max DD {summary['max_drawdown_percent']:.2f}%"]
+    return "\n".join(lines)
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python walk_forward.py <data_dir> <SYMBOL> [timeframe] [in_sample_days] [out_of_sample_days]")
+        sys.exit(1)
+
+    symbol = sys.argv[2].upper()
+    timeframe = sys.argv[3] if len(sys.argv) > 3 else '15m'
+    in_days = float(sys.argv[4]) if len(sys.argv) > 4 else 365
+    out_days = float(sys.argv[5]) if len(sys.argv) > 5 else 90
+    data = load_symbols(sys.argv[1], timeframe, [symbol])
+    if symbol not in data:
+        print(f"❌ No {symbol} {timeframe} data found in {sys.argv[1]}")
+        sys.exit(1)
+
+    bars = data[symbol]
+    bar_seconds = float(np.median(np.diff(bars.time))) if len(bars) > 1 else 1.0
+    in_sample, out_of_sample = int(in_days * 86400 / bar_seconds), int(out_days * 86400 / bar_seconds)
+
+    print(f"🚶 Walk-forward {symbol} {timeframe}: {len(bars):,} bars, {in_days:g}d in-sample / {out_days:g}d out-of-sample")
+    started = time.perf_counter()
+    report = run_walk_forward(bars, in_sample, out_of_sample, symbol=symbol)
+    print("=" * 112)
+    print(format_report(report, bars))
+    print("=" * 112)
+    print(f"⏱️  {time.perf_counter() - started:.1f} s")
+
+if __name__ == "__main__":
+    main()